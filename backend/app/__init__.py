@@ -1,6 +1,5 @@
 from flask import Flask
 from flask_cors import CORS
-import ee
 
 import os
 
@@ -16,22 +15,36 @@ def create_app():
     # CORS ayarları (frontend erişimi için)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
-    # Google Earth Engine başlat
-    try:
-        ee.Initialize(project=app.config['GEE_PROJECT_ID'])
-        print("✅ Google Earth Engine bağlantısı başarılı")
-    except Exception as e:
-        print(f"⚠️ GEE bağlantı hatası: {e}")
-        print("   ee.Authenticate() çalıştırmanız gerekebilir")
+    # Google Earth Engine (açılışı bloklamaz: ilk kullanımda veya arka planda)
+    from app.services.gee_auth import GEEInitializer
+    GEEInitializer.init_app(app)
+    
+    # GEE çağrıları için öncelik sınıflı zamanlayıcı
+    from app.services.scheduler import WorkScheduler
+    WorkScheduler.init_app(app)
     
     # Blueprint'leri kaydet
     from app.routes.fields import fields_bp
     from app.routes.analysis import analysis_bp
     from app.routes.risk import risk_bp
+    from app.routes.health import health_bp
+    from app.routes.export import export_bp
+    from app.routes.prefetch import prefetch_bp
+    from app.routes.tiles import tiles_bp
+    from app.routes.regions import regions_bp
     
     app.register_blueprint(fields_bp, url_prefix='/api')
     app.register_blueprint(analysis_bp, url_prefix='/api')
     app.register_blueprint(risk_bp, url_prefix='/api')
+    app.register_blueprint(health_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+    app.register_blueprint(prefetch_bp, url_prefix='/api')
+    app.register_blueprint(tiles_bp, url_prefix='/api')
+    app.register_blueprint(regions_bp, url_prefix='/api')
+    
+    # CLI komutları
+    from app.cli import register_cli
+    register_cli(app)
     
     # Ana sayfa
     @app.route('/')
@@ -0,0 +1,164 @@
+"""
+ASGI Uygulaması (async sunum modu)
+Uzun süren analiz endpoint'leri (POST /api/analyze, POST /api/risk)
+native async handler'lardır: GEE yanıtı beklenirken thread tutulmaz,
+pandas/ML hesapları süreç havuzunda yapılır. Diğer tüm istekler Flask
+uygulamasına (WsgiToAsgi) aktarılır.
+"""
+import json
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+from app.routes.analysis import _analysis_params, _analysis_payload
+from app.routes.risk import _cached_baseline, _store_baseline, _risk_payload
+from app.services.async_runtime import AsyncRuntime
+from app.services.gee_service import GEEService
+from app.services.baseline_service import BaselineService
+from app.services.ml_service import MLService
+from app.services.prefetch_service import PrefetchService
+from app.services.smoothing_service import SmoothingService
+from app.utils.serialization import dumps, compress
+
+
+def _wants_columnar(data, query):
+    """serialization.wants_columnar eşleniği (gövde veya ?format=columnar)"""
+    fmt = (data or {}).get('format') or (query.get('format') or [None])[0]
+    return fmt == 'columnar'
+
+
+def _predict_recent_risk(coordinates, current, baseline, timeseries):
+    """Süreç havuzunda: son 30 günü yumuşat ve riski tahmin et"""
+    smoothed = SmoothingService.smooth_recent(coordinates, timeseries)
+    return MLService.predict_risk(current, baseline, smoothed)
+
+
+async def analyze(data, query):
+    """POST /api/analyze (senkron route ile aynı yanıt)"""
+    try:
+        params = _analysis_params(data)
+    except (TypeError, ValueError) as e:
+        return {'success': False, 'error': str(e)}, 400
+
+    df = await AsyncRuntime.gee(
+        GEEService.get_timeseries,
+        params['coordinates'], params['start_date'], params['end_date']
+    )
+
+    return await AsyncRuntime.cpu(
+        _analysis_payload, df, params, _wants_columnar(data, query)
+    )
+
+
+async def risk(data, query):
+    """POST /api/risk (senkron route ile aynı yanıt)"""
+    field_id = (data or {}).get('field_id')
+    coordinates = (data or {}).get('coordinates')
+
+    if not coordinates:
+        return {'success': False, 'error': 'Koordinatlar gerekli'}, 400
+
+    timeseries = await AsyncRuntime.gee(PrefetchService.recent_timeseries, coordinates)
+    current = GEEService.best_observation(timeseries)
+
+    if current is None:
+        return {'success': False, 'error': 'Güncel veri bulunamadı'}, 404
+
+    baseline = _cached_baseline(field_id)
+    if baseline is None:
+        baseline = await AsyncRuntime.gee(BaselineService.calculate_baseline, coordinates)
+        _store_baseline(field_id, baseline)
+
+    if not baseline or not baseline['baseline']:
+        return {'success': False, 'error': 'Baseline hesaplanamadı'}, 404
+
+    risk = await AsyncRuntime.cpu(
+        _predict_recent_risk, coordinates, current, baseline, timeseries
+    )
+
+    return _risk_payload(field_id, current, baseline, timeseries, risk), 200
+
+
+ASYNC_ROUTES = {
+    ('POST', '/api/analyze'): analyze,
+    ('POST', '/api/risk'): risk
+}
+
+
+async def _read_json(receive):
+    """İstek gövdesini oku ve JSON olarak çöz (geçersizse ValueError)"""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+
+    body = b''.join(chunks)
+    return json.loads(body) if body else None
+
+
+async def _send_json(scope, send, payload, status):
+    """JSON yanıtı gönder (Flask yolu gibi sıkıştırılır, CORS açık)"""
+    headers = dict(scope['headers'])
+    body, extra = compress(
+        dumps(payload), headers.get(b'accept-encoding', b'').decode('latin-1')
+    )
+
+    response_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+        (b'access-control-allow-origin', b'*')
+    ] + [(k.lower().encode(), v.encode()) for k, v in extra.items()]
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app():
+    """Flask uygulamasını saran ASGI uygulaması"""
+    flask_app = create_app()
+    wsgi = WsgiToAsgi(flask_app)
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                AsyncRuntime.start(flask_app.config)
+                with flask_app.app_context():
+                    await AsyncRuntime.warmup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                AsyncRuntime.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+
+        handler = None
+        if scope['type'] == 'http':
+            handler = ASYNC_ROUTES.get((scope['method'], scope['path']))
+
+        if handler is None:
+            await wsgi(scope, receive, send)
+            return
+
+        try:
+            data = await _read_json(receive)
+        except ValueError:
+            await _send_json(scope, send, {'success': False, 'error': 'Geçersiz JSON'}, 400)
+            return
+
+        # Uygulama bağlamı görev (task) bağlamında; GEE thread'lerine kopyalanır
+        with flask_app.app_context():
+            try:
+                query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+                payload, status = await handler(data, query)
+            except Exception as e:
+                payload, status = {'success': False, 'error': str(e)}, 500
+
+        await _send_json(scope, send, payload, status)
+
+    return app
@@ -0,0 +1,70 @@
+"""
+Komut satırı (flask CLI) komutları
+
+Örnek:
+    flask export-fields --fields-file tarlalar.json --table observations \
+        --format parquet --output gozlemler.parquet
+    flask enqueue-fields --fields-file tarlalar.json --kind baseline
+"""
+import json
+import click
+from datetime import datetime, timedelta
+from app.services.export_service import ExportService
+from app.services.job_queue import JobQueue
+
+
+def register_cli(app):
+    """CLI komutlarını uygulamaya ekle"""
+
+    @app.cli.command('export-fields')
+    @click.option('--fields-file', required=True, type=click.File('r'),
+                  help='[{"id": "1", "coordinates": [...]}, ...] içeren JSON dosyası')
+    @click.option('--table', type=click.Choice(ExportService.TABLES),
+                  default='observations', show_default=True)
+    @click.option('--format', 'fmt', type=click.Choice(list(ExportService.FORMATS)),
+                  default='parquet', show_default=True)
+    @click.option('--start-date', default=None, help='YYYY-MM-DD (varsayılan: 1 yıl önce)')
+    @click.option('--end-date', default=None, help='YYYY-MM-DD (varsayılan: bugün)')
+    @click.option('--output', required=True, type=click.Path(dir_okay=False))
+    def export_fields(fields_file, table, fmt, start_date, end_date, output):
+        """Tarla verilerini Arrow IPC / Parquet dosyasına aktar"""
+        fields = json.load(fields_file)
+
+        end_date = end_date or datetime.now().strftime('%Y-%m-%d')
+        start_date = start_date or (
+            datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+
+        written = 0
+        with open(output, 'wb') as f:
+            for chunk in ExportService.stream(fields, table, fmt, start_date, end_date):
+                f.write(chunk)
+                written += len(chunk)
+
+        click.echo(f"✅ {len(fields)} tarla, {written / 1024:.1f} KB -> {output}")
+
+    @app.cli.command('enqueue-fields')
+    @click.option('--fields-file', required=True, type=click.File('r'),
+                  help='[{"id": "1", "coordinates": [...]}, ...] içeren JSON dosyası')
+    @click.option('--kind', type=click.Choice(JobQueue.KINDS), required=True)
+    @click.option('--start-date', default=None, help='YYYY-MM-DD (yalnızca fetch)')
+    @click.option('--end-date', default=None, help='YYYY-MM-DD (yalnızca fetch)')
+    @click.option('--priority', type=int, default=0, show_default=True)
+    def enqueue_fields(fields_file, kind, start_date, end_date, priority):
+        """Tarlalar için toplu işleri kuyruğa ekle (worker.py işler)"""
+        fields = json.load(fields_file)
+        queue = JobQueue.from_config(app.config)
+
+        params = {}
+        if kind == 'fetch':
+            params = {k: v for k, v in
+                      (('start_date', start_date), ('end_date', end_date)) if v}
+
+        added = sum(queue.enqueue(kind, field, params, priority)[1] for field in fields)
+
+        click.echo(f"✅ {added} iş eklendi ({len(fields) - added} zaten kuyrukta)")
+
+    @app.cli.command('queue-stats')
+    def queue_stats():
+        """Kuyruktaki işlerin tür ve durum dağılımı"""
+        stats = JobQueue.from_config(app.config).stats()
+        click.echo(json.dumps(stats, indent=2))
@@ -10,6 +10,32 @@ class Config:
     # GEE
     GEE_PROJECT_ID = os.getenv('GEE_PROJECT_ID')
     
+    # Açılışta arka planda GEE bağlantısı kur (False: ilk kullanımda kurulur).
+    # Sunucu giriş noktaları (run.py, asgi.py, worker.py, flask run) için;
+    # diğer flask CLI komutlarında uygulanmaz
+    GEE_WARMUP = os.getenv('GEE_WARMUP', '1') == '1'
+    # Başarısız bağlantıdan sonra tekrar deneme aralığı (saniye)
+    GEE_INIT_RETRY_SECONDS = 60
+    
+    # GEE iş zamanlayıcısı: toplam eşzamanlı çağrı, sınıf başına sınır ve
+    # adil paylaşım ağırlığı (etkileşimli sınıf her zaman önce başlar)
+    SCHEDULER_MAX_CONCURRENT = int(os.getenv('SCHEDULER_MAX_CONCURRENT', '8'))
+    SCHEDULER_CLASS_LIMITS = {'interactive': 8, 'refresh': 4, 'bulk': 2}
+    SCHEDULER_CLASS_WEIGHTS = {'interactive': 1, 'refresh': 3, 'bulk': 1}
+    
+    # Async sunum (asgi.py): GEE çağrılarını bekleyen thread sayısı ve
+    # CPU yoğun pandas/ML işleri için süreç sayısı
+    ASYNC_GEE_THREADS = int(os.getenv('ASYNC_GEE_THREADS', '16'))
+    ASYNC_CPU_PROCESSES = int(os.getenv('ASYNC_CPU_PROCESSES', '2'))
+    
+    # Toplu tarla işleri kuyruğu (worker.py ile işlenir)
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'sqlite')
+    JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join('cache', 'jobs.db'))
+    JOB_LEASE_SECONDS = 300       # worker bu sürede haber vermezse iş geri alınır
+    JOB_MAX_ATTEMPTS = 5
+    JOB_RETRY_BASE_SECONDS = 30   # 30s, 60s, 120s, ...
+    JOB_POLL_SECONDS = 2
+    
     # Veritabanı (şimdilik opsiyonel - kullanmıyoruz)
     DATABASE_URL = os.getenv('DATABASE_URL', None)
     
@@ -17,6 +43,92 @@ class Config:
     CLOUD_THRESHOLD = 30  # Maksimum bulut yüzdesi (biraz artırdım)
     BASELINE_YEARS = ['2021', '2022', '2023']
     
+    # Baseline modu: 'sketch' yılları tek tek haftalık kantil özetlerine
+    # akıtır (bellek yıl sayısından bağımsız, dayanıklı Z-skoru), 'exact'
+    # tüm yılların serisini bellekte tutar (yalnızca μ/σ). Özet kutu sayısı
+    # ([-1, 1] aralığında), hafta başına tam saklanan en fazla gözlem (aşan
+    # haftalar histograma geçer) ve önbellekteki en fazla baseline sayısı
+    BASELINE_MODE = os.getenv('BASELINE_MODE', 'sketch')
+    BASELINE_SKETCH_BINS = 200
+    BASELINE_SKETCH_EXACT = 64
+    BASELINE_SKETCH_CACHE_SIZE = 4096
+    
+    # Çizilen poligonlar GEE'ye gitmeden önce bu toleransla sadeleştirilir (metre)
+    GEOMETRY_SIMPLIFY_TOLERANCE = 2.0
+    
+    # Kaliteli gözlem: temiz piksel oranı bunun üstünde (tüm filtreler ortak)
+    MIN_CLEAR_PIXEL_RATIO = 0.5
+    
+    # Yumuşatılmış seri: ızgara aralığı (gün), Whittaker pürüzsüzlüğü,
+    # en yakın gözlemden bu kadar uzak noktalar doldurulmaz, önbellekteki
+    # en fazla seri sayısı
+    SMOOTHING_STEP_DAYS = 5
+    SMOOTHING_LAMBDA = 10.0
+    SMOOTHING_MAX_GAP_DAYS = 30
+    SMOOTHING_CACHE_SIZE = 4096
+    
+    # Sütun bazlı gözlem deposu: bellekteki en fazla seri sayısı (aşılınca
+    # en az kullanılanlar çıkarılıp depo sıkıştırılır)
+    OBSERVATION_STORE_MAX_SERIES = 4096
+    
+    # Delta senkronizasyon: son N gün imleçte kapalı sayılmaz
+    DELTA_SYNC_LAG_DAYS = 5
+    
+    # GET yanıtları: açık (güncel) aralıklar için tarayıcı/vekil önbellek süresi
+    # (saniye); kapalı aralıklar immutable döner
+    OPEN_RANGE_MAX_AGE = 300
+    
+    # Harita görünümü prefetch: son 30 gün önbellek süresi (saniye),
+    # arka plan thread sayısı, istek başına en fazla tarla ve önbellekteki
+    # en fazla tarla sayısı
+    PREFETCH_TTL = 30 * 60
+    PREFETCH_WORKERS = 2
+    PREFETCH_MAX_FIELDS = 50
+    PREFETCH_CACHE_SIZE = 4096
+    
+    # Risk karoları: bu zoom'un altında tarlalar kümelenir; küme ızgarası
+    # karo başına hücre sayısı (kenar), bellekteki en fazla karo sayısı
+    TILE_CLUSTER_MAX_ZOOM = 13
+    TILE_CLUSTER_CELLS = 8
+    TILE_CACHE_SIZE = 4096
+    
+    # EE ifade şablonları: geometrisi yerleşmiş ifade önbelleği (tarla sayısı)
+    EE_TEMPLATE_CACHE_SIZE = 4096
+    
+    # Bölge özetleri: son N günde yüksek riske geçen tarlalar "yeni" sayılır
+    REGION_NEW_HIGH_DAYS = 7
+    
+    # Risk sonuç deposu: tarla başına tutulan en fazla (son) kayıt sayısı
+    RESULT_HISTORY_SIZE = 500
+    
+    # Grafik özetleri (haftalık/aylık) önbellek süresi (saniye) ve
+    # önbellekteki en fazla özet sayısı
+    LOD_CACHE_TTL = 6 * 3600
+    LOD_CACHE_SIZE = 4096
+    
+    # Ham yansıma önbelleği (yerelde indeks hesaplamak için)
+    BAND_CACHE_DIR = os.getenv('BAND_CACHE_DIR', os.path.join('cache', 'bands'))
+    BAND_CACHE_BANDS = ['B2', 'B3', 'B4', 'B5', 'B8', 'B8A', 'B11', 'B12']
+    # Son N gün kapalı sayılmaz (geç işlenen görüntüler tekrar çekilir)
+    BAND_CACHE_LAG_DAYS = 5
+    
+    # Raster (piksel bazlı) mod
+    RASTER_CACHE_DIR = os.getenv('RASTER_CACHE_DIR', os.path.join('cache', 'raster'))
+    RASTER_SCALE = 10                  # metre/piksel
+    RASTER_MAX_PIXELS = 250_000        # ~25 km² (10m pikselde)
+    RASTER_BASELINE_WEEK_WINDOW = 1    # piksel baseline'ı için ±hafta
+    RASTER_LAG_DAYS = 5                # güncel küpte son N gün yeniden çekilir
+    
+    # Trend eğimi bu kadar günlük adım başına raporlanır (Sentinel-2 tekrar
+    # ziyaret süresi); eşikler (±0.03, -0.05) bu birimdedir
+    TREND_STEP_DAYS = 5
+    
+    # Değişim dedektörü (Z-skoru birimi)
+    CUSUM_K = 0.5        # tolerans: bundan küçük sapmalar birikmez
+    CUSUM_H = 4.0        # alarm eşiği
+    EWMA_LAMBDA = 0.3    # yeni gözlemin ağırlığı
+    EWMA_LIMIT = 1.5     # EWMA bu kadar negatifse alarm
+    
     # Nadas tespiti için eşik
     NADAS_NDVI_THRESHOLD = 0.15
     NADAS_CONSECUTIVE_WEEKS = 8
\ No newline at end of file
@@ -1,79 +1,220 @@
 """Analiz endpoint'leri"""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
+import pandas as pd
 from app.services.gee_service import GEEService
 from app.services.baseline_service import BaselineService
+from app.services.lod_service import LODService
+from app.services.band_store import BandStore
+from app.services.indices import INDEX_REGISTRY, compute_indices
+from app.services.raster_service import RasterService
+from app.services.prefetch_service import PrefetchService
+from app.services.smoothing_service import SmoothingService
+from app.utils.serialization import dataframe_to_columns, json_response, wants_columnar
+from app.utils.http_cache import (
+    read_query, redirect_if_not_canonical, cached_response, is_closed_range
+)
 
 analysis_bp = Blueprint('analysis', __name__)
 
 
-@analysis_bp.route('/analyze', methods=['POST'])
-def analyze():
+def _parse_lod_params(data):
     """
-    Tarla analizi yap
+    Grafik indirgeme parametrelerini oku
     
-    Request body:
-    {
-        "coordinates": [32.5, 37.9] veya [[...], [...], ...],
-        "start_date": "2024-01-01",  (opsiyonel)
-        "end_date": "2024-06-01"     (opsiyonel)
+    Returns:
+        tuple: (resolution, max_points)
+    
+    Raises:
+        ValueError: Geçersiz parametre
+    """
+    resolution = data.get('resolution')
+    max_points = data.get('max_points')
+    
+    if resolution is not None and resolution not in LODService.RESOLUTIONS:
+        raise ValueError(
+            f"resolution şunlardan biri olmalı: {', '.join(LODService.RESOLUTIONS)}"
+        )
+    
+    if max_points is not None:
+        max_points = int(max_points)
+        if max_points < 3:
+            raise ValueError('max_points en az 3 olmalı')
+    
+    return resolution, max_points
+
+
+def _parse_since(data):
+    """
+    Delta senkronizasyon imlecini oku ('YYYY-MM-DD' veya None)
+    
+    Raises:
+        ValueError: Geçersiz tarih
+    """
+    since = data.get('since')
+    if since is None:
+        return None
+    return datetime.strptime(since, '%Y-%m-%d').strftime('%Y-%m-%d')
+
+
+def _delta_cursor(df, since):
+    """
+    İstemcinin bir sonraki istekte göndereceği imleç
+    Son DELTA_SYNC_LAG_DAYS gün kapalı sayılmaz: geç işlenen görüntüler
+    bir sonraki istekte tekrar gönderilir (istemci tarihe göre değiştirir)
+    """
+    lag = current_app.config['DELTA_SYNC_LAG_DAYS']
+    closed_until = (datetime.now() - timedelta(days=lag)).strftime('%Y-%m-%d')
+    
+    cursor = since
+    if not df.empty:
+        latest = min(df['date'].max().strftime('%Y-%m-%d'), closed_until)
+        cursor = max(latest, since) if since else latest
+    
+    return cursor
+
+
+def _default_range():
+    """Tarih verilmezse son 365 gün"""
+    return {
+        'start_date': (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
+        'end_date': datetime.now().strftime('%Y-%m-%d')
     }
+
+
+def _analysis_params(data):
     """
-    data = request.get_json()
+    Analiz isteğini doğrula (senkron ve async sunum ortak)
     
+    Returns:
+        dict: coordinates, start_date, end_date, resolution, max_points, since
+    
+    Raises:
+        ValueError: Eksik veya geçersiz parametre
+    """
     if not data or 'coordinates' not in data:
+        raise ValueError('Koordinatlar gerekli')
+    
+    resolution, max_points = _parse_lod_params(data)
+    defaults = _default_range()
+    
+    return {
+        'coordinates': data['coordinates'],
+        'start_date': data.get('start_date', defaults['start_date']),
+        'end_date': data.get('end_date', defaults['end_date']),
+        'resolution': resolution,
+        'max_points': max_points,
+        'since': _parse_since(data)
+    }
+
+
+def _analysis_payload(df, params, columnar):
+    """
+    Zaman serisinden analiz yanıtı (CPU kısmı; GEE çağrısı yapmaz)
+    
+    Returns:
+        tuple: (payload, HTTP durum kodu)
+    """
+    if df.empty:
+        return {
+            'success': False,
+            'error': 'Bu tarih aralığında veri bulunamadı'
+        }, 404
+    
+    since = params['since']
+    resolution = params['resolution']
+    
+    # Kaliteli verileri filtrele
+    df_quality = SmoothingService.quality(df)
+    
+    cache_key = LODService.cache_key(
+        params['coordinates'], params['start_date'], params['end_date']
+    )
+    # Boşlukları doldurulmuş, yumuşatılmış seri (yeni gözlem gelene kadar önbellekten)
+    smoothed = SmoothingService.smooth(df, key=cache_key)
+    
+    # Özet istatistikler
+    summary = {
+        'total_images': len(df),
+        'quality_images': len(df_quality),
+        'date_range': {
+            'start': df['date'].min().strftime('%Y-%m-%d'),
+            'end': df['date'].max().strftime('%Y-%m-%d')
+        },
+        'ndvi': {
+            'mean': df_quality['ndvi_mean'].mean(),
+            'min': df_quality['ndvi_mean'].min(),
+            'max': df_quality['ndvi_mean'].max(),
+            'current': df_quality.iloc[-1]['ndvi_mean'] if len(df_quality) > 0 else None
+        },
+        'ndmi': {
+            'mean': df_quality['ndmi_mean'].mean(),
+            'current': df_quality.iloc[-1]['ndmi_mean'] if len(df_quality) > 0 else None
+        }
+    }
+    
+    # Trend analizi (düzenli ızgarada, bulut boşluklarından etkilenmez)
+    trend = BaselineService.calculate_trend(smoothed)
+    
+    if since:
+        # Delta: istemcide olmayan gözlemler (ham, indirgenmeden)
+        chart_df = df_quality[df_quality['date'] > since]
+        resolution = None
+    else:
+        # Grafik için indirgenmiş seri
+        chart_df = LODService.reduce(
+            df_quality, resolution, params['max_points'],
+            cache_key=cache_key + '|quality'
+        )
+    
+    # Grafik noktalarında yumuşatılmış değerler
+    chart_df = chart_df.assign(**{
+        f'{col}_smooth': SmoothingService.at(smoothed, chart_df['date'], col)
+        for col in ('ndvi_mean', 'ndmi_mean')
+    })
+    
+    payload = {
+        'success': True,
+        'resolution': resolution or 'raw',
+        'since': since,
+        'cursor': _delta_cursor(df_quality, since),
+        'summary': summary,
+        'trend': trend
+    }
+    
+    if columnar:
+        payload['format'] = 'columnar'
+        payload['timeseries'] = dataframe_to_columns(chart_df)
+    else:
+        payload['timeseries'] = (
+            chart_df.astype(object).where(chart_df.notna(), None).to_dict('records')
+        )
+    
+    return payload, 200
+
+
+def _analyze(data):
+    """Analiz yanıtını üret (POST ve GET ortak)"""
+    try:
+        params = _analysis_params(data)
+    except (TypeError, ValueError) as e:
         return jsonify({
             'success': False,
-            'error': 'Koordinatlar gerekli'
+            'error': str(e)
         }), 400
     
-    coordinates = data['coordinates']
-    end_date = data.get('end_date', datetime.now().strftime('%Y-%m-%d'))
-    start_date = data.get('start_date', 
-        (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'))
-    
     try:
         # Zaman serisi verisi çek
-        df = GEEService.get_timeseries(coordinates, start_date, end_date)
-        
-        if df.empty:
-            return jsonify({
-                'success': False,
-                'error': 'Bu tarih aralığında veri bulunamadı'
-            }), 404
-        
-        # Kaliteli verileri filtrele
-        df_quality = df[df['clear_pixel_ratio'] > 0.5]
+        df = GEEService.get_timeseries(
+            params['coordinates'], params['start_date'], params['end_date']
+        )
         
-        # Özet istatistikler
-        summary = {
-            'total_images': len(df),
-            'quality_images': len(df_quality),
-            'date_range': {
-                'start': df['date'].min().strftime('%Y-%m-%d'),
-                'end': df['date'].max().strftime('%Y-%m-%d')
-            },
-            'ndvi': {
-                'mean': df_quality['ndvi_mean'].mean(),
-                'min': df_quality['ndvi_mean'].min(),
-                'max': df_quality['ndvi_mean'].max(),
-                'current': df_quality.iloc[-1]['ndvi_mean'] if len(df_quality) > 0 else None
-            },
-            'ndmi': {
-                'mean': df_quality['ndmi_mean'].mean(),
-                'current': df_quality.iloc[-1]['ndmi_mean'] if len(df_quality) > 0 else None
-            }
-        }
+        columnar = wants_columnar(data)
+        payload, status = _analysis_payload(df, params, columnar)
         
-        # Trend analizi
-        trend = BaselineService.calculate_trend(df_quality)
-        
-        return jsonify({
-            'success': True,
-            'summary': summary,
-            'trend': trend,
-            'timeseries': df_quality.to_dict('records')
-        })
+        if columnar:
+            return json_response(payload, status)
+        return jsonify(payload), status
         
     except Exception as e:
         return jsonify({
@@ -82,11 +223,58 @@ def analyze():
         }), 500
 
 
-@analysis_bp.route('/timeseries', methods=['POST'])
-def get_timeseries():
-    """Zaman serisi verisi getir"""
-    data = request.get_json()
+@analysis_bp.route('/analyze', methods=['POST'])
+def analyze():
+    """
+    Tarla analizi yap
     
+    Request body:
+    {
+        "coordinates": [32.5, 37.9] veya [[...], [...], ...],
+        "start_date": "2024-01-01",  (opsiyonel)
+        "end_date": "2024-06-01",    (opsiyonel)
+        "format": "columnar",        (opsiyonel, varsayılan "records")
+        "resolution": "weekly",      (opsiyonel: daily/weekly/monthly)
+        "max_points": 300,           (opsiyonel, grafik için üst sınır)
+        "since": "2024-05-01"        (opsiyonel, yalnızca bu tarihten sonraki
+                                      gözlemler döner; indirgeme uygulanmaz)
+    }
+    
+    Özet ve trend her zaman tüm aralıktan hesaplanır; trend yumuşatılmış
+    seriden gelir ve grafik noktaları ndvi_mean_smooth / ndmi_mean_smooth
+    içerir. Yanıttaki "cursor" bir sonraki istekte "since" olarak gönderilir.
+    """
+    return _analyze(request.get_json())
+
+
+@analysis_bp.route('/analyze', methods=['GET'])
+def analyze_get():
+    """
+    Önbelleklenebilir analiz
+    GET /api/analyze?coords=32.5,37.9&start_date=2023-01-01&end_date=2024-01-01
+    
+    Parametreler POST gövdesiyle aynıdır; poligon için "lon,lat;lon,lat;...".
+    Kanonik olmayan sorgular kanonik URL'ye yönlendirilir. Kapalı aralıklar
+    güçlü ETag ve immutable Cache-Control ile döner.
+    """
+    try:
+        params, data = read_query(
+            ('start_date', 'end_date', 'format', 'resolution', 'max_points', 'since'),
+            defaults=_default_range()
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return (redirect_if_not_canonical(params) or
+            cached_response('analyze', params, is_closed_range(data['end_date']),
+                            lambda: _analyze(data)))
+
+
+def _timeseries(data):
+    """Zaman serisi yanıtını üret (POST ve GET ortak)"""
     coordinates = data.get('coordinates')
     start_date = data.get('start_date')
     end_date = data.get('end_date')
@@ -98,10 +286,52 @@ def get_timeseries():
         }), 400
     
     try:
-        df = GEEService.get_timeseries(coordinates, start_date, end_date)
+        resolution, max_points = _parse_lod_params(data)
+        since = _parse_since(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        if since:
+            # Delta: yalnızca imleçten sonraki günler GEE'den çekilir
+            fetch_start = max(start_date, (
+                datetime.strptime(since, '%Y-%m-%d') + timedelta(days=1)
+            ).strftime('%Y-%m-%d'))
+            df = (GEEService.get_timeseries(coordinates, fetch_start, end_date)
+                  if fetch_start < end_date else pd.DataFrame())
+            resolution = None
+        else:
+            cache_key = LODService.cache_key(coordinates, start_date, end_date)
+            
+            # Önbellekte özet varsa GEE'ye gidilmez
+            df = LODService.get_rollup(cache_key, resolution) if resolution else None
+            if df is None:
+                df = GEEService.get_timeseries(coordinates, start_date, end_date)
+            
+            df = LODService.reduce(df, resolution, max_points, cache_key=cache_key)
+        
+        delta = {
+            'since': since,
+            'cursor': _delta_cursor(df, since) if resolution is None else None
+        }
+        
+        if wants_columnar(data):
+            return json_response({
+                'success': True,
+                'format': 'columnar',
+                'resolution': resolution or 'raw',
+                **delta,
+                'count': len(df),
+                'data': dataframe_to_columns(df)
+            })
         
         return jsonify({
             'success': True,
+            'resolution': resolution or 'raw',
+            **delta,
             'count': len(df),
             'data': df.to_dict('records')
         })
@@ -113,6 +343,45 @@ def get_timeseries():
         }), 500
 
 
+@analysis_bp.route('/timeseries', methods=['POST'])
+def get_timeseries():
+    """
+    Zaman serisi verisi getir
+    "format": "columnar" ile sütun bazlı yanıt döner
+    "resolution" ve "max_points" ile grafik için indirgenir;
+    haftalık/aylık özetler önbellekten sunulur
+    "since" verilirse GEE'den yalnızca sonraki günler çekilir ve döner
+    """
+    return _timeseries(request.get_json())
+
+
+@analysis_bp.route('/timeseries', methods=['GET'])
+def get_timeseries_get():
+    """
+    Önbelleklenebilir zaman serisi
+    GET /api/timeseries?coords=32.5,37.9&start_date=2023-01-01&end_date=2024-01-01
+    """
+    try:
+        params, data = read_query(
+            ('start_date', 'end_date', 'format', 'resolution', 'max_points', 'since')
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    if not data.get('start_date') or not data.get('end_date'):
+        return jsonify({
+            'success': False,
+            'error': 'coords, start_date ve end_date gerekli'
+        }), 400
+    
+    return (redirect_if_not_canonical(params) or
+            cached_response('timeseries', params, is_closed_range(data['end_date']),
+                            lambda: _timeseries(data)))
+
+
 @analysis_bp.route('/current', methods=['POST'])
 def get_current():
     """Güncel durumu getir"""
@@ -126,7 +395,9 @@ def get_current():
         }), 400
     
     try:
-        current = GEEService.get_current_status(coordinates)
+        current = GEEService.best_observation(
+            PrefetchService.recent_timeseries(coordinates)
+        )
         
         if current is None:
             return jsonify({
@@ -143,4 +414,134 @@ def get_current():
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@analysis_bp.route('/indices', methods=['GET'])
+def list_indices():
+    """Kayıtlı indeks formülleri"""
+    return jsonify({
+        'success': True,
+        'indices': {
+            name: {'bands': list(spec['bands']), 'description': spec['description']}
+            for name, spec in INDEX_REGISTRY.items()
+        }
+    })
+
+
+@analysis_bp.route('/indices', methods=['POST'])
+def calculate_indices():
+    """
+    Yerel band önbelleğinden vejetasyon indeksleri hesapla
+    Önbellekte olmayan tarihler için GEE'ye tek sefer gidilir
+    
+    Request body:
+    {
+        "coordinates": [32.5, 37.9],
+        "start_date": "2021-01-01",
+        "end_date": "2024-01-01",
+        "indices": ["evi", "savi", "ndre"],  (opsiyonel, varsayılan tümü)
+        "format": "columnar"                  (opsiyonel)
+    }
+    """
+    data = request.get_json()
+    
+    coordinates = data.get('coordinates')
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    
+    if not all([coordinates, start_date, end_date]):
+        return jsonify({
+            'success': False,
+            'error': 'coordinates, start_date ve end_date gerekli'
+        }), 400
+    
+    try:
+        bands = BandStore.ensure(coordinates, start_date, end_date)
+        
+        if bands.empty:
+            return jsonify({
+                'success': False,
+                'error': 'Bu tarih aralığında veri bulunamadı'
+            }), 404
+        
+        df = compute_indices(bands, data.get('indices'))
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    if wants_columnar(data):
+        return json_response({
+            'success': True,
+            'format': 'columnar',
+            'count': len(df),
+            'data': dataframe_to_columns(df)
+        })
+    
+    return json_response({
+        'success': True,
+        'count': len(df),
+        'data': df.to_dict('records')
+    })
+
+
+
+@analysis_bp.route('/raster/analyze', methods=['POST'])
+def raster_analyze():
+    """
+    Piksel bazlı tarla analizi (tarla içindeki stresli bölgeler)
+    Pikseller ilk çağrıda indirilip diskte saklanır, sonraki analizler yereldir
+    
+    Request body:
+    {
+        "coordinates": [[...], [...], ...],
+        "date": "2024-05-10",     (opsiyonel, varsayılan en son gözlem)
+        "layer": "ndvi"           (opsiyonel: ndvi / ndmi)
+    }
+    """
+    data = request.get_json()
+    
+    if not data or 'coordinates' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Koordinatlar gerekli'
+        }), 400
+    
+    # Güncel dönem küpü günlük olarak kaydırılır (yalnızca yeni günler çekilir)
+    recent_end = datetime.now().strftime('%Y-%m-%d')
+    recent_start = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+    
+    try:
+        result = RasterService.analyze(
+            data['coordinates'], recent_start, recent_end,
+            date=data.get('date'), layer=data.get('layer', 'ndvi')
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': 'Bu tarih aralığında piksel verisi bulunamadı'
+        }), 404
+    
+    return json_response({
+        'success': True,
+        'raster': result
+    })
@@ -0,0 +1,72 @@
+"""Toplu dışa aktarma endpoint'leri"""
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from datetime import datetime, timedelta
+from app.services.export_service import ExportService
+from app.routes.fields import fields_db
+from app.routes.risk import baseline_cache
+
+export_bp = Blueprint('export', __name__)
+
+
+@export_bp.route('/export', methods=['POST'])
+def export_fields():
+    """
+    Birden çok tarlanın verisini Arrow IPC / Parquet olarak akış halinde indir
+
+    Request body:
+    {
+        "field_ids": ["1", "2"],           (veya "fields": [{"id", "coordinates"}])
+        "table": "observations",           (observations / baselines / risk)
+        "format": "parquet",               (arrow / parquet)
+        "start_date": "2024-01-01",        (opsiyonel, observations için)
+        "end_date": "2024-12-31"           (opsiyonel)
+    }
+
+    Hata veren tarlalar atlanır; kimlikleri dosyada 'failed_field_ids'
+    metadatasında (JSON liste) döner: Parquet altbilgisi veya Arrow IPC
+    akışının son batch'i.
+    """
+    data = request.get_json() or {}
+
+    table = data.get('table', 'observations')
+    fmt = data.get('format', 'parquet')
+    end_date = data.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+    start_date = data.get('start_date',
+        (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'))
+
+    if table not in ExportService.TABLES or fmt not in ExportService.FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"table {ExportService.TABLES}, format {tuple(ExportService.FORMATS)} olmalı"
+        }), 400
+
+    if 'fields' in data:
+        fields = data['fields']
+    else:
+        field_ids = data.get('field_ids') or list(fields_db.keys())
+        missing = [fid for fid in field_ids if fid not in fields_db]
+        if missing:
+            return jsonify({
+                'success': False,
+                'error': f"Tarla bulunamadı: {', '.join(map(str, missing))}"
+            }), 404
+        fields = [fields_db[fid] for fid in field_ids]
+
+    if not fields:
+        return jsonify({
+            'success': False,
+            'error': 'Dışa aktarılacak tarla yok'
+        }), 400
+
+    mimetype, extension = ExportService.FORMATS[fmt]
+    filename = f"{table}_{datetime.now().strftime('%Y%m%d')}.{extension}"
+
+    chunks = ExportService.stream(
+        fields, table, fmt, start_date, end_date, baseline_cache=baseline_cache
+    )
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
@@ -1,11 +1,28 @@
 """Tarla yönetimi endpoint'leri"""
 from flask import Blueprint, request, jsonify
+from app.utils.geometry import canonicalize, geometry_key
+from app.services.result_store import ResultStore
+from app.routes.risk import baseline_cache, detector_cache
 
 fields_bp = Blueprint('fields', __name__)
 
 # Geçici in-memory depolama (sonra PostgreSQL'e taşınacak)
 fields_db = {}
 
+# Tarla listesinin sürümü: ekleme ve silmede artar. Kimlikler silmeden sonra
+# yeniden verilebildiği için önbellekler listeyi bu sürümle tanır
+_fields_version = 0
+
+
+def fields_version():
+    """Tarla listesi sürümü (karo/bölge önbellekleri için)"""
+    return _fields_version
+
+
+def _bump_version():
+    global _fields_version
+    _fields_version += 1
+
 
 @fields_bp.route('/fields', methods=['GET'])
 def list_fields():
@@ -27,17 +44,30 @@ def create_field():
             'error': 'Koordinatlar gerekli'
         }), 400
     
+    try:
+        # Çizim doğrulanır; sadeleştirme raporu tarlayla birlikte döner
+        _, geometry_report = canonicalize(data['coordinates'])
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Geçersiz geometri: {e}'
+        }), 400
+    
     field_id = str(len(fields_db) + 1)
     
     field = {
         'id': field_id,
         'name': data.get('name', f'Tarla {field_id}'),
+        'region': data.get('region'),
         'coordinates': data['coordinates'],
+        'geometry_key': geometry_key(data['coordinates']),
+        'geometry_report': geometry_report,
         'created_at': data.get('created_at'),
         'baseline_calculated': False
     }
     
     fields_db[field_id] = field
+    _bump_version()
     
     return jsonify({
         'success': True,
@@ -70,6 +100,12 @@ def delete_field(field_id):
         }), 404
     
     del fields_db[field_id]
+    _bump_version()
+    
+    # Kimlik sonraki tarlaya verilebilir: eski sonuçlar ve baseline taşınmasın
+    ResultStore.forget(field_id)
+    baseline_cache.pop(field_id, None)
+    detector_cache.pop(field_id, None)
     
     return jsonify({
         'success': True,
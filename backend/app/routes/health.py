@@ -0,0 +1,57 @@
+"""Sağlık ve hazırlık endpoint'leri"""
+from flask import Blueprint, jsonify
+from app.services.gee_auth import GEEInitializer
+from app.services.scheduler import WorkScheduler
+from app.services.observation_store import ObservationStore
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/health', methods=['GET'])
+def health():
+    """Süreç ayakta mı (GEE durumundan bağımsız)"""
+    return jsonify({
+        'success': True,
+        'status': 'ok'
+    })
+
+
+@health_bp.route('/ready', methods=['GET'])
+def ready():
+    """
+    Hazırlık durumu (orkestratör için)
+    GEE bağlantısı kurulana kadar 503 döner: 'initializing' (henüz
+    denenmedi veya sürüyor) ya da 'failed' (son deneme başarısız)
+    """
+    gee = GEEInitializer.status()
+
+    if gee['ready']:
+        status, code = 'ready', 200
+    elif gee['state'] == GEEInitializer.FAILED:
+        status, code = 'failed', 503
+    else:
+        status, code = 'initializing', 503
+
+    return jsonify({
+        'success': code == 200,
+        'status': status,
+        'gee': gee
+    }), code
+
+
+@health_bp.route('/scheduler/metrics', methods=['GET'])
+def scheduler_metrics():
+    """GEE zamanlayıcısı: sınıf başına kuyruk derinliği ve bekleme süreleri"""
+    return jsonify({
+        'success': True,
+        'scheduler': WorkScheduler.metrics()
+    })
+
+
+@health_bp.route('/observations/memory', methods=['GET'])
+def observation_memory():
+    """Sütun bazlı gözlem deposunun bellek kullanımı (pandas karşılığıyla)"""
+    return jsonify({
+        'success': True,
+        'memory': ObservationStore.memory_report()
+    })
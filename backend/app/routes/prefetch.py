@@ -0,0 +1,46 @@
+"""Harita görünümü önden yükleme endpoint'i"""
+from flask import Blueprint, request, jsonify
+from app.routes.fields import fields_db
+from app.services.prefetch_service import PrefetchService
+
+prefetch_bp = Blueprint('prefetch', __name__)
+
+
+@prefetch_bp.route('/prefetch', methods=['POST'])
+def prefetch():
+    """
+    Görünümdeki kayıtlı tarlaları arka planda hazırla
+    Yanıt hemen döner; yenileme düşük öncelikle çalışır
+
+    Request body:
+    {
+        "bbox": [west, south, east, north]
+    }
+    """
+    data = request.get_json()
+    bbox = (data or {}).get('bbox')
+
+    try:
+        west, south, east, north = (float(v) for v in bbox)
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': 'bbox [west, south, east, north] olmalı'
+        }), 400
+
+    if west > east or south > north:
+        return jsonify({
+            'success': False,
+            'error': 'Geçersiz bbox'
+        }), 400
+
+    visible = PrefetchService.fields_in_bbox(
+        list(fields_db.values()), (west, south, east, north)
+    )
+    counts = PrefetchService.schedule(visible)
+
+    return jsonify({
+        'success': True,
+        'in_view': len(visible),
+        **counts
+    }), 202
@@ -0,0 +1,64 @@
+"""Bölge bazlı risk özetleri endpoint'leri"""
+from flask import Blueprint, request, jsonify
+from app.routes.fields import fields_db, fields_version
+from app.services.region_service import RegionService
+
+regions_bp = Blueprint('regions', __name__)
+
+
+@regions_bp.route('/regions', methods=['GET'])
+def list_regions():
+    """Tüm bölgelerin risk özeti (tarlanın `region` özniteliğine göre)"""
+    return jsonify({
+        'success': True,
+        'regions': RegionService.regions(fields_db, fields_version())
+    })
+
+
+@regions_bp.route('/regions/<name>', methods=['GET'])
+def get_region(name):
+    """Tek bölgenin risk özeti"""
+    summaries = RegionService.regions(fields_db, fields_version(), name)
+
+    if not summaries:
+        return jsonify({
+            'success': False,
+            'error': 'Bölge bulunamadı'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        **summaries[0]
+    })
+
+
+@regions_bp.route('/regions/aggregate', methods=['POST'])
+def aggregate_polygon():
+    """
+    Poligon içindeki kayıtlı tarlaların risk özeti
+
+    Request body:
+    {
+        "coordinates": [[lon, lat], ...]
+    }
+    """
+    data = request.get_json()
+
+    if not data or 'coordinates' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Koordinatlar gerekli'
+        }), 400
+
+    try:
+        summary = RegionService.polygon(fields_db, fields_version(), data['coordinates'])
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Geçersiz geometri: {e}'
+        }), 400
+
+    return jsonify({
+        'success': True,
+        **summary
+    })
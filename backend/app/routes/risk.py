@@ -1,29 +1,31 @@
 """Risk analizi endpoint'leri"""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, timedelta
 from app.services.gee_service import GEEService
 from app.services.baseline_service import BaselineService
 from app.services.ml_service import MLService
+from app.services.result_store import ResultStore
+from app.services.change_detector import ChangeDetector
+from app.services.observation_store import ObservationStore
+from app.services.prefetch_service import PrefetchService
+from app.services.smoothing_service import SmoothingService
+from app.utils.serialization import dataframe_to_columns, json_response, wants_columnar
+from app.utils.geometry import geometry_key
+from app.utils.http_cache import (
+    read_query, redirect_if_not_canonical, cached_response, is_closed_range
+)
 
 risk_bp = Blueprint('risk', __name__)
 
 # Baseline cache (geçici, sonra DB'ye taşınacak)
 baseline_cache = {}
 
+# Tarla başına değişim dedektörü durumu (baseline ile birlikte tutulur)
+detector_cache = {}
 
-@risk_bp.route('/baseline', methods=['POST'])
-def calculate_baseline():
-    """
-    Tarla için baseline hesapla
-    
-    Request body:
-    {
-        "field_id": "1",
-        "coordinates": [32.5, 37.9]
-    }
-    """
-    data = request.get_json()
-    
+
+def _baseline(data):
+    """Baseline yanıtını üret (POST ve GET ortak)"""
     field_id = data.get('field_id')
     coordinates = data.get('coordinates')
     
@@ -42,9 +44,10 @@ def calculate_baseline():
                 'error': 'Baseline hesaplanamadı, yeterli veri yok'
             }), 404
         
-        # Cache'e kaydet
+        # Cache'e kaydet (yeni baseline ile dedektör sıfırdan başlar)
         if field_id:
             baseline_cache[field_id] = baseline
+            detector_cache.pop(field_id, None)
         
         return jsonify({
             'success': True,
@@ -58,6 +61,84 @@ def calculate_baseline():
         }), 500
 
 
+@risk_bp.route('/baseline', methods=['POST'])
+def calculate_baseline():
+    """
+    Tarla için baseline hesapla
+    
+    Request body:
+    {
+        "field_id": "1",
+        "coordinates": [32.5, 37.9]
+    }
+    """
+    return _baseline(request.get_json())
+
+
+@risk_bp.route('/baseline', methods=['GET'])
+def calculate_baseline_get():
+    """
+    Önbelleklenebilir baseline (tarla cache'ine yazmaz)
+    GET /api/baseline?coords=32.5,37.9
+    
+    Baseline yılları geçmişte kaldığı için sonuç değişmez: güçlü ETag ve
+    immutable Cache-Control ile döner.
+    """
+    try:
+        params, data = read_query(())
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    years = current_app.config['BASELINE_YEARS']
+    closed = is_closed_range(f'{int(years[-1]) + 1}-01-01')
+    
+    return (redirect_if_not_canonical(params) or
+            cached_response('baseline', params, closed, lambda: _baseline(data)))
+
+
+def _cached_baseline(field_id):
+    """Tarlanın önbellekteki baseline'ı (yoksa None)"""
+    if field_id and field_id in baseline_cache:
+        return baseline_cache[field_id]
+    return None
+
+
+def _store_baseline(field_id, baseline):
+    """Yeni baseline'ı önbelleğe yaz (dedektör sıfırdan başlar)"""
+    if field_id:
+        baseline_cache[field_id] = baseline
+        detector_cache.pop(field_id, None)
+
+
+def _risk_payload(field_id, current, baseline, timeseries, risk):
+    """
+    Risk sonucunu kaydet, değişim dedektörünü güncelle ve yanıtı üret
+    (senkron ve async sunum ortak)
+    """
+    # Risk geçmişine kaydet
+    if field_id:
+        ResultStore.record(field_id, current, risk)
+    
+    # Değişim dedektörü: yalnızca yeni gözlemler işlenir
+    change_detection = None
+    if field_id and not timeseries.empty:
+        state = detector_cache.setdefault(field_id, ChangeDetector.new_state())
+        ChangeDetector.update_from_timeseries(
+            state, SmoothingService.quality(timeseries), baseline
+        )
+        change_detection = ChangeDetector.status(state)
+    
+    return {
+        'success': True,
+        'current': current,
+        'risk': risk,
+        'change_detection': change_detection
+    }
+
+
 @risk_bp.route('/risk', methods=['POST'])
 def calculate_risk():
     """
@@ -81,8 +162,12 @@ def calculate_risk():
         }), 400
     
     try:
+        # Son 30 günün verisi (güncel durum ve trend için; prefetch
+        # edilmişse önbellekten)
+        timeseries = PrefetchService.recent_timeseries(coordinates)
+        
         # Güncel durum
-        current = GEEService.get_current_status(coordinates)
+        current = GEEService.best_observation(timeseries)
         
         if current is None:
             return jsonify({
@@ -91,6 +176,62 @@ def calculate_risk():
             }), 404
         
         # Baseline (cache'den veya yeni hesapla)
+        baseline = _cached_baseline(field_id)
+        if baseline is None:
+            baseline = BaselineService.calculate_baseline(coordinates)
+            _store_baseline(field_id, baseline)
+        
+        if not baseline or not baseline['baseline']:
+            return jsonify({
+                'success': False,
+                'error': 'Baseline hesaplanamadı'
+            }), 404
+        
+        # Risk hesapla (trend yumuşatılmış seriden)
+        risk = MLService.predict_risk(
+            current, baseline, SmoothingService.smooth_recent(coordinates, timeseries)
+        )
+        
+        return jsonify(_risk_payload(field_id, current, baseline, timeseries, risk))
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@risk_bp.route('/risk/replay', methods=['POST'])
+def replay_risk():
+    """
+    Geçmiş risk analizi: serideki her gözlem tarihi için risk skoru
+    Eşik testleri (backtest) ve risk zaman serisi grafiği için
+    
+    Request body:
+    {
+        "field_id": "1",               (opsiyonel, cache'den baseline almak için)
+        "coordinates": [32.5, 37.9],
+        "start_date": "2022-01-01",    (opsiyonel, varsayılan 1 yıl önce)
+        "end_date": "2024-01-01",      (opsiyonel)
+        "format": "columnar"           (opsiyonel)
+    }
+    """
+    data = request.get_json()
+    
+    field_id = data.get('field_id')
+    coordinates = data.get('coordinates')
+    
+    if not coordinates:
+        return jsonify({
+            'success': False,
+            'error': 'Koordinatlar gerekli'
+        }), 400
+    
+    end_date = data.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+    start_date = data.get('start_date',
+        (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'))
+    
+    try:
         if field_id and field_id in baseline_cache:
             baseline = baseline_cache[field_id]
         else:
@@ -104,22 +245,45 @@ def calculate_risk():
                 'error': 'Baseline hesaplanamadı'
             }), 404
         
-        # Son 4 haftanın verisi (trend için)
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-        timeseries = GEEService.get_timeseries(coordinates, start_date, end_date)
+        # Kapalı aralığın serisi bellekte sütun olarak tutulur (tekrar GEE yok)
+        key = f'replay|{geometry_key(coordinates)}|{start_date}|{end_date}'
+        closed = is_closed_range(end_date)
+        series = ObservationStore.view(key) if closed else None
         
-        # Risk hesapla
-        risk = MLService.predict_risk(current, baseline, timeseries)
+        if series is None:
+            df = GEEService.get_timeseries(coordinates, start_date, end_date)
+            
+            if df.empty:
+                return jsonify({
+                    'success': False,
+                    'error': 'Bu tarih aralığında veri bulunamadı'
+                }), 404
+            
+            # Kaliteli gözlemler
+            series = SmoothingService.quality(df)
+            if closed:
+                ObservationStore.put(key, series)
+                series = ObservationStore.view(key)
         
-        return jsonify({
+        replay = MLService.replay_risk(series, baseline)
+        
+        level_counts = replay['final_level'].value_counts().to_dict()
+        payload = {
             'success': True,
-            'current': current,
-            'risk': risk
-        })
+            'count': len(replay),
+            'level_counts': level_counts
+        }
+        
+        if wants_columnar(data):
+            payload['format'] = 'columnar'
+            payload['replay'] = dataframe_to_columns(replay)
+        else:
+            payload['replay'] = replay.to_dict('records')
+        
+        return json_response(payload)
         
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
@@ -0,0 +1,49 @@
+"""Risk haritası karo endpoint'i"""
+import hashlib
+from flask import Blueprint, request, jsonify, current_app
+from app.routes.fields import fields_db, fields_version
+from app.services.tile_service import TileService
+from app.utils.serialization import json_response
+
+tiles_bp = Blueprint('tiles', __name__)
+
+MAX_ZOOM = 22
+
+
+@tiles_bp.route('/tiles/risk/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def risk_tile(z, x, y):
+    """
+    Kayıtlı tarlaların risk karosu (Web Mercator z/x/y)
+    Düşük zoom'da kümeler, yüksek zoom'da karo koordinatlarında geometriler
+
+    Yanıt (sütun bazlı):
+    {
+        "type": "clusters" | "features",
+        "extent": 4096,
+        "clusters": {"x": [...], "y": [...], "count": [...], "low": [...], ...}
+        "features": {"id": [...], "level": [...], "score": [...], "geometry": [[x, y, ...], ...]}
+    }
+    level: 0 Düşük, 1 Orta, 2 Yüksek, -1 sonuç yok
+    """
+    if z > MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        return jsonify({
+            'success': False,
+            'error': 'Geçersiz karo koordinatı'
+        }), 400
+
+    def make_etag(signature):
+        return hashlib.sha1(f'{signature}|{z}/{x}/{y}'.encode()).hexdigest()
+
+    etag = make_etag(TileService.signature(fields_db, fields_version()))
+
+    # Tarla ve sonuçlar değişmediyse karo yeniden gönderilmez
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        payload, signature = TileService.risk_tile(fields_db, fields_version(), z, x, y)
+        etag = make_etag(signature)
+        response = json_response({'success': True, **payload})
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
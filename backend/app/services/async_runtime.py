@@ -0,0 +1,86 @@
+"""
+Async Çalışma Ortamı
+ASGI sunumunda GEE çağrıları sınırlı bir thread havuzunda beklenebilir
+(awaitable) görevler olarak, CPU yoğun pandas/ML işleri ise süreç
+havuzunda çalışır. Olay döngüsü bloklanmaz: yüzlerce eşzamanlı analiz
+sabit sayıda thread ile taşınır, bekleyen istekler yalnızca kuyrukta yer
+kaplar.
+"""
+import os
+import asyncio
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from flask import current_app
+
+
+def _init_cpu_worker():
+    """Süreç havuzu worker'ı: servisler current_app okuduğu için uygulama bağlamı"""
+    os.environ['GEE_WARMUP'] = '0'
+    from app import create_app
+    create_app().app_context().push()
+
+
+class AsyncRuntime:
+    """GEE thread havuzu ve CPU süreç havuzu"""
+
+    _lock = threading.Lock()
+    _gee_executor = None
+    _cpu_executor = None
+
+    @classmethod
+    def start(cls, config):
+        """Havuzları oluştur (tekrar çağrılırsa bir şey yapmaz)"""
+        with cls._lock:
+            if cls._gee_executor is None:
+                cls._gee_executor = ThreadPoolExecutor(
+                    max_workers=config['ASYNC_GEE_THREADS'],
+                    thread_name_prefix='gee-async'
+                )
+            if cls._cpu_executor is None:
+                # fork, çok thread'li süreçte güvenli değil
+                cls._cpu_executor = ProcessPoolExecutor(
+                    max_workers=config['ASYNC_CPU_PROCESSES'],
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_cpu_worker
+                )
+
+    @classmethod
+    def shutdown(cls):
+        """Havuzları kapat (çalışan işler bitirilir)"""
+        with cls._lock:
+            for executor in (cls._gee_executor, cls._cpu_executor):
+                if executor is not None:
+                    executor.shutdown(wait=True, cancel_futures=True)
+            cls._gee_executor = cls._cpu_executor = None
+
+    @classmethod
+    async def warmup(cls):
+        """CPU worker'larını önceden başlat (ilk istek içe aktarma beklemesin)"""
+        loop = asyncio.get_running_loop()
+        processes = current_app.config['ASYNC_CPU_PROCESSES']
+        await asyncio.gather(*(
+            loop.run_in_executor(cls._cpu_executor, os.getpid) for _ in range(processes)
+        ))
+
+    @classmethod
+    async def gee(cls, fn, *args):
+        """
+        GEE çağrısını thread havuzunda bekle
+        Bağlam değişkenleri (uygulama bağlamı, zamanlayıcı önceliği) taşınır
+        """
+        cls.start(current_app.config)
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(cls._gee_executor, context.run, fn, *args)
+
+    @classmethod
+    async def cpu(cls, fn, *args):
+        """
+        CPU yoğun işi süreç havuzunda bekle
+        fn ve argümanlar pickle edilebilir olmalı (modül düzeyi fonksiyon)
+        """
+        cls.start(current_app.config)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(cls._cpu_executor, fn, *args)
@@ -0,0 +1,168 @@
+"""
+Ham Yansıma (Band) Önbelleği
+Tarla başına, görüntü bazlı band ortalamalarını yerel diskte (.npz)
+saklar. Önbellekte olmayan tarih aralıkları GEE'den çekilip eklenir;
+indeksler bu depo üzerinden yerelde hesaplanır.
+"""
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.services.gee_service import GEEService
+from app.utils.geometry import geometry_key
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+class BandStore:
+    """Tarla bazlı band istatistikleri deposu"""
+
+    @staticmethod
+    def key_for(coordinates):
+        """Kanonik geometriden dosya anahtarı üret"""
+        return geometry_key(coordinates)
+
+    @staticmethod
+    def _path(key):
+        return os.path.join(current_app.config['BAND_CACHE_DIR'], f'{key}.npz')
+
+    @staticmethod
+    def load(key):
+        """
+        Depodaki kaydı yükle
+
+        Returns:
+            dict veya None: start, end, bands, day, clear, values
+        """
+        path = BandStore._path(key)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            return {
+                'start': str(data['start']),
+                'end': str(data['end']),
+                'bands': [str(b) for b in data['bands']],
+                'day': data['day'],
+                'clear': data['clear'],
+                'values': data['values']
+            }
+
+    @staticmethod
+    def save(key, record):
+        """Kaydı atomik olarak diske yaz"""
+        path = BandStore._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(
+            tmp_path,
+            start=np.array(record['start']),
+            end=np.array(record['end']),
+            bands=np.array(record['bands']),
+            day=record['day'].astype(np.int32),
+            clear=record['clear'].astype(np.float32),
+            values=record['values'].astype(np.float32)
+        )
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _from_frame(df, bands):
+        """GEE DataFrame'ini kompakt dizilere çevir"""
+        if df.empty:
+            return {
+                'day': np.empty(0, dtype=np.int32),
+                'clear': np.empty(0, dtype=np.float32),
+                'values': np.empty((0, len(bands)), dtype=np.float32)
+            }
+
+        days = (df['date'].to_numpy().astype('datetime64[D]') - EPOCH).astype(np.int32)
+        return {
+            'day': days,
+            'clear': df['clear_pixel_ratio'].to_numpy(dtype=np.float32),
+            'values': df[bands].to_numpy(dtype=np.float32)
+        }
+
+    @staticmethod
+    def to_frame(record, start_date=None, end_date=None):
+        """Depo kaydını (isteğe bağlı tarih aralığında) DataFrame'e çevir"""
+        day = record['day']
+        mask = np.ones(len(day), dtype=bool)
+
+        if start_date:
+            mask &= day >= (np.datetime64(start_date, 'D') - EPOCH).astype(np.int32)
+        if end_date:
+            mask &= day < (np.datetime64(end_date, 'D') - EPOCH).astype(np.int32)
+
+        df = pd.DataFrame(record['values'][mask], columns=record['bands'])
+        df.insert(0, 'clear_pixel_ratio', record['clear'][mask])
+        df.insert(0, 'date', pd.to_datetime(EPOCH + day[mask]))
+
+        return df
+
+    @staticmethod
+    def _merge(record, fetched):
+        """Yeni çekilen satırları kayda ekle (aynı gün tekrar etmez)"""
+        day = np.concatenate([record['day'], fetched['day']])
+        clear = np.concatenate([record['clear'], fetched['clear']])
+        values = np.concatenate([record['values'], fetched['values']])
+
+        # Aynı gün iki kez gelirse yeni çekilen kalır
+        order = np.argsort(day, kind='stable')[::-1]
+        _, first = np.unique(day[order], return_index=True)
+        keep = np.sort(order[first])
+
+        return {
+            'day': day[keep],
+            'clear': clear[keep],
+            'values': values[keep]
+        }
+
+    @staticmethod
+    def ensure(coordinates, start_date, end_date):
+        """
+        İstenen aralığın band verisini döndür, eksik kısımları GEE'den tamamla
+
+        Son BAND_CACHE_LAG_DAYS gün "kapalı" sayılmaz (geç gelen görüntüler
+        için bir sonraki çağrıda tekrar çekilir).
+
+        Returns:
+            DataFrame: date, clear_pixel_ratio, band sütunları
+        """
+        bands = list(current_app.config['BAND_CACHE_BANDS'])
+        lag = current_app.config['BAND_CACHE_LAG_DAYS']
+        closed_until = (datetime.now() - timedelta(days=lag)).strftime('%Y-%m-%d')
+
+        key = BandStore.key_for(coordinates)
+        record = BandStore.load(key)
+
+        # Band listesi değiştiyse önbellek geçersiz
+        if record is not None and record['bands'] != bands:
+            record = None
+
+        if record is None:
+            missing = [(start_date, end_date)]
+            record = {'start': start_date, 'end': start_date, 'bands': bands,
+                      **BandStore._from_frame(pd.DataFrame(), bands)}
+        else:
+            missing = []
+            if start_date < record['start']:
+                missing.append((start_date, record['start']))
+            # Kayıt sonu ile istek başı arasındaki boşluk da çekilir; aksi
+            # halde kapsanmış sayılır ama hiç indirilmemiş olur
+            if end_date > record['end']:
+                missing.append((record['end'], end_date))
+
+        if missing:
+            for fetch_start, fetch_end in missing:
+                df = GEEService.get_band_timeseries(
+                    coordinates, fetch_start, fetch_end, bands
+                )
+                record.update(BandStore._merge(record, BandStore._from_frame(df, bands)))
+
+            record['start'] = min(record['start'], start_date)
+            record['end'] = max(record['end'], min(end_date, closed_until))
+            BandStore.save(key, record)
+
+        return BandStore.to_frame(record, start_date, end_date)
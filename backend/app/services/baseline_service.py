@@ -2,16 +2,37 @@
 Baseline Hesaplama Servisi
 Her tarla için haftalık μ (ortalama) ve σ (standart sapma) hesaplar
 Nadas dönemlerini tespit eder ve es geçer
+Özet (sketch) modunda ayrıca medyan, IQR ve p10/p90 tutulur; Z-skorları
+bu dayanıklı (robust) istatistiklerden hesaplanır
 """
+import threading
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from flask import current_app
 from app.services.gee_service import GEEService
+from app.services.trend_engine import TrendEngine
+from app.services.observation_store import ObservationStore
+from app.services.smoothing_service import SmoothingService
+from app.services.quantile_sketch import WeeklySketch
+from app.utils.geometry import geometry_key
+
+
+# Özet modunda haftalık okunan kantiller: p10, Q1, medyan, Q3, p90
+QUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+# Normal dağılımda IQR / σ oranı (IQR'dan dayanıklı σ tahmini)
+IQR_TO_SIGMA = 1.349
 
 
 class BaselineService:
     """Baseline hesaplama ve yönetimi"""
     
+    _lock = threading.Lock()
+    
+    # Özet modunda hesaplanmış baseline'lar: (geometri, yıllar, nadas) -> dict
+    _sketch_cache = OrderedDict()
+    
     @staticmethod
     def detect_nadas_periods(df):
         """
@@ -59,6 +80,10 @@ class BaselineService:
     def calculate_baseline(coordinates, exclude_nadas=True):
         """
         Haftalık baseline hesapla
+        BASELINE_MODE 'sketch' ise yıllar tek tek çekilip haftalık özetlere
+        akıtılır (bkz. sketch_baseline). 'exact' modunda çok yıllık seri
+        ObservationStore'da tutulur; aynı tarla için tekrar hesaplamada
+        GEE'ye gidilmez
         
         Args:
             coordinates: Tarla koordinatları
@@ -67,71 +92,267 @@ class BaselineService:
         Returns:
             DataFrame: hafta, ndvi_mu, ndvi_sigma, ndmi_mu, ndmi_sigma, sample_count
         """
-        # Çok yıllık veri çek
-        df = GEEService.get_baseline_data(coordinates)
+        if current_app.config['BASELINE_MODE'] == 'sketch':
+            return BaselineService.sketch_baseline(coordinates, exclude_nadas)
         
-        if df.empty:
-            return pd.DataFrame()
+        years = current_app.config['BASELINE_YEARS']
+        key = f"baseline|{geometry_key(coordinates)}|{','.join(years)}"
+        
+        view = ObservationStore.view(key)
+        if view is None:
+            # Çok yıllık veri çek
+            df = GEEService.get_baseline_data(coordinates)
+            
+            if df.empty:
+                return pd.DataFrame()
+            
+            ObservationStore.put(key, df)
+            view = ObservationStore.view(key)
+        
+        return BaselineService.baseline_from_arrays(view, exclude_nadas)
+    
+    @staticmethod
+    def _nadas_mask(day, ndvi, week):
+        """
+        Nadas: (yıl, hafta) ortalaması eşiğin altında kalan ardışık haftalar
+        detect_nadas_periods ile aynı kurallar; diziler yıl içinde kaldığı
+        için yıl yıl çağrılabilir
         
-        # Kalite filtresi: Temiz piksel oranı > %50
-        df = df[df['clear_pixel_ratio'] > 0.5].copy()
+        Returns:
+            tuple: (tutulacak gözlem maskesi, nadas dönemleri)
+        """
+        threshold = current_app.config['NADAS_NDVI_THRESHOLD']
+        min_consecutive = current_app.config['NADAS_CONSECUTIVE_WEEKS']
+        year = ObservationStore.years(day)
         
-        if df.empty:
+        groups, inverse = np.unique(year * 100 + week, return_inverse=True)
+        weekly = np.bincount(inverse, weights=ndvi) / np.bincount(inverse)
+        group_year = groups // 100
+        group_week = groups % 100
+        
+        low = weekly < threshold
+        # Düşük/yüksek geçişinde veya yıl değişiminde yeni dizi başlar
+        change = np.ones(len(groups), dtype=bool)
+        change[1:] = (low[1:] != low[:-1]) | (group_year[1:] != group_year[:-1])
+        run_id = np.cumsum(change) - 1
+        run_length = np.bincount(run_id)
+        
+        excluded = low & (run_length[run_id] >= min_consecutive)
+        nadas_periods = []
+        for run in np.unique(run_id[excluded]):
+            members = np.flatnonzero(run_id == run)
+            nadas_periods.append({
+                'year': int(group_year[members[0]]),
+                'start_week': int(group_week[members].min()),
+                'end_week': int(group_week[members].max()),
+                'duration_weeks': len(members)
+            })
+        
+        return ~excluded[inverse], nadas_periods
+    
+    @staticmethod
+    def baseline_from_arrays(view, exclude_nadas=True):
+        """
+        Sütun dizilerinden (ObservationStore dilimi) haftalık baseline
+        detect_nadas_periods ve pandas groupby ile aynı kurallar
+        
+        Args:
+            view: day, ndvi_mean, ndmi_mean, clear_pixel_ratio dizileri
+        """
+        # Kalite filtresi: Temiz piksel oranı > MIN_CLEAR_PIXEL_RATIO
+        quality = SmoothingService.quality_mask(view['clear_pixel_ratio'])
+        day = view['day'][quality]
+        ndvi = view['ndvi_mean'][quality].astype(np.float64)
+        ndmi = view['ndmi_mean'][quality].astype(np.float64)
+        
+        if len(day) == 0:
             return pd.DataFrame()
         
-        # Hafta numarası ekle
-        df['week'] = df['date'].dt.isocalendar().week
+        week = ObservationStore.iso_weeks(day)
         
-        # Nadas dönemlerini tespit et
         nadas_periods = []
         if exclude_nadas:
-            nadas_periods = BaselineService.detect_nadas_periods(df)
-            
-            # Nadas dönemlerini çıkar
-            for period in nadas_periods:
-                mask = (
-                    (df['date'].dt.year == period['year']) &
-                    (df['week'] >= period['start_week']) &
-                    (df['week'] <= period['end_week'])
-                )
-                df = df[~mask]
-        
-        if df.empty:
+            keep, nadas_periods = BaselineService._nadas_mask(day, ndvi, week)
+            day, ndvi, ndmi, week = day[keep], ndvi[keep], ndmi[keep], week[keep]
+        
+        if len(day) == 0:
             return pd.DataFrame()
         
-        # Haftalık istatistikler hesapla
-        baseline = df.groupby('week').agg({
-            'ndvi_mean': ['mean', 'std', 'count'],
-            'ndmi_mean': ['mean', 'std']
-        }).reset_index()
-        
-        # Sütun isimlerini düzelt
-        baseline.columns = [
-            'week', 
-            'ndvi_mu', 'ndvi_sigma', 'sample_count',
-            'ndmi_mu', 'ndmi_sigma'
+        # Haftalık istatistikler (ddof=1, pandas std ile aynı)
+        weeks, inverse = np.unique(week, return_inverse=True)
+        count = np.bincount(inverse)
+        
+        def mean_std(values):
+            mean = np.bincount(inverse, weights=values) / count
+            sq = np.bincount(inverse, weights=(values - mean[inverse]) ** 2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                std = np.sqrt(sq / (count - 1))
+            # Tek örnekte küçük bir değer, minimum sigma (Z-skoru patlamasın)
+            std = np.where(count > 1, std, 0.05)
+            return mean, np.maximum(std, 0.03)
+        
+        ndvi_mu, ndvi_sigma = mean_std(ndvi)
+        ndmi_mu, ndmi_sigma = mean_std(ndmi)
+        
+        baseline = [
+            {
+                'week': int(weeks[i]),
+                'ndvi_mu': float(ndvi_mu[i]),
+                'ndvi_sigma': float(ndvi_sigma[i]),
+                'sample_count': int(count[i]),
+                'ndmi_mu': float(ndmi_mu[i]),
+                'ndmi_sigma': float(ndmi_sigma[i])
+            }
+            for i in range(len(weeks))
         ]
         
-        # NaN sigma değerlerini küçük bir değerle doldur (tek örnek varsa)
-        baseline['ndvi_sigma'] = baseline['ndvi_sigma'].fillna(0.05)
-        baseline['ndmi_sigma'] = baseline['ndmi_sigma'].fillna(0.05)
+        return {
+            'baseline': baseline,
+            'nadas_periods': nadas_periods,
+            'total_samples': len(day),
+            'years_used': np.unique(ObservationStore.years(day)).tolist()
+        }
+    
+    @staticmethod
+    def stream_chunk(sketches, df, exclude_nadas=True):
+        """
+        Bir parça gözlemi (ör. bir yıl) haftalık özetlere ekle
+        Nadas tespiti yıl içinde kaldığından parça parça uygulanabilir
+        
+        Args:
+            sketches: {'ndvi': WeeklySketch, 'ndmi': WeeklySketch}
+            df: Zaman serisi DataFrame (date, ndvi_mean, ndmi_mean, clear_pixel_ratio)
+        
+        Returns:
+            tuple: (nadas dönemleri, eklenen gözlem sayısı, yıllar)
+        """
+        view = ObservationStore.columns_from_frame(df)
+        quality = SmoothingService.quality_mask(view['clear_pixel_ratio'])
+        day = view['day'][quality]
+        ndvi = view['ndvi_mean'][quality]
+        ndmi = view['ndmi_mean'][quality]
+        
+        if len(day) == 0:
+            return [], 0, []
         
-        # Minimum sigma değeri (çok düşükse Z-skoru patlar)
-        baseline['ndvi_sigma'] = baseline['ndvi_sigma'].clip(lower=0.03)
-        baseline['ndmi_sigma'] = baseline['ndmi_sigma'].clip(lower=0.03)
+        week = ObservationStore.iso_weeks(day)
         
-        # Nadas bilgisini ekle
-        baseline_dict = {
-            'baseline': baseline.to_dict('records'),
+        nadas_periods = []
+        if exclude_nadas:
+            keep, nadas_periods = BaselineService._nadas_mask(day, ndvi, week)
+            day, ndvi, ndmi, week = day[keep], ndvi[keep], ndmi[keep], week[keep]
+        
+        sketches['ndvi'].update(week, ndvi)
+        sketches['ndmi'].update(week, ndmi)
+        
+        return nadas_periods, len(day), np.unique(ObservationStore.years(day)).tolist()
+    
+    @staticmethod
+    def baseline_from_sketches(sketches):
+        """
+        Haftalık özetlerden baseline satırları
+        μ/σ akan momentlerden (exact mod ile aynı kurallar), medyan, IQR ve
+        p10/p90 kantil özetinden
+        """
+        weeks = np.flatnonzero(sketches['ndvi'].n > 0)
+        columns = {}
+        
+        for index_type, sketch in sketches.items():
+            n = sketch.n
+            p10, q1, median, q3, p90 = sketch.quantiles(QUANTILES).T
+            
+            # Tek örnekte küçük bir değer, minimum sigma (Z-skoru patlamasın)
+            sigma = np.maximum(np.where(n > 1, sketch.std(), 0.05), 0.03)
+            robust_sigma = np.maximum(np.where(n > 1, (q3 - q1) / IQR_TO_SIGMA, 0.05), 0.03)
+            
+            columns.update({
+                f'{index_type}_mu': sketch.mean,
+                f'{index_type}_sigma': sigma,
+                f'{index_type}_median': median,
+                f'{index_type}_iqr': q3 - q1,
+                f'{index_type}_p10': p10,
+                f'{index_type}_p90': p90,
+                f'{index_type}_robust_sigma': robust_sigma
+            })
+        
+        count = sketches['ndvi'].n
+        return [
+            {
+                'week': int(week),
+                'sample_count': int(count[week]),
+                **{name: float(values[week]) for name, values in columns.items()}
+            }
+            for week in weeks
+        ]
+    
+    @staticmethod
+    def sketch_baseline(coordinates, exclude_nadas=True):
+        """
+        Sabit bellekli dayanıklı baseline
+        Yıllar GEE'den tek tek çekilir ve haftalık kantil özetlerine akıtılır;
+        aynı anda yalnızca bir yılın serisi bellektedir. Sonuç (hafta başına
+        birkaç sayı) tarla başına önbelleklenir.
+        
+        Returns:
+            dict: baseline (μ, σ, medyan, IQR, p10, p90, dayanıklı σ),
+                  nadas_periods, total_samples, years_used
+        """
+        config = current_app.config
+        years = config['BASELINE_YEARS']
+        key = (geometry_key(coordinates), tuple(years), exclude_nadas)
+        
+        with BaselineService._lock:
+            cached = BaselineService._sketch_cache.get(key)
+            if cached is not None:
+                BaselineService._sketch_cache.move_to_end(key)
+                return cached
+        
+        bins, exact = config['BASELINE_SKETCH_BINS'], config['BASELINE_SKETCH_EXACT']
+        sketches = {'ndvi': WeeklySketch(bins, exact), 'ndmi': WeeklySketch(bins, exact)}
+        nadas_periods, years_used, total = [], [], 0
+        
+        for year in years:
+            df = GEEService.get_baseline_data(coordinates, [year])
+            if df.empty:
+                continue
+            
+            periods, count, chunk_years = BaselineService.stream_chunk(
+                sketches, df, exclude_nadas
+            )
+            nadas_periods += periods
+            years_used += chunk_years
+            total += count
+        
+        if total == 0:
+            return pd.DataFrame()
+        
+        result = {
+            'baseline': BaselineService.baseline_from_sketches(sketches),
             'nadas_periods': nadas_periods,
-            'total_samples': len(df),
-            'years_used': df['date'].dt.year.unique().tolist()
+            'total_samples': total,
+            'years_used': sorted(set(years_used))
         }
         
-        return baseline_dict
+        with BaselineService._lock:
+            BaselineService._sketch_cache[key] = result
+            while len(BaselineService._sketch_cache) > config['BASELINE_SKETCH_CACHE_SIZE']:
+                BaselineService._sketch_cache.popitem(last=False)
+        
+        return result
+    
+    @staticmethod
+    def z_columns(baseline_df, index_type='ndvi', robust=True):
+        """
+        Z-skorunun merkez ve ölçek sütunları
+        Baseline dayanıklı istatistik içeriyorsa medyan ve IQR'dan σ,
+        yoksa μ ve σ
+        """
+        if robust and f'{index_type}_median' in baseline_df.columns:
+            return f'{index_type}_median', f'{index_type}_robust_sigma'
+        return f'{index_type}_mu', f'{index_type}_sigma'
     
     @staticmethod
-    def calculate_zscore(current_value, week, baseline_df, index_type='ndvi'):
+    def calculate_zscore(current_value, week, baseline_df, index_type='ndvi', robust=True):
         """
         Z-skoru hesapla
         
@@ -140,6 +361,7 @@ class BaselineService:
             week: Hafta numarası (1-52)
             baseline_df: Baseline DataFrame
             index_type: 'ndvi' veya 'ndmi'
+            robust: Varsa medyan / IQR tabanlı dayanıklı Z-skoru
             
         Returns:
             float: Z-skoru veya None
@@ -149,8 +371,9 @@ class BaselineService:
         if week_baseline.empty:
             return None
         
-        mu = week_baseline[f'{index_type}_mu'].values[0]
-        sigma = week_baseline[f'{index_type}_sigma'].values[0]
+        center, scale = BaselineService.z_columns(baseline_df, index_type, robust)
+        mu = week_baseline[center].values[0]
+        sigma = week_baseline[scale].values[0]
         
         if sigma == 0 or pd.isna(sigma):
             return None
@@ -162,45 +385,85 @@ class BaselineService:
     @staticmethod
     def calculate_trend(df, window=3):
         """
-        Son N ölçümün trend eğimini hesapla
+        Son N ölçümün trend eğimini hesapla (gerçek gün aralıklarıyla)
+        
+        Yumuşatılmış seri (SmoothingService) verilirse pencere son N
+        gözlemin kapsadığı günlerdir: komşu ızgara noktaları süzgeç
+        nedeniyle neredeyse doğrusal olduğundan, eğim bu aralıktaki
+        yumuşatılmış değerlerden, güven ise doğrunun gözlenen değerleri
+        açıklama oranından (R²) hesaplanır.
         
         Args:
             df: Zaman serisi DataFrame (date, ndvi_mean sütunları)
             window: Kaç ölçüm kullanılacak
             
         Returns:
-            dict: slope, direction, confidence
+            dict: slope (TREND_STEP_DAYS başına), slope_per_day, direction, confidence
         """
+        if 'observed' in df.columns:
+            return BaselineService._smoothed_trend(df, window)
+        
         if len(df) < window:
             return {
                 'slope': 0,
+                'slope_per_day': 0,
                 'direction': 'insufficient_data',
                 'confidence': 0
             }
         
-        recent = df.tail(window).copy()
+        recent = df.sort_values('date').tail(window)
+        slope, slope_per_day, r2, direction = TrendEngine.series(recent, window=window)
         
-        # Basit lineer regresyon
-        x = np.arange(len(recent))
-        y = recent['ndvi_mean'].values
+        if np.isnan(slope[-1]):
+            return {
+                'slope': 0,
+                'slope_per_day': 0,
+                'direction': 'insufficient_data',
+                'confidence': 0
+            }
+        
+        return {
+            'slope': float(slope[-1]),
+            'slope_per_day': float(slope_per_day[-1]),
+            'direction': str(direction[-1]),
+            'confidence': float(r2[-1])
+        }
+
+    @staticmethod
+    def _smoothed_trend(smoothed, window):
+        """Yumuşatılmış seride son `window` gözlemin aralığındaki trend"""
+        insufficient = {
+            'slope': 0,
+            'slope_per_day': 0,
+            'direction': 'insufficient_data',
+            'confidence': 0
+        }
         
-        # Eğim hesapla
-        slope = np.polyfit(x, y, 1)[0]
+        smoothed = smoothed.sort_values('date')
+        observed = smoothed[smoothed['observed'].astype(bool)]
+        if len(observed) < window:
+            return insufficient
         
-        # Yön belirle
-        if slope < -0.03:
-            direction = 'decreasing'
-        elif slope > 0.03:
-            direction = 'increasing'
-        else:
-            direction = 'stable'
+        span = smoothed[smoothed['date'] >= observed['date'].iloc[-window]]
+        slope, slope_per_day, _, direction = TrendEngine.series(span, window=len(span))
+        if np.isnan(slope[-1]):
+            return insufficient
         
-        # Güven (R²)
-        correlation = np.corrcoef(x, y)[0, 1]
-        confidence = correlation ** 2 if not np.isnan(correlation) else 0
+        # Yumuşatılmış değerlere oturan doğru, gözlenen değerlerle karşılaştırılır
+        days = TrendEngine.day_offsets(span['date'].to_numpy())
+        fitted = (span['ndvi_mean'].to_numpy(dtype=np.float64).mean() +
+                  slope_per_day[-1] * (days - days.mean()))
+        
+        mask = span['observed'].to_numpy(dtype=bool)
+        raw = span['ndvi_raw'].to_numpy(dtype=np.float64)[mask]
+        ss_res = np.sum((raw - fitted[mask]) ** 2)
+        ss_tot = np.sum((raw - raw.mean()) ** 2)
+        # Sabit seride güven 0 (ham seriyle aynı)
+        r2 = float(np.clip(1 - ss_res / ss_tot, 0.0, 1.0)) if ss_tot > 1e-12 else 0.0
         
         return {
-            'slope': float(slope),
-            'direction': direction,
-            'confidence': float(confidence)
-        }
\ No newline at end of file
+            'slope': float(slope[-1]),
+            'slope_per_day': float(slope_per_day[-1]),
+            'direction': str(direction[-1]),
+            'confidence': r2
+        }
@@ -0,0 +1,124 @@
+"""
+Çevrimiçi Değişim Dedektörü
+Tarla başına baseline Z-skorları üzerinde tek yönlü (düşüş) CUSUM ve
+EWMA tutar. Her yeni Sentinel-2 gözlemi durumu O(1)'de günceller;
+sürekli sapma başladığı anda stres bayrağı kalkar. Durum küçük bir
+dict'tir ve baseline ile birlikte saklanır.
+"""
+import math
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.services.baseline_service import BaselineService
+
+
+class ChangeDetector:
+    """CUSUM + EWMA tabanlı artımlı stres tespiti"""
+
+    @staticmethod
+    def new_state():
+        """Boş dedektör durumu"""
+        return {
+            'last_date': None,
+            'observations': 0,
+            'ewma': 0.0,
+            'cusum': 0.0,
+            'alarm': False,
+            'alarm_since': None,
+            'last_z': None
+        }
+
+    @staticmethod
+    def update(state, date, z):
+        """
+        Tek gözlemle durumu güncelle (O(1))
+
+        Args:
+            state: Dedektör durumu (yerinde güncellenir)
+            date: Gözlem tarihi 'YYYY-MM-DD'
+            z: NDVI Z-skoru (None/NaN ise gözlem atlanır)
+
+        Returns:
+            bool: Gözlem işlendiyse True
+        """
+        if state['last_date'] is not None and date <= state['last_date']:
+            return False
+        if z is None or math.isnan(z):
+            return False
+
+        config = current_app.config
+        k = config['CUSUM_K']
+        h = config['CUSUM_H']
+        lam = config['EWMA_LAMBDA']
+        limit = config['EWMA_LIMIT']
+
+        # Düşüş yönlü CUSUM: z, -k'nın altında kaldıkça birikir
+        state['cusum'] = max(0.0, state['cusum'] - z - k)
+        state['ewma'] = lam * z + (1 - lam) * state['ewma']
+        state['observations'] += 1
+        state['last_date'] = date
+        state['last_z'] = float(z)
+
+        triggered = state['cusum'] > h or state['ewma'] < -limit
+
+        if triggered and not state['alarm']:
+            state['alarm'] = True
+            state['alarm_since'] = date
+        elif state['alarm'] and state['cusum'] == 0.0 and state['ewma'] > -limit / 2:
+            # Seri normale döndü
+            state['alarm'] = False
+            state['alarm_since'] = None
+
+        return True
+
+    @staticmethod
+    def update_from_timeseries(state, timeseries_df, baseline):
+        """
+        Seride son işlenen tarihten sonraki gözlemleri dedektöre besle
+
+        Args:
+            timeseries_df: date, ndvi_mean (kaliteli gözlemler)
+            baseline: Baseline dict
+
+        Returns:
+            int: İşlenen yeni gözlem sayısı
+        """
+        if timeseries_df.empty:
+            return 0
+
+        df = timeseries_df.sort_values('date')
+        dates = df['date'].dt.strftime('%Y-%m-%d').to_numpy()
+
+        if state['last_date'] is not None:
+            new = dates > state['last_date']
+            df, dates = df[new], dates[new]
+            if df.empty:
+                return 0
+
+        baseline_df = pd.DataFrame(baseline['baseline']).set_index('week')
+        weeks = df['date'].dt.isocalendar().week.to_numpy(dtype=np.int64)
+        stats = baseline_df.reindex(weeks)
+
+        center, scale = BaselineService.z_columns(baseline_df, 'ndvi')
+        mu = stats[center].to_numpy(dtype=np.float64)
+        sigma = stats[scale].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.where(sigma > 0, (df['ndvi_mean'].to_numpy(dtype=np.float64) - mu) / sigma, np.nan)
+
+        processed = 0
+        for date, value in zip(dates, z):
+            processed += ChangeDetector.update(state, date, float(value))
+
+        return processed
+
+    @staticmethod
+    def status(state):
+        """API yanıtı için özet"""
+        return {
+            'stress_flag': state['alarm'],
+            'since': state['alarm_since'],
+            'cusum': round(state['cusum'], 3),
+            'ewma_z': round(state['ewma'], 3),
+            'last_date': state['last_date'],
+            'observations': state['observations']
+        }
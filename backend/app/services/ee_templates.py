@@ -0,0 +1,111 @@
+"""
+Earth Engine İfade Şablonları
+Görüntü başına çıkarım grafiği (koleksiyon filtresi, bulut maskesi,
+indeksler, reducer'lar) bir kez kurulup serileştirilir. Geometri ve tarih
+aralığı yer tutucu metinlerdir: her çağrıda grafik yeniden kurulmaz,
+yalnızca serileştirilmiş metinde değerler değiştirilir. Geometri yerleşmiş
+metin tarla başına önbelleklenir.
+"""
+import json
+import threading
+from collections import OrderedDict
+import ee
+from flask import current_app
+from app.utils.geometry import canonicalize, geometry_key, is_point
+
+GEOMETRY_SLOT = '__ee_template_geometry__'
+START_SLOT = '__ee_template_start__'
+END_SLOT = '__ee_template_end__'
+
+
+class ExpressionTemplates:
+    """Serileştirilmiş EE ifadeleri için şablon ve geometri önbelleği"""
+
+    _lock = threading.Lock()
+
+    # (builder, args, nokta mı) -> yer tutuculu JSON metni
+    _templates = {}
+    # (şablon anahtarı, geometri anahtarı) -> geometrisi yerleşmiş JSON metni
+    _filled = OrderedDict()
+
+    @staticmethod
+    def _literal(value):
+        """Değerin serileştirilmiş ifadedeki JSON metin karşılığı"""
+        return json.dumps(value)
+
+    @classmethod
+    def _template(cls, key, build, args, point):
+        """Şablonu kur ve serileştir (şablon başına bir kez)"""
+        template = cls._templates.get(key)
+        if template is not None:
+            return template
+
+        # Koordinatlar sunucuda JSON metninden çözülür
+        coordinates = ee.List(ee.String(GEOMETRY_SLOT).decodeJSON())
+        expression = build(coordinates, point, START_SLOT, END_SLOT, *args)
+        template = json.dumps(ee.serializer.encode(expression, for_cloud_api=True))
+
+        for slot in (GEOMETRY_SLOT, START_SLOT, END_SLOT):
+            if cls._literal(slot) not in template:
+                raise RuntimeError(f'Şablonda yer tutucu bulunamadı: {slot}')
+
+        cls._templates[key] = template
+        return template
+
+    @classmethod
+    def expression(cls, build, args, coordinates, start_date, end_date):
+        """
+        Serileştirilmiş (Cloud API) ifade
+
+        Args:
+            build: fn(coordinates, point, start_date, end_date, *args) -> ee nesnesi
+                   coordinates bir ee.List yer tutucusudur
+            args: Grafiği değiştiren ek parametreler (şablon anahtarına girer)
+
+        Returns:
+            dict: ee.data hesaplama isteğinin 'expression' alanı
+        """
+        canonical, _ = canonicalize(coordinates)
+        point = is_point(canonical)
+        key = (build.__qualname__, tuple(args), point)
+        filled_key = (key, geometry_key(coordinates))
+
+        with cls._lock:
+            filled = cls._filled.get(filled_key)
+            if filled is not None:
+                cls._filled.move_to_end(filled_key)
+            else:
+                template = cls._template(key, build, args, point)
+                filled = template.replace(
+                    cls._literal(GEOMETRY_SLOT), cls._literal(json.dumps(canonical))
+                )
+                cls._filled[filled_key] = filled
+                while len(cls._filled) > current_app.config['EE_TEMPLATE_CACHE_SIZE']:
+                    cls._filled.popitem(last=False)
+
+        return json.loads(
+            filled
+            .replace(cls._literal(START_SLOT), cls._literal(start_date))
+            .replace(cls._literal(END_SLOT), cls._literal(end_date))
+        )
+
+    @staticmethod
+    def compute(expression):
+        """
+        Serileştirilmiş ifadeyi hesaplat (getInfo karşılığı)
+        ee.data.computeValue ile aynı REST çağrısıdır, ifade yeniden
+        serileştirilmez. İç yardımcılar earthengine-api 1.7.x ile sınanmıştır
+        (requirements.txt'de sabit); istemcide farklıysa ifade çözülüp genel
+        ee.data.computeValue yolundan gönderilir
+        """
+        try:
+            body = {'expression': expression}
+            ee.data._maybe_populate_workload_tag(body)
+            request = ee.data._get_cloud_projects().value().compute(
+                body=body, project=ee.data._get_projects_path(), prettyPrint=False
+            )
+            execute = ee.data._execute_cloud_call
+        except Exception:
+            return ee.data.computeValue(ee.deserializer.decodeCloudApi(expression))
+
+        return execute(request)['result']
@@ -0,0 +1,235 @@
+"""
+Toplu Veri Dışa Aktarma Servisi
+Tarla gözlemlerini, baseline'ları ve risk geçmişini Arrow IPC veya
+Parquet olarak akış halinde üretir. Her tarla ayrı bir batch olarak
+yazılıp hemen gönderildiği için bellek kullanımı tarla sayısından
+bağımsızdır.
+
+Akış başladıktan sonra HTTP durumu değiştirilemediğinden, hata veren
+tarlaların kimlikleri dosyanın içine yazılır (FAILED_METADATA_KEY):
+Parquet'te dosya altbilgisi (footer) metadatasına, Arrow IPC'de son
+(boş) batch'in özel metadatasına; değer JSON listesidir.
+"""
+import json
+import pandas as pd
+from app.services.gee_service import GEEService
+from app.services.baseline_service import BaselineService
+from app.services.result_store import ResultStore
+from app.services.scheduler import WorkScheduler
+
+
+class _ChunkSink:
+    """
+    pyarrow yazıcıları için dosya benzeri hedef
+    Yazılan byte'lar biriktirilir ve drain() ile dışarı alınır
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ExportService:
+    """Arrow / Parquet toplu dışa aktarma"""
+
+    FAILED_METADATA_KEY = 'failed_field_ids'
+
+    TABLES = ('observations', 'baselines', 'risk')
+
+    FORMATS = {
+        'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+        'parquet': ('application/vnd.apache.parquet', 'parquet')
+    }
+
+    @staticmethod
+    def schema(table):
+        """Tablo şeması (tüm tarlalar için sabit)"""
+        import pyarrow as pa
+
+        if table == 'observations':
+            return pa.schema([
+                ('field_id', pa.string()),
+                ('date', pa.date32()),
+                ('timestamp', pa.int64()),
+                ('ndvi_mean', pa.float64()),
+                ('ndvi_std', pa.float64()),
+                ('ndmi_mean', pa.float64()),
+                ('clear_pixel_ratio', pa.float64()),
+                ('cloud_percentage', pa.float64())
+            ])
+
+        if table == 'baselines':
+            return pa.schema([
+                ('field_id', pa.string()),
+                ('week', pa.int32()),
+                ('ndvi_mu', pa.float64()),
+                ('ndvi_sigma', pa.float64()),
+                ('sample_count', pa.int64()),
+                ('ndmi_mu', pa.float64()),
+                ('ndmi_sigma', pa.float64()),
+                # Dayanıklı istatistikler (yalnızca özet modunda; yoksa boş)
+                ('ndvi_median', pa.float64()),
+                ('ndvi_iqr', pa.float64()),
+                ('ndvi_p10', pa.float64()),
+                ('ndvi_p90', pa.float64()),
+                ('ndmi_median', pa.float64()),
+                ('ndmi_iqr', pa.float64()),
+                ('ndmi_p10', pa.float64()),
+                ('ndmi_p90', pa.float64())
+            ])
+
+        if table == 'risk':
+            return pa.schema([
+                ('field_id', pa.string()),
+                ('observation_date', pa.string()),
+                ('computed_at', pa.string()),
+                ('ndvi_mean', pa.float64()),
+                ('ndmi_mean', pa.float64()),
+                ('score', pa.int32()),
+                ('rule_level', pa.string()),
+                ('z_score', pa.float64()),
+                ('trend_slope', pa.float64()),
+                ('ml_level', pa.string()),
+                ('final_level', pa.string())
+            ])
+
+        raise ValueError(f"Geçersiz tablo: {table}")
+
+    @staticmethod
+    def field_frame(field, table, start_date, end_date, baseline_cache=None):
+        """
+        Tek tarla için tablo verisini DataFrame olarak üret
+
+        Args:
+            field: {'id': ..., 'coordinates': ...}
+            table: 'observations', 'baselines' veya 'risk'
+            baseline_cache: field_id -> baseline dict (varsa yeniden hesaplanmaz)
+        """
+        field_id = str(field['id'])
+
+        if table == 'observations':
+            df = GEEService.get_timeseries(field['coordinates'], start_date, end_date)
+
+        elif table == 'baselines':
+            baseline = (baseline_cache or {}).get(field_id)
+            if baseline is None:
+                baseline = BaselineService.calculate_baseline(field['coordinates'])
+            records = baseline['baseline'] if baseline else []
+            df = pd.DataFrame(records)
+
+        else:
+            df = pd.DataFrame(ResultStore.history(field_id))
+
+        if df.empty:
+            return df
+
+        df['field_id'] = field_id
+        return df
+
+    @staticmethod
+    def _to_batch(df, schema):
+        """DataFrame'i şemaya uygun RecordBatch'e çevir"""
+        import pyarrow as pa
+
+        df = df.reindex(columns=schema.names)
+        if 'date' in schema.names:
+            df['date'] = pd.to_datetime(df['date']).dt.date
+
+        return pa.RecordBatch.from_pandas(df, schema=schema, preserve_index=False)
+
+    @staticmethod
+    def stream(fields, table, fmt, start_date, end_date, baseline_cache=None):
+        """
+        Tarlaları sırayla işleyip dosya parçalarını üret (generator)
+
+        Her tarla verisi Arrow'a çevrilir, yazılır ve byte'ları hemen
+        döndürülür; bellekte aynı anda tek tarla tutulur.
+
+        Yields:
+            bytes: Arrow IPC stream veya Parquet dosyasının parçaları
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if table not in ExportService.TABLES:
+            raise ValueError(f"Geçersiz tablo: {table}")
+        if fmt not in ExportService.FORMATS:
+            raise ValueError(f"Geçersiz format: {fmt}")
+
+        schema = ExportService.schema(table)
+        sink = _ChunkSink()
+        output = pa.PythonFile(sink, mode='w')
+
+        if fmt == 'arrow':
+            writer = pa.ipc.new_stream(output, schema)
+        else:
+            writer = pq.ParquetWriter(output, schema, compression='zstd')
+
+        failed = []
+
+        try:
+            for field in fields:
+                try:
+                    # Dışa aktarma dashboard isteklerinin önüne geçmez
+                    with WorkScheduler.priority(WorkScheduler.BULK):
+                        df = ExportService.field_frame(
+                            field, table, start_date, end_date, baseline_cache
+                        )
+                except Exception as e:
+                    # Tek tarladaki hata tüm dışa aktarmayı durdurmasın
+                    print(f"Dışa aktarma hatası (tarla {field.get('id')}): {e}")
+                    failed.append(str(field.get('id')))
+                    continue
+
+                if df.empty:
+                    continue
+
+                batch = ExportService._to_batch(df, schema)
+                if fmt == 'arrow':
+                    writer.write_batch(batch)
+                else:
+                    writer.write_table(pa.Table.from_batches([batch]))
+
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+            if failed:
+                metadata = {ExportService.FAILED_METADATA_KEY: json.dumps(failed)}
+                if fmt == 'arrow':
+                    empty = pa.record_batch(
+                        [pa.array([], type=f.type) for f in schema], schema=schema
+                    )
+                    writer.write_batch(empty, custom_metadata=metadata)
+                else:
+                    writer.add_key_value_metadata(metadata)
+        finally:
+            writer.close()
+
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
@@ -0,0 +1,76 @@
+"""
+Tarla İşi Çalıştırıcıları
+Kuyruktaki işlerin (fetch, baseline, risk) worker tarafında yapılan kısmı.
+Her fonksiyon JSON'a çevrilebilir bir sonuç döndürür; sonuç kuyruğun
+sonuç tablosuna iş anahtarıyla yazılır.
+"""
+from datetime import datetime, timedelta
+from app.services.gee_service import GEEService
+from app.services.band_store import BandStore
+from app.services.baseline_service import BaselineService
+from app.services.ml_service import MLService
+from app.services.smoothing_service import SmoothingService
+
+
+class FieldJobs:
+    """İş türü -> çalıştırıcı"""
+
+    @staticmethod
+    def _default_range(params):
+        end_date = params.get('end_date') or datetime.now().strftime('%Y-%m-%d')
+        start_date = params.get('start_date') or (
+            datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+        return start_date, end_date
+
+    @staticmethod
+    def fetch(field, params, queue):
+        """Band önbelleğini (disk) istenen aralık için tamamla"""
+        start_date, end_date = FieldJobs._default_range(params)
+        bands = BandStore.ensure(field['coordinates'], start_date, end_date)
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'observations': len(bands)
+        }
+
+    @staticmethod
+    def baseline(field, params, queue):
+        """Baseline hesapla"""
+        return BaselineService.calculate_baseline(field['coordinates'])
+
+    @staticmethod
+    def risk(field, params, queue):
+        """
+        Güncel risk (baseline varsa kuyruğun sonuç tablosundan alınır,
+        yoksa hesaplanır)
+        """
+        coordinates = field['coordinates']
+
+        current = GEEService.get_current_status(coordinates)
+        if current is None:
+            return {'current': None, 'risk': None}
+
+        stored = queue.result(queue.job_key('baseline', field, {}))
+        baseline = stored['result'] if stored else BaselineService.calculate_baseline(coordinates)
+
+        if not baseline or not baseline['baseline']:
+            raise ValueError('Baseline hesaplanamadı')
+
+        end_date = datetime.now().strftime('%Y-%m-%d')
+        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        timeseries = GEEService.get_timeseries(coordinates, start_date, end_date)
+
+        return {
+            'current': current,
+            'risk': MLService.predict_risk(
+                current, baseline, SmoothingService.smooth_recent(coordinates, timeseries)
+            )
+        }
+
+    @staticmethod
+    def run(job, queue):
+        """Kiralanmış işi çalıştır ve sonucunu döndür"""
+        handler = getattr(FieldJobs, job['kind'])
+        payload = job['payload']
+        return handler(payload['field'], payload['params'], queue)
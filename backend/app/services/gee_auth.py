@@ -0,0 +1,115 @@
+"""
+Google Earth Engine Başlatma Yönetimi
+ee.Initialize çağrısını uygulama açılışından ayırır: ilk GEE kullanımında
+veya arka planda bir ısınma thread'inde, süreç başına bir kez yapılır
+"""
+import time
+import threading
+from datetime import datetime
+import click
+import ee
+
+
+class GEEInitializer:
+    """Tembel (lazy) ve thread-safe GEE başlatma"""
+
+    # Durumlar
+    PENDING = 'pending'
+    INITIALIZING = 'initializing'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    _lock = threading.Lock()
+    _state = PENDING
+    _project = None
+    _error = None
+    _initialized_at = None
+    _last_attempt = 0.0
+    _retry_seconds = 60
+    _warmup_thread = None
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Uygulama ayarlarını kaydet, istenirse arka planda ısınmayı başlat
+        Bu çağrı ağ isteği yapmaz, açılışı bloklamaz. flask CLI komutlarında
+        (flask run hariç) ısınma yapılmaz; gerekirse ilk GEE kullanımında
+        bağlanılır.
+        """
+        cls._project = app.config['GEE_PROJECT_ID']
+        cls._retry_seconds = app.config['GEE_INIT_RETRY_SECONDS']
+
+        if app.config['GEE_WARMUP'] and not cls._in_cli_command():
+            cls.start_warmup()
+
+    @staticmethod
+    def _in_cli_command():
+        """Uygulama sunucu dışı bir flask CLI komutu için mi yükleniyor"""
+        ctx = click.get_current_context(silent=True)
+        return ctx is not None and ctx.info_name != 'run'
+
+    @classmethod
+    def start_warmup(cls):
+        """GEE başlatmayı arka plan thread'inde başlat"""
+        if cls._warmup_thread is not None and cls._warmup_thread.is_alive():
+            return
+
+        def warmup():
+            try:
+                cls.ensure_initialized()
+            except RuntimeError:
+                # Hata durumu status() ile raporlanır, ilk kullanımda tekrar denenir
+                pass
+
+        cls._warmup_thread = threading.Thread(
+            target=warmup, name='gee-warmup', daemon=True
+        )
+        cls._warmup_thread.start()
+
+    @classmethod
+    def ensure_initialized(cls):
+        """
+        GEE hazır değilse başlat (ilk GEE kullanımından önce çağrılır)
+
+        Raises:
+            RuntimeError: Başlatma başarısızsa
+        """
+        if cls._state == cls.READY:
+            return
+
+        with cls._lock:
+            if cls._state == cls.READY:
+                return
+
+            # Başarısız denemeden sonra her istekte tekrar auth yapma
+            since_last = time.monotonic() - cls._last_attempt
+            if cls._state == cls.FAILED and since_last < cls._retry_seconds:
+                raise RuntimeError(f"GEE bağlantısı kurulamadı: {cls._error}")
+
+            cls._state = cls.INITIALIZING
+            cls._last_attempt = time.monotonic()
+
+            try:
+                ee.Initialize(project=cls._project)
+            except Exception as e:
+                cls._state = cls.FAILED
+                cls._error = str(e)
+                print(f"⚠️ GEE bağlantı hatası: {e}")
+                print("   ee.Authenticate() çalıştırmanız gerekebilir")
+                raise RuntimeError(f"GEE bağlantısı kurulamadı: {e}") from e
+
+            cls._state = cls.READY
+            cls._error = None
+            cls._initialized_at = datetime.now().isoformat()
+            print("✅ Google Earth Engine bağlantısı başarılı")
+
+    @classmethod
+    def status(cls):
+        """GEE başlatma durumunu döndür"""
+        return {
+            'state': cls._state,
+            'ready': cls._state == cls.READY,
+            'project': cls._project,
+            'initialized_at': cls._initialized_at,
+            'error': cls._error
+        }
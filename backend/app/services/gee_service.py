@@ -3,9 +3,15 @@ Google Earth Engine Servis Katmanı
 Sentinel-2 verilerini çeker ve işler
 """
 import ee
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from flask import current_app
+from app.services.gee_auth import GEEInitializer
+from app.services.scheduler import WorkScheduler
+from app.services.ee_templates import ExpressionTemplates
+from app.services.smoothing_service import SmoothingService
+from app.utils.geometry import canonicalize, is_point
 
 
 class GEEService:
@@ -19,13 +25,31 @@ class GEEService:
         Args:
             coordinates: [lon, lat] veya [[lon1,lat1], [lon2,lat2], ...] (polygon)
         """
-        if len(coordinates) == 2 and isinstance(coordinates[0], (int, float)):
+        # Onarılmış, sadeleştirilmiş ve kanonik sıralı köşeler
+        coordinates, _ = canonicalize(coordinates)
+        return GEEService._make_geometry(coordinates, is_point(coordinates))
+    
+    @staticmethod
+    def _make_geometry(coordinates, point):
+        """
+        Kanonik koordinatlardan GEE geometrisi
+        coordinates bir liste veya şablon yer tutucusu (ee.List) olabilir
+        """
+        if point:
             # Nokta koordinatı - 250m buffer ekle
             return ee.Geometry.Point(coordinates).buffer(250)
         else:
             # Polygon
             return ee.Geometry.Polygon([coordinates])
     
+    @staticmethod
+    def _collection(geometry, start_date, end_date, cloud_threshold):
+        """Sentinel-2 koleksiyonu (alan, tarih ve bulut filtresiyle)"""
+        return (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
+            .filterBounds(geometry)
+            .filterDate(start_date, end_date)
+            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', cloud_threshold)))
+    
     @staticmethod
     def _apply_cloud_mask(image):
         """
@@ -48,21 +72,10 @@ class GEEService:
         return image.addBands([ndvi, ndmi])
     
     @staticmethod
-    def get_timeseries(coordinates, start_date, end_date):
-        """
-        Belirli koordinatlar için zaman serisi verisi çek
-        
-        Returns:
-            DataFrame: tarih, ndvi_mean, ndmi_mean, temiz_piksel_orani
-        """
-        geometry = GEEService._get_geometry(coordinates)
-        cloud_threshold = current_app.config['CLOUD_THRESHOLD']
-        
-        # Sentinel-2 koleksiyonu
-        collection = (ee.ImageCollection('COPERNICUS/S2_SR_HARMONIZED')
-            .filterBounds(geometry)
-            .filterDate(start_date, end_date)
-            .filter(ee.Filter.lt('CLOUDY_PIXEL_PERCENTAGE', cloud_threshold)))
+    def _timeseries_expression(coordinates, point, start_date, end_date, cloud_threshold):
+        """Görüntü başına NDVI/NDMI istatistikleri (şablon kurucusu)"""
+        geometry = GEEService._make_geometry(coordinates, point)
+        collection = GEEService._collection(geometry, start_date, end_date, cloud_threshold)
         
         def extract_stats(image):
             """Her görüntüden istatistik çıkar"""
@@ -109,9 +122,26 @@ class GEEService:
                 'cloud_percentage': image.get('CLOUDY_PIXEL_PERCENTAGE')
             })
         
-        # Verileri çek
-        features = collection.map(extract_stats)
-        result = features.getInfo()
+        return collection.map(extract_stats)
+    
+    @staticmethod
+    def get_timeseries(coordinates, start_date, end_date):
+        """
+        Belirli koordinatlar için zaman serisi verisi çek
+        
+        Returns:
+            DataFrame: tarih, ndvi_mean, ndmi_mean, temiz_piksel_orani
+        """
+        GEEInitializer.ensure_initialized()
+        
+        cloud_threshold = current_app.config['CLOUD_THRESHOLD']
+        
+        # Grafik şablondan: yalnızca geometri ve tarihler değişir
+        expression = ExpressionTemplates.expression(
+            GEEService._timeseries_expression, (cloud_threshold,),
+            coordinates, start_date, end_date
+        )
+        result = WorkScheduler.run(ExpressionTemplates.compute, expression)
         
         if not result['features']:
             return pd.DataFrame()
@@ -129,6 +159,141 @@ class GEEService:
         
         return df
     
+    @staticmethod
+    def _band_expression(coordinates, point, start_date, end_date, cloud_threshold, bands):
+        """Görüntü başına band ortalamaları (şablon kurucusu)"""
+        bands = list(bands)
+        geometry = GEEService._make_geometry(coordinates, point)
+        collection = GEEService._collection(geometry, start_date, end_date, cloud_threshold)
+        
+        def extract_bands(image):
+            """Her görüntüden band ortalamaları çıkar"""
+            masked = GEEService._apply_cloud_mask(image)
+            
+            # Tüm bandlar tek reduceRegion ile (20m bandlar 10m'ye örneklenir)
+            band_stats = masked.select(bands).divide(10000).reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=geometry,
+                scale=10,
+                maxPixels=1e9
+            )
+            
+            scl = image.select('SCL')
+            clear_ratio = scl.eq(4).Or(scl.eq(5)).reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=geometry,
+                scale=20
+            ).get('SCL')
+            
+            return ee.Feature(None, band_stats.combine({
+                'date': image.date().format('YYYY-MM-dd'),
+                'clear_pixel_ratio': clear_ratio
+            }))
+        
+        return collection.map(extract_bands)
+    
+    @staticmethod
+    def get_band_timeseries(coordinates, start_date, end_date, bands=None):
+        """
+        Görüntü başına, bulut maskeli ham yansıma ortalamalarını çek
+        İndeksler bu değerlerden yerelde hesaplanır (bkz. indices.py)
+        
+        Args:
+            bands: Band listesi, varsayılan Config.BAND_CACHE_BANDS
+        
+        Returns:
+            DataFrame: date, clear_pixel_ratio, B4, B8, ... (0-1 yansıma)
+        """
+        GEEInitializer.ensure_initialized()
+        
+        if bands is None:
+            bands = current_app.config['BAND_CACHE_BANDS']
+        
+        cloud_threshold = current_app.config['CLOUD_THRESHOLD']
+        
+        expression = ExpressionTemplates.expression(
+            GEEService._band_expression, (cloud_threshold, tuple(bands)),
+            coordinates, start_date, end_date
+        )
+        result = WorkScheduler.run(ExpressionTemplates.compute, expression)
+        
+        if not result['features']:
+            return pd.DataFrame()
+        
+        # Tamamen maskelenen bandlar getInfo'da hiç gelmez
+        df = pd.DataFrame([f['properties'] for f in result['features']])
+        df = df.reindex(columns=['date', 'clear_pixel_ratio'] + list(bands))
+        df['date'] = pd.to_datetime(df['date'])
+        df = df.sort_values('date').reset_index(drop=True)
+        
+        for col in ['clear_pixel_ratio'] + list(bands):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        return df
+    
+    @staticmethod
+    def get_pixel_stack(coordinates, start_date, end_date, grid):
+        """
+        Tarlanın maskeli NDVI/NDMI piksellerini tek istekte indir
+        (ee.data.computePixels, NUMPY_NDARRAY)
+        
+        Args:
+            grid: {'west', 'north', 'dx', 'dy', 'width', 'height'} (EPSG:4326)
+        
+        Returns:
+            tuple: (dates: datetime64[D] dizisi, ndvi: (T,H,W), ndmi: (T,H,W))
+                   Maskeli pikseller NaN
+        """
+        GEEInitializer.ensure_initialized()
+        
+        geometry = GEEService._get_geometry(coordinates)
+        cloud_threshold = current_app.config['CLOUD_THRESHOLD']
+        nodata = -9999
+        
+        collection = GEEService._collection(geometry, start_date, end_date, cloud_threshold)
+        
+        def to_indices(image):
+            masked = GEEService._apply_cloud_mask(image)
+            return (GEEService._calculate_indices(masked)
+                .select(['NDVI', 'NDMI'])
+                .clip(geometry)
+                .unmask(nodata))
+        
+        # Tüm tarihler tek çok bantlı görüntü: "<görüntü_id>_NDVI", ...
+        stack = collection.map(to_indices).toBands()
+        
+        pixels = WorkScheduler.run(ee.data.computePixels, {
+            'expression': stack,
+            'fileFormat': 'NUMPY_NDARRAY',
+            'grid': {
+                'dimensions': {'width': grid['width'], 'height': grid['height']},
+                'affineTransform': {
+                    'scaleX': grid['dx'], 'shearX': 0, 'translateX': grid['west'],
+                    'shearY': 0, 'scaleY': -grid['dy'], 'translateY': grid['north']
+                },
+                'crsCode': 'EPSG:4326'
+            }
+        })
+        
+        ndvi_bands = [name for name in pixels.dtype.names if name.endswith('_NDVI')]
+        if not ndvi_bands:
+            empty = np.empty((0, grid['height'], grid['width']), dtype=np.float32)
+            return np.empty(0, dtype='datetime64[D]'), empty, empty.copy()
+        
+        # Görüntü ID'si YYYYMMDDT... ile başlar
+        dates = np.array(
+            [f'{n[:4]}-{n[4:6]}-{n[6:8]}' for n in ndvi_bands], dtype='datetime64[D]'
+        )
+        ndvi = np.stack([pixels[n] for n in ndvi_bands]).astype(np.float32)
+        ndmi = np.stack(
+            [pixels[n[:-len('_NDVI')] + '_NDMI'] for n in ndvi_bands]
+        ).astype(np.float32)
+        
+        ndvi[ndvi == nodata] = np.nan
+        ndmi[ndmi == nodata] = np.nan
+        
+        return dates, ndvi, ndmi
+    
     @staticmethod
     def get_current_status(coordinates):
         """
@@ -139,11 +304,16 @@ class GEEService:
         
         df = GEEService.get_timeseries(coordinates, start_date, end_date)
         
+        return GEEService.best_observation(df)
+    
+    @staticmethod
+    def best_observation(df):
+        """Seriden en temiz gözlemi seç (veri yoksa None)"""
         if df.empty:
             return None
         
         # En yüksek temiz piksel oranlı görüntüyü seç
-        df_clean = df[df['clear_pixel_ratio'] > 0.5]
+        df_clean = SmoothingService.quality(df)
         
         if df_clean.empty:
             # Temiz görüntü yoksa en az bulutluyu al
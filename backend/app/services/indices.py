@@ -0,0 +1,121 @@
+"""
+Vejetasyon İndeksi Kayıt Defteri
+İndeks formülleri band dizileri üzerinde vektörel NumPy ile hesaplanır.
+Yeni bir indeks eklemek için formülü @register_index ile kaydetmek
+yeterlidir; tüm geçmiş veri yerel band önbelleğinden yeniden hesaplanır.
+
+Not: İndeksler tarla ortalaması yansımalardan hesaplanır. Bu nedenle
+GEE'de piksel bazında hesaplanıp ortalanan NDVI'dan az miktarda farklı
+olabilir (heterojen tarlalarda fark büyür).
+"""
+import numpy as np
+import pandas as pd
+
+# isim -> {'bands': (...), 'func': f(*band_arrays), 'description': str}
+INDEX_REGISTRY = {}
+
+
+def register_index(name, bands, description=''):
+    """
+    İndeks formülü kaydet (dekoratör)
+
+    Örnek:
+        @register_index('ndvi', ('B8', 'B4'))
+        def ndvi(nir, red):
+            return normalized_difference(nir, red)
+    """
+    def decorator(func):
+        INDEX_REGISTRY[name] = {
+            'bands': tuple(bands),
+            'func': func,
+            'description': description
+        }
+        return func
+    return decorator
+
+
+def normalized_difference(a, b):
+    """(a - b) / (a + b), sıfıra bölmede NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = (a - b) / (a + b)
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+
+@register_index('ndvi', ('B8', 'B4'), 'Normalize fark vejetasyon indeksi')
+def ndvi(nir, red):
+    return normalized_difference(nir, red)
+
+
+@register_index('ndmi', ('B8', 'B11'), 'Normalize fark nem indeksi')
+def ndmi(nir, swir1):
+    return normalized_difference(nir, swir1)
+
+
+@register_index('ndmi_b8a', ('B8A', 'B11'), 'NDMI (dar NIR bandı ile)')
+def ndmi_b8a(nir_narrow, swir1):
+    return normalized_difference(nir_narrow, swir1)
+
+
+@register_index('evi', ('B8', 'B4', 'B2'), 'Geliştirilmiş vejetasyon indeksi')
+def evi(nir, red, blue):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 2.5 * (nir - red) / (nir + 6 * red - 7.5 * blue + 1)
+
+
+@register_index('savi', ('B8', 'B4'), 'Toprak ayarlı vejetasyon indeksi (L=0.5)')
+def savi(nir, red):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 1.5 * (nir - red) / (nir + red + 0.5)
+
+
+@register_index('ndre', ('B8A', 'B5'), 'Normalize fark kırmızı kenar indeksi')
+def ndre(nir_narrow, red_edge):
+    return normalized_difference(nir_narrow, red_edge)
+
+
+@register_index('ndwi', ('B3', 'B8'), 'Normalize fark su indeksi (McFeeters)')
+def ndwi(green, nir):
+    return normalized_difference(green, nir)
+
+
+@register_index('nbr', ('B8', 'B12'), 'Normalize yanma oranı')
+def nbr(nir, swir2):
+    return normalized_difference(nir, swir2)
+
+
+def compute_indices(band_df, names=None):
+    """
+    Band tablosundan indeksleri hesapla
+
+    Args:
+        band_df: date, clear_pixel_ratio ve band sütunlarını içeren DataFrame
+        names: İndeks isimleri (varsayılan: tümü)
+
+    Returns:
+        DataFrame: date, clear_pixel_ratio ve her indeks için bir sütun
+
+    Raises:
+        ValueError: Bilinmeyen indeks veya eksik band
+    """
+    names = list(names or INDEX_REGISTRY)
+
+    unknown = [n for n in names if n not in INDEX_REGISTRY]
+    if unknown:
+        raise ValueError(f"Bilinmeyen indeks: {', '.join(unknown)}")
+
+    result = pd.DataFrame({
+        'date': band_df['date'],
+        'clear_pixel_ratio': band_df['clear_pixel_ratio']
+    })
+
+    for name in names:
+        spec = INDEX_REGISTRY[name]
+        missing = [b for b in spec['bands'] if b not in band_df.columns]
+        if missing:
+            raise ValueError(f"{name} için band eksik: {', '.join(missing)}")
+
+        arrays = [band_df[b].to_numpy(dtype=np.float64) for b in spec['bands']]
+        result[name] = spec['func'](*arrays)
+
+    return result
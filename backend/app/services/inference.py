@@ -0,0 +1,309 @@
+"""
+Hafif Çıkarım (Inference) Modülü
+Eğitilmiş risk sınıflandırıcısını ve StandardScaler'ı saf NumPy ile
+değerlendirir. Web sürecinde scikit-learn / scipy import edilmez; model,
+eğitim sırasında dışa aktarılan .npz artefaktından yüklenir.
+
+Desteklenen model aileleri (artefakttaki 'kind'):
+    forest   RandomForestClassifier (derin veya sığ)
+    boosting HistGradientBoostingClassifier
+    linear   LogisticRegression
+"""
+import numpy as np
+
+ARTIFACT_VERSION = 2
+
+
+def _flatten_trees(trees):
+    """
+    Ağaçların düğümlerini tek bir düz diziye birleştir
+
+    Yaprak düğümler kendilerini gösterir; böylece değerlendirme sabit
+    sayıda (max_depth) vektörel adımda tamamlanır.
+
+    Args:
+        trees: (feature, threshold, left, right, is_leaf, depth) demetleri;
+               left/right ağaç içi indekslerdir
+
+    Returns:
+        dict: feature, threshold, left, right, roots, max_depth dizileri
+    """
+    features, thresholds, lefts, rights, roots = [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for feature, threshold, left, right, is_leaf, depth in trees:
+        node_ids = np.arange(len(feature))
+
+        # Yapraklar kendine döner, iç düğümler global indekse kaydırılır
+        lefts.append((np.where(is_leaf, node_ids, left) + offset).astype(np.int32))
+        rights.append((np.where(is_leaf, node_ids, right) + offset).astype(np.int32))
+        features.append(np.where(is_leaf, 0, feature).astype(np.int32))
+        thresholds.append(np.asarray(threshold, dtype=np.float64))
+        roots.append(offset)
+
+        offset += len(feature)
+        max_depth = max(max_depth, int(depth))
+
+    return {
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'roots': np.array(roots, dtype=np.int32),
+        'max_depth': np.array(max_depth)
+    }
+
+
+def _forest_arrays(model):
+    """RandomForestClassifier -> düz ağaç dizileri + yaprak olasılıkları"""
+    trees, values = [], []
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        trees.append((tree.feature, tree.threshold, tree.children_left,
+                      tree.children_right, tree.children_left == -1, tree.max_depth))
+
+        # Yaprak değerlerini sınıf olasılıklarına normalize et
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0] = 1.0
+        values.append((value / totals).astype(np.float32))
+
+    arrays = _flatten_trees(trees)
+    arrays['value'] = np.concatenate(values)
+    return arrays
+
+
+def _boosting_arrays(model):
+    """HistGradientBoostingClassifier -> düz ağaç dizileri + yaprak skorları"""
+    trees, values, tree_class, missing_left = [], [], [], []
+
+    for iteration in model._predictors:
+        for k, predictor in enumerate(iteration):
+            nodes = predictor.nodes
+            if nodes['is_categorical'].any():
+                raise ValueError('Kategorik bölünmeler artefakta aktarılamaz')
+
+            is_leaf = nodes['is_leaf'].astype(bool)
+            trees.append((nodes['feature_idx'], nodes['num_threshold'],
+                          nodes['left'].astype(np.int64), nodes['right'].astype(np.int64),
+                          is_leaf, nodes['depth'].max()))
+            values.append(nodes['value'].astype(np.float64))
+            missing_left.append(nodes['missing_go_to_left'].astype(bool))
+            tree_class.append(k)
+
+    arrays = _flatten_trees(trees)
+    arrays['value'] = np.concatenate(values)
+    arrays['missing_left'] = np.concatenate(missing_left)
+    arrays['tree_class'] = np.array(tree_class, dtype=np.int32)
+    arrays['baseline'] = np.asarray(model._baseline_prediction, dtype=np.float64).ravel()
+    return arrays
+
+
+def _linear_arrays(model):
+    """LogisticRegression -> katsayılar"""
+    return {
+        'coef': np.asarray(model.coef_, dtype=np.float64),
+        'intercept': np.asarray(model.intercept_, dtype=np.float64)
+    }
+
+
+def model_kind(model):
+    """Eğitilmiş modelin artefakt ailesi (scikit-learn import etmeden)"""
+    if hasattr(model, 'estimators_') and hasattr(model.estimators_[0], 'tree_'):
+        return 'forest'
+    if hasattr(model, '_predictors'):
+        return 'boosting'
+    if hasattr(model, 'coef_'):
+        return 'linear'
+    raise ValueError(f'Artefakta aktarılamayan model: {type(model).__name__}')
+
+
+EXPORTERS = {
+    'forest': _forest_arrays,
+    'boosting': _boosting_arrays,
+    'linear': _linear_arrays
+}
+
+
+def export_artifact(model, scaler, path, family=None):
+    """
+    Eğitilmiş modeli servis artefaktı olarak kaydet
+
+    Args:
+        model: Eğitilmiş RandomForestClassifier, HistGradientBoostingClassifier
+               veya LogisticRegression
+        scaler: Eğitilmiş StandardScaler
+        path: Hedef .npz dosyası
+        family: Eğitim scriptindeki model ailesi adı (rapor için)
+    """
+    kind = model_kind(model)
+
+    np.savez_compressed(
+        path,
+        version=np.array(ARTIFACT_VERSION),
+        kind=np.array(kind),
+        family=np.array(family or kind),
+        classes=np.asarray(model.classes_),
+        scaler_mean=np.asarray(scaler.mean_, dtype=np.float64),
+        scaler_scale=np.asarray(scaler.scale_, dtype=np.float64),
+        **EXPORTERS[kind](model)
+    )
+
+
+def _softmax(raw):
+    raw = raw - raw.max(axis=1, keepdims=True)
+    exp = np.exp(raw)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _binary(raw):
+    """Tek skor sütunundan iki sınıf olasılığı (sigmoid)"""
+    p = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+    return np.column_stack([1.0 - p, p])
+
+
+class ScalerArtifact:
+    """StandardScaler.transform eşleniği"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        return (X - self.mean_) / self.scale_
+
+
+class _TreeArtifact:
+    """Düz ağaç dizileri üzerinde vektörel gezinme"""
+
+    # Eşik karşılaştırmasının yapıldığı tip
+    dtype = np.float64
+
+    def __init__(self, arrays):
+        self.classes_ = arrays['classes']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+
+    def _go_left(self, x, nodes):
+        return x <= self.threshold[nodes]
+
+    def _leaves(self, X):
+        """
+        Tüm ağaçları ve tüm örnekleri aynı anda değerlendir
+
+        Returns:
+            np.array: (n_trees, n_samples) yaprak düğüm indeksleri
+        """
+        X = np.asarray(X, dtype=self.dtype)
+        n_samples = X.shape[0]
+        rows = np.arange(n_samples)[None, :]
+
+        nodes = np.repeat(self.roots[:, None], n_samples, axis=1)
+
+        for _ in range(self.max_depth):
+            go_left = self._go_left(X[rows, self.feature[nodes]], nodes)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        return self.classes_[proba.argmax(axis=1)]
+
+
+class ForestArtifact(_TreeArtifact):
+    """RandomForestClassifier.predict / predict_proba eşleniği"""
+
+    # sklearn ağaçları girdiyi float32 olarak karşılaştırır
+    dtype = np.float32
+
+    def predict_proba(self, X):
+        """
+        Returns:
+            np.array: (n_samples, n_classes) olasılıklar
+        """
+        return self.value[self._leaves(X)].mean(axis=0, dtype=np.float64)
+
+
+class BoostingArtifact(_TreeArtifact):
+    """HistGradientBoostingClassifier.predict / predict_proba eşleniği"""
+
+    def __init__(self, arrays):
+        super().__init__(arrays)
+        self.missing_left = arrays['missing_left']
+        self.tree_class = arrays['tree_class']
+        self.baseline = arrays['baseline']
+
+    def _go_left(self, x, nodes):
+        # Eksik değerler eğitimde öğrenilen yöne gider
+        return np.where(np.isnan(x), self.missing_left[nodes], x <= self.threshold[nodes])
+
+    def predict_proba(self, X):
+        leaf_values = self.value[self._leaves(X)]
+
+        # Sınıf başına ağaç skorlarının toplamı
+        raw = np.tile(self.baseline, (leaf_values.shape[1], 1))
+        for k in range(len(self.baseline)):
+            raw[:, k] += leaf_values[self.tree_class == k].sum(axis=0)
+
+        return _binary(raw) if len(self.baseline) == 1 else _softmax(raw)
+
+
+class LinearArtifact:
+    """LogisticRegression.predict / predict_proba eşleniği"""
+
+    def __init__(self, arrays):
+        self.classes_ = arrays['classes']
+        self.coef = arrays['coef']
+        self.intercept = arrays['intercept']
+
+    def predict_proba(self, X):
+        raw = np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept
+        return _binary(raw) if self.coef.shape[0] == 1 else _softmax(raw)
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        return self.classes_[proba.argmax(axis=1)]
+
+
+ARTIFACT_CLASSES = {
+    'forest': ForestArtifact,
+    'boosting': BoostingArtifact,
+    'linear': LinearArtifact
+}
+
+
+def load_artifact(path):
+    """
+    Servis artefaktını yükle
+
+    Returns:
+        tuple: (model artefaktı, ScalerArtifact)
+    """
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    version = int(arrays.get('version', 0))
+    if version == 1:
+        # İlk sürüm yalnızca Random Forest içerir
+        kind = 'forest'
+    elif version == ARTIFACT_VERSION:
+        kind = str(arrays['kind'])
+    else:
+        raise ValueError(f"Desteklenmeyen artefakt sürümü: {version}")
+
+    if kind not in ARTIFACT_CLASSES:
+        raise ValueError(f"Desteklenmeyen model ailesi: {kind}")
+
+    model = ARTIFACT_CLASSES[kind](arrays)
+    scaler = ScalerArtifact(arrays['scaler_mean'], arrays['scaler_scale'])
+
+    return model, scaler
@@ -0,0 +1,331 @@
+"""
+Tarla İşleri Kuyruğu
+Tarla bazlı toplu işler (fetch, baseline, risk) kalıcı bir kuyruğa yazılır
+ve ayrı süreçlerde / makinelerde çalışan worker'lar tarafından kiralanarak
+(lease) işlenir. Kira süresi dolan işler başka worker'a geçer, hatalı işler
+artan beklemeyle tekrar denenir. Aynı iş anahtarının sonucu tek satırdır;
+iş iki kez çalışsa da sonuç tablosu tutarlı kalır.
+
+Varsayılan arka uç tek makinede çalışan SQLite'tır; ortak bir broker için
+JobQueue arayüzü uygulanıp JOB_QUEUE_BACKEND ile seçilir.
+"""
+import os
+import abc
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+from app.utils.geometry import geometry_key
+from app.utils.serialization import dumps
+
+
+class JobQueue(abc.ABC):
+    """Kuyruk arka uçlarının arayüzü"""
+
+    # İş durumları
+    QUEUED = 'queued'
+    LEASED = 'leased'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    KINDS = ('fetch', 'baseline', 'risk')
+
+    @staticmethod
+    def from_config(config):
+        """Ayarlardaki arka ucu oluştur"""
+        backend = config['JOB_QUEUE_BACKEND']
+        if backend == 'sqlite':
+            return SQLiteJobQueue(
+                config['JOB_QUEUE_PATH'],
+                max_attempts=config['JOB_MAX_ATTEMPTS'],
+                retry_base=config['JOB_RETRY_BASE_SECONDS']
+            )
+        raise ValueError(f"Bilinmeyen kuyruk arka ucu: {backend}")
+
+    @staticmethod
+    def job_key(kind, field, params):
+        """
+        İşin kararlı anahtarı: aynı tarla + geometri + parametre aynı iştir
+        (tekrar kuyruğa eklenmez, sonucu üzerine yazılır)
+        """
+        raw = json.dumps({
+            'kind': kind,
+            'field_id': str(field['id']),
+            'geometry': geometry_key(field['coordinates']),
+            'params': params
+        }, sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    @abc.abstractmethod
+    def enqueue(self, kind, field, params=None, priority=0):
+        """İşi kuyruğa ekle; (iş id, yeni mi) döner, aynı anahtarlı bekleyen iş tekrar eklenmez"""
+
+    @abc.abstractmethod
+    def lease(self, worker_id, lease_seconds):
+        """Sıradaki uygun işi kirala (yoksa None)"""
+
+    @abc.abstractmethod
+    def extend(self, job_id, worker_id, lease_seconds):
+        """Kirayı uzat (kira başkasına geçtiyse False)"""
+
+    @abc.abstractmethod
+    def complete(self, job, worker_id, result):
+        """İşi tamamla ve sonucu iş anahtarına yaz (kira kaybedildiyse False)"""
+
+    @abc.abstractmethod
+    def fail(self, job, worker_id, error):
+        """Hatayı kaydet, artan beklemeyle tekrar kuyruğa al; yeni durumu döner"""
+
+    @abc.abstractmethod
+    def result(self, key):
+        """İş anahtarının son sonucu (yoksa None)"""
+
+    @abc.abstractmethod
+    def stats(self):
+        """Tür ve durum bazında iş sayıları"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """SQLite arka ucu (WAL; aynı makinedeki çok sayıda süreç için)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            field_id TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_ready
+            ON jobs (status, priority DESC, available_at, id);
+        CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_key
+            ON jobs (key) WHERE status IN ('queued', 'leased');
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            field_id TEXT NOT NULL,
+            job_id INTEGER NOT NULL,
+            result TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, max_attempts=5, retry_base=30):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # WAL: okuyucular yazarı beklemez (PRAGMA işlem dışında çalışmalı)
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        """
+        Kısa ömürlü bağlantı (her çağrı kendi bağlantısını açar; thread ve
+        süreçler arasında paylaşılmaz)
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_job(row):
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def enqueue(self, kind, field, params=None, priority=0):
+        """
+        İşi kuyruğa ekle (aynı anahtarlı iş zaten bekliyorsa onu döndür)
+
+        Args:
+            kind: 'fetch', 'baseline' veya 'risk'
+            field: {'id': ..., 'coordinates': ...}
+            params: İşe özel parametreler (ör. tarih aralığı)
+            priority: Büyük olan önce kiralanır
+
+        Returns:
+            tuple: (job_id, yeni eklendiyse True)
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Geçersiz iş türü: {kind}")
+
+        params = params or {}
+        key = self.job_key(kind, field, params)
+        payload = json.dumps({
+            'field': {'id': str(field['id']), 'coordinates': field['coordinates']},
+            'params': params
+        })
+        now = time.time()
+
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN (?, ?)",
+                (key, self.QUEUED, self.LEASED)
+            ).fetchone()
+            if row is not None:
+                return row['id'], False
+
+            cursor = conn.execute(
+                """INSERT INTO jobs (key, kind, field_id, payload, priority, status,
+                                     available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, kind, str(field['id']), payload, priority, self.QUEUED,
+                 now, now, now)
+            )
+            return cursor.lastrowid, True
+
+    def lease(self, worker_id, lease_seconds):
+        """
+        Sıradaki hazır işi kirala (kirası dolmuş işler de geri alınır)
+
+        Returns:
+            dict veya None
+        """
+        now = time.time()
+
+        with self._connect(immediate=True) as conn:
+            # Worker'ı sürekli çökerten işler kira dolunca sonsuza dek dönmesin
+            conn.execute(
+                """UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,
+                                  last_error = 'kira süresi doldu', updated_at = ?
+                   WHERE status = ? AND lease_expires < ? AND attempts >= ?""",
+                (self.FAILED, now, self.LEASED, now, self.max_attempts)
+            )
+
+            row = conn.execute(
+                """SELECT * FROM jobs
+                   WHERE (status = ? AND available_at <= ?)
+                      OR (status = ? AND lease_expires < ?)
+                   ORDER BY priority DESC, available_at, id
+                   LIMIT 1""",
+                (self.QUEUED, now, self.LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                """UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?,
+                                  attempts = attempts + 1, updated_at = ?
+                   WHERE id = ?""",
+                (self.LEASED, worker_id, now + lease_seconds, now, row['id'])
+            )
+            job = self._to_job(row)
+            job['attempts'] += 1
+            job['lease_owner'] = worker_id
+            return job
+
+    def extend(self, job_id, worker_id, lease_seconds):
+        """Uzun süren işin kirasını uzat (kira başkasına geçtiyse False)"""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET lease_expires = ?, updated_at = ?
+                   WHERE id = ? AND status = ? AND lease_owner = ?""",
+                (now + lease_seconds, now, job_id, self.LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job, worker_id, result):
+        """
+        Sonucu yaz ve işi bitir (tek işlemde)
+        Kira başka worker'a geçtiyse hiçbir şey yazılmaz
+
+        Returns:
+            bool: Yazıldıysa True
+        """
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            cursor = conn.execute(
+                """UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL,
+                                  last_error = NULL, updated_at = ?
+                   WHERE id = ? AND status = ? AND lease_owner = ?""",
+                (self.DONE, now, job['id'], self.LEASED, worker_id)
+            )
+            if cursor.rowcount != 1:
+                return False
+
+            conn.execute(
+                """INSERT INTO results (key, kind, field_id, job_id, result, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET
+                       job_id = excluded.job_id,
+                       result = excluded.result,
+                       updated_at = excluded.updated_at""",
+                (job['key'], job['kind'], job['field_id'], job['id'],
+                 dumps(result).decode('utf-8'), now)
+            )
+            return True
+
+    def fail(self, job, worker_id, error):
+        """
+        Hatalı işi artan beklemeyle tekrar kuyruğa al
+        (JOB_MAX_ATTEMPTS denemeden sonra 'failed')
+        """
+        now = time.time()
+        if job['attempts'] >= self.max_attempts:
+            status, available_at = self.FAILED, now
+        else:
+            status = self.QUEUED
+            available_at = now + self.retry_base * 2 ** (job['attempts'] - 1)
+
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                """UPDATE jobs SET status = ?, available_at = ?, lease_owner = NULL,
+                                  lease_expires = NULL, last_error = ?, updated_at = ?
+                   WHERE id = ? AND status = ? AND lease_owner = ?""",
+                (status, available_at, str(error)[:2000], now,
+                 job['id'], self.LEASED, worker_id)
+            )
+        return status
+
+    def result(self, key):
+        """İş anahtarının son sonucu (yoksa None)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT result, updated_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'result': json.loads(row['result']), 'updated_at': row['updated_at']}
+
+    def stats(self):
+        """Tür ve durum bazında iş sayıları"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"
+            ).fetchall()
+            results = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+        counts = {}
+        for row in rows:
+            counts.setdefault(row['kind'], {})[row['status']] = row['n']
+
+        return {'jobs': counts, 'results': results}
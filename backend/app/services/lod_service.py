@@ -0,0 +1,177 @@
+"""
+Zaman Serisi Detay Seviyesi (LOD) Servisi
+Uzun geçmişleri grafik için günlük/haftalık/aylık toplar veya
+LTTB (Largest-Triangle-Three-Buckets) ile hedef nokta sayısına indirger
+"""
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.utils.geometry import geometry_key
+
+
+class LODService:
+    """Zaman serisi örnekleme ve haftalık özet önbelleği"""
+
+    # Çözünürlük -> pandas frekansı
+    RESOLUTIONS = {
+        'daily': 'D',
+        'weekly': 'W-MON',
+        'monthly': 'MS'
+    }
+
+    _lock = threading.Lock()
+
+    # Özet önbelleği (LRU): anahtar -> (oluşturma zamanı, DataFrame)
+    _rollup_cache = OrderedDict()
+
+    @staticmethod
+    def resample(df, resolution):
+        """
+        Seriyi zaman kovalarına göre topla (ortalama)
+
+        Args:
+            df: Zaman serisi DataFrame (date sütunu datetime)
+            resolution: 'daily', 'weekly' veya 'monthly'
+
+        Returns:
+            DataFrame: Kova başına ortalamalar ve sample_count
+        """
+        if resolution not in LODService.RESOLUTIONS:
+            raise ValueError(f"Geçersiz çözünürlük: {resolution}")
+
+        if df.empty:
+            return df
+
+        numeric_cols = [
+            col for col in df.select_dtypes(include='number').columns
+            if col != 'timestamp'
+        ]
+
+        grouped = df.groupby(
+            pd.Grouper(key='date', freq=LODService.RESOLUTIONS[resolution],
+                       label='left', closed='left')
+        )
+
+        rollup = grouped[numeric_cols].mean()
+        rollup['sample_count'] = grouped.size()
+        rollup = rollup[rollup['sample_count'] > 0].reset_index()
+
+        return rollup
+
+    @staticmethod
+    def lttb(df, target_points, value_col='ndvi_mean'):
+        """
+        Largest-Triangle-Three-Buckets ile görsel şekli koruyarak örnekle
+
+        Args:
+            df: Zaman serisi DataFrame
+            target_points: Hedef nokta sayısı (>= 3)
+            value_col: Şekli korunacak sütun
+
+        Returns:
+            DataFrame: Seçilen satırlar (orijinal sütunlarla)
+        """
+        df = df[df[value_col].notna()]
+        n = len(df)
+
+        if target_points >= n or target_points < 3:
+            return df.reset_index(drop=True)
+
+        x = df['date'].to_numpy().astype('datetime64[s]').astype(np.float64)
+        y = df[value_col].to_numpy(dtype=np.float64)
+
+        # İlk ve son nokta sabit, aradaki n-2 nokta target-2 kovaya bölünür
+        edges = np.linspace(1, n - 1, target_points - 1).astype(int)
+        selected = np.empty(target_points, dtype=np.int64)
+        selected[0] = 0
+        selected[-1] = n - 1
+
+        prev = 0
+        for i in range(target_points - 2):
+            start, end = edges[i], edges[i + 1]
+
+            # Sonraki kovanın ortalaması (son kovada son nokta)
+            next_start = end
+            next_end = edges[i + 2] if i + 2 < len(edges) else n
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+
+            # Üçgen alanı en büyük olan nokta
+            areas = np.abs(
+                (x[prev] - avg_x) * (y[start:end] - y[prev]) -
+                (x[prev] - x[start:end]) * (avg_y - y[prev])
+            )
+            prev = start + int(areas.argmax())
+            selected[i + 1] = prev
+
+        return df.iloc[selected].reset_index(drop=True)
+
+    @staticmethod
+    def cache_key(coordinates, start_date, end_date):
+        """Geometri ve tarih aralığından önbellek anahtarı"""
+        return f"{geometry_key(coordinates)}|{start_date}|{end_date}"
+
+    @staticmethod
+    def get_rollup(cache_key, resolution):
+        """Önbellekteki özeti getir (süresi dolmuşsa None)"""
+        key = (cache_key, resolution)
+
+        with LODService._lock:
+            entry = LODService._rollup_cache.get(key)
+
+            if entry is None:
+                return None
+
+            created_at, rollup = entry
+            if time.time() - created_at > current_app.config['LOD_CACHE_TTL']:
+                del LODService._rollup_cache[key]
+                return None
+
+            LODService._rollup_cache.move_to_end(key)
+            return rollup
+
+    @staticmethod
+    def store_rollup(cache_key, resolution, rollup):
+        """Özeti önbelleğe yaz (en az kullanılan özetler çıkarılır)"""
+        key = (cache_key, resolution)
+
+        with LODService._lock:
+            LODService._rollup_cache[key] = (time.time(), rollup)
+            LODService._rollup_cache.move_to_end(key)
+            while len(LODService._rollup_cache) > current_app.config['LOD_CACHE_SIZE']:
+                LODService._rollup_cache.popitem(last=False)
+
+    @staticmethod
+    def reduce(df, resolution=None, max_points=None, cache_key=None):
+        """
+        Grafik için seriyi indirge: önce çözünürlüğe göre topla,
+        sonra hâlâ fazla nokta varsa LTTB uygula
+
+        Args:
+            df: Ham zaman serisi
+            resolution: None (ham), 'daily', 'weekly', 'monthly'
+            max_points: Hedef maksimum nokta sayısı
+            cache_key: Verilirse özet önbelleğe alınır
+
+        Returns:
+            DataFrame: İndirgenmiş seri
+        """
+        if resolution:
+            rollup = None
+            if cache_key is not None:
+                rollup = LODService.get_rollup(cache_key, resolution)
+
+            if rollup is None:
+                rollup = LODService.resample(df, resolution)
+                if cache_key is not None:
+                    LODService.store_rollup(cache_key, resolution, rollup)
+
+            df = rollup
+
+        if max_points and len(df) > max_points:
+            df = LODService.lttb(df, int(max_points))
+
+        return df
@@ -7,9 +7,10 @@ import pickle
 import numpy as np
 import pandas as pd
 from datetime import datetime
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 from app.services.baseline_service import BaselineService
+from app.services.inference import load_artifact
+from app.services.trend_engine import TrendEngine
+from app.services.observation_store import ObservationStore
 
 
 class MLService:
@@ -18,23 +19,32 @@ class MLService:
     MODEL_PATH = 'ml/model.pkl'
     SCALER_PATH = 'ml/scaler.pkl'
     
+    # Servis artefaktı (scikit-learn gerektirmez); depoda tutulmaz,
+    # python ml/train_model.py ile üretilir
+    ARTIFACT_PATH = 'ml/model.npz'
+    
+    # Yüklenen model (süreç başına bir kez)
+    _model_cache = None
+    
     # Risk seviyeleri
     RISK_LABELS = {0: 'Düşük', 1: 'Orta', 2: 'Yüksek'}
     
     @staticmethod
-    def prepare_features(current_data, baseline, timeseries_df):
+    def prepare_features(current_data, baseline, timeseries_df, week=None):
         """
         ML modeli için özellik vektörü hazırla
         
         Args:
             current_data: Güncel ölçüm dict
             baseline: Baseline dict
-            timeseries_df: Son birkaç haftanın verisi
+            timeseries_df: Son birkaç haftanın verisi (route'lar yumuşatılmış
+                           seriyi verir, bkz. SmoothingService)
+            week: Hafta numarası (varsayılan: bu hafta)
             
         Returns:
             np.array: Özellik vektörü
         """
-        current_week = datetime.now().isocalendar().week
+        current_week = week or datetime.now().isocalendar().week
         
         # Baseline DataFrame
         baseline_df = pd.DataFrame(baseline['baseline'])
@@ -61,13 +71,14 @@ class MLService:
         week_sin = np.sin(2 * np.pi * current_week / 52)
         week_cos = np.cos(2 * np.pi * current_week / 52)
         
-        # Sapma yüzdesi
+        # Sapma yüzdesi (Z-skoruyla aynı merkezden)
         week_baseline = baseline_df[baseline_df['week'] == current_week]
+        deviation_pct = 0
         if not week_baseline.empty:
-            expected_ndvi = week_baseline['ndvi_mu'].values[0]
-            deviation_pct = (expected_ndvi - current_data['ndvi_mean']) / expected_ndvi * 100
-        else:
-            deviation_pct = 0
+            center, _ = BaselineService.z_columns(baseline_df, 'ndvi')
+            expected_ndvi = week_baseline[center].values[0]
+            if expected_ndvi != 0:
+                deviation_pct = (expected_ndvi - current_data['ndvi_mean']) / expected_ndvi * 100
         
         # Özellik vektörü
         features = np.array([
@@ -86,14 +97,17 @@ class MLService:
         return features.reshape(1, -1)
     
     @staticmethod
-    def calculate_rule_based_risk(current_data, baseline, timeseries_df):
+    def calculate_rule_based_risk(current_data, baseline, timeseries_df, week=None):
         """
         Kural bazlı risk skoru hesapla (ML yoksa veya karşılaştırma için)
         
+        Args:
+            week: Hafta numarası (varsayılan: bu hafta)
+        
         Returns:
             dict: score (0-100), level (Düşük/Orta/Yüksek), factors
         """
-        current_week = datetime.now().isocalendar().week
+        current_week = week or datetime.now().isocalendar().week
         baseline_df = pd.DataFrame(baseline['baseline'])
         
         score = 0
@@ -163,14 +177,44 @@ class MLService:
     
     @staticmethod
     def load_model():
-        """Eğitilmiş modeli yükle"""
-        if os.path.exists(MLService.MODEL_PATH):
+        """
+        Eğitilmiş modeli yükle
+        Önce NumPy artefaktı denenir (train_model.py'nin karşılaştırıp
+        seçtiği model ailesi: orman, gradient boosting veya lojistik
+        regresyon); yalnızca eski pickle dosyaları
+        varsa scikit-learn (unpickle sırasında) import edilir.
+        """
+        if MLService._model_cache is not None:
+            return MLService._model_cache
+        
+        model, scaler = None, None
+        
+        if os.path.exists(MLService.ARTIFACT_PATH):
+            model, scaler = load_artifact(MLService.ARTIFACT_PATH)
+        elif os.path.exists(MLService.MODEL_PATH):
             with open(MLService.MODEL_PATH, 'rb') as f:
                 model = pickle.load(f)
             with open(MLService.SCALER_PATH, 'rb') as f:
                 scaler = pickle.load(f)
-            return model, scaler
-        return None, None
+        
+        if model is not None:
+            MLService._model_cache = (model, scaler)
+        
+        return model, scaler
+    
+    @staticmethod
+    def _class_probabilities(model, probabilities):
+        """
+        predict_proba sütunlarını risk etiketlerine eşle
+        Sütun sırası model.classes_'tır; eğitimde görülmeyen sınıfın
+        olasılığı 0
+        """
+        column = {int(c): i for i, c in enumerate(model.classes_)}
+        zeros = np.zeros(len(probabilities))
+        return {
+            label: probabilities[:, column[c]] if c in column else zeros
+            for c, label in MLService.RISK_LABELS.items()
+        }
     
     @staticmethod
     def predict_risk(current_data, baseline, timeseries_df):
@@ -198,15 +242,15 @@ class MLService:
                 features_scaled = scaler.transform(features)
                 
                 prediction = model.predict(features_scaled)[0]
-                probabilities = model.predict_proba(features_scaled)[0]
+                probabilities = MLService._class_probabilities(
+                    model, model.predict_proba(features_scaled)
+                )
                 
                 ml_prediction = {
                     'class': int(prediction),
-                    'level': MLService.RISK_LABELS[prediction],
+                    'level': MLService.RISK_LABELS[int(prediction)],
                     'probabilities': {
-                        'Düşük': float(probabilities[0]),
-                        'Orta': float(probabilities[1]),
-                        'Yüksek': float(probabilities[2])
+                        label: float(p[0]) for label, p in probabilities.items()
                     }
                 }
             except Exception as e:
@@ -217,4 +261,118 @@ class MLService:
             'ml_prediction': ml_prediction,
             'final_level': ml_prediction['level'] if ml_prediction else rule_based['level'],
             'timestamp': datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def replay_risk(timeseries, baseline, window=3):
+        """
+        Geçmiş her gözlem tarihi için risk skorunu tek vektörel geçişte hesapla
+        (calculate_rule_based_risk ve prepare_features ile aynı kurallar)
+        
+        Args:
+            timeseries: Tarlanın gözlem serisi; DataFrame (date, ndvi_mean,
+                        ndmi_mean, ...) veya ObservationStore dilimi
+            baseline: Baseline dict
+            window: Trend penceresi (ölçüm sayısı)
+            
+        Returns:
+            DataFrame: tarih başına z-skorları, trend, kural ve ML risk seviyeleri
+        """
+        if isinstance(timeseries, pd.DataFrame):
+            timeseries = ObservationStore.columns_from_frame(timeseries)
+        
+        baseline_df = pd.DataFrame(baseline['baseline']).set_index('week')
+        
+        day = timeseries['day']
+        ndvi = timeseries['ndvi_mean'].astype(np.float64)
+        ndmi = timeseries['ndmi_mean'].astype(np.float64)
+        weeks = ObservationStore.iso_weeks(day).astype(np.int64)
+        
+        # Tarih başına haftalık baseline (hafta yoksa NaN); calculate_zscore
+        # ile aynı merkez/ölçek (varsa medyan ve dayanıklı σ)
+        week_stats = baseline_df.reindex(weeks)
+        ndvi_center, ndvi_scale = BaselineService.z_columns(baseline_df, 'ndvi')
+        ndmi_center, ndmi_scale = BaselineService.z_columns(baseline_df, 'ndmi')
+        ndvi_mu = week_stats[ndvi_center].to_numpy(dtype=np.float64)
+        ndvi_sigma = week_stats[ndvi_scale].to_numpy(dtype=np.float64)
+        ndmi_mu = week_stats[ndmi_center].to_numpy(dtype=np.float64)
+        ndmi_sigma = week_stats[ndmi_scale].to_numpy(dtype=np.float64)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_ndvi = np.where(ndvi_sigma > 0, (ndvi - ndvi_mu) / ndvi_sigma, np.nan)
+            z_ndmi = np.where(ndmi_sigma > 0, (ndmi - ndmi_mu) / ndmi_sigma, np.nan)
+            deviation_pct = np.where(ndvi_mu != 0, (ndvi_mu - ndvi) / ndvi_mu * 100, 0.0)
+        
+        # Trend (kayan pencere, gerçek gün aralıklarıyla)
+        dates = ObservationStore.to_dates(day)
+        slope_per_day, trend_r2 = TrendEngine.rolling(
+            TrendEngine.day_offsets(dates), ndvi, window=window
+        )
+        slope = slope_per_day * TrendEngine.step_days()
+        direction = TrendEngine.direction(slope)
+        slope = np.nan_to_num(slope)
+        
+        # Kural bazlı skor
+        abs_z = np.abs(z_ndvi)
+        score = (
+            np.select([ndvi < 0.20, ndvi < 0.30], [40, 25], default=0) +
+            np.select([abs_z > 3, abs_z > 2, abs_z > 1.5], [30, 20, 10], default=0) +
+            np.where(direction == 'decreasing', np.where(slope < -0.05, 25, 15), 0) +
+            np.where(ndmi < -0.2, 15, 0)
+        )
+        score = np.minimum(score, 100)
+        rule_level = np.select([score < 30, score < 60], ['Düşük', 'Orta'], default='Yüksek')
+        
+        result = pd.DataFrame({
+            'date': pd.to_datetime(dates),
+            'ndvi_mean': ndvi,
+            'ndmi_mean': ndmi,
+            'z_ndvi': z_ndvi,
+            'z_ndmi': z_ndmi,
+            'trend_slope': slope,
+            'trend_r2': trend_r2,
+            'trend_direction': direction,
+            'score': score,
+            'rule_level': rule_level
+        })
+        
+        # ML tahmini (tüm tarihler tek batch)
+        model, scaler = MLService.load_model()
+        final_level = rule_level
+        
+        if model is not None and len(day) > 0:
+            z_ndvi_f = np.nan_to_num(z_ndvi)
+            clear = timeseries['clear_pixel_ratio'].astype(np.float64)
+            clear = np.where(np.isnan(clear), 0.8, clear)
+            
+            features = np.column_stack([
+                ndvi,
+                ndmi,
+                z_ndvi_f,
+                np.nan_to_num(z_ndmi),
+                np.abs(z_ndvi_f),
+                np.nan_to_num(deviation_pct),
+                slope,
+                np.sin(2 * np.pi * weeks / 52),
+                np.cos(2 * np.pi * weeks / 52),
+                clear
+            ])
+            
+            try:
+                probabilities = model.predict_proba(scaler.transform(features))
+                # model.predict ile aynı eşleme: sütunlar model.classes_ sırasında
+                classes = model.classes_[probabilities.argmax(axis=1)]
+                labels = np.array([MLService.RISK_LABELS[int(c)] for c in classes])
+                by_label = MLService._class_probabilities(model, probabilities)
+                
+                result['ml_level'] = labels
+                result['p_low'] = by_label['Düşük']
+                result['p_medium'] = by_label['Orta']
+                result['p_high'] = by_label['Yüksek']
+                final_level = labels
+            except Exception as e:
+                print(f"ML tahmin hatası: {e}")
+        
+        result['final_level'] = final_level
+        
+        return result
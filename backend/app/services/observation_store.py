@@ -0,0 +1,234 @@
+"""
+Sütun Bazlı Gözlem Deposu
+Çok sayıda tarlanın gözlem serisini bellekte tek bir yapı-dizisi
+(struct-of-arrays) olarak tutar: öznitelik başına bitişik float32 dizi,
+tarih için int32 gün numarası ve tarla başına ofset indeksi. Servisler
+tarla serisini kopya almadan (dizi dilimi olarak) okur. Seri sayısı
+OBSERVATION_STORE_MAX_SERIES ile sınırlıdır (en az kullanılan çıkarılır).
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+# Sınır aşılınca seri sayısı bu orana indirilir; sıkıştırma her yazmada
+# değil, toplu çıkarmadan sonra bir kez yapılır
+EVICT_TO = 0.9
+
+
+class ObservationStore:
+    """Tarla bazlı gözlemler için bellek içi sütun deposu"""
+
+    COLUMNS = ('ndvi_mean', 'ndvi_std', 'ndmi_mean', 'clear_pixel_ratio', 'cloud_percentage')
+
+    _lock = threading.Lock()
+
+    _capacity = 0
+    _size = 0
+    _day = np.empty(0, dtype=np.int32)
+    _values = {name: np.empty(0, dtype=np.float32) for name in COLUMNS}
+
+    # anahtar -> (başlangıç, bitiş) satır ofsetleri (LRU sırasıyla)
+    _index = OrderedDict()
+    # Üzerine yazılan tarlaların boşa düşen satırları (compact ile geri alınır)
+    _dead = 0
+    # Rapor için: depoya yazılan DataFrame'lerin pandas bellek kullanımı
+    _frame_bytes = {}
+
+    @staticmethod
+    def day_numbers(dates):
+        """Tarihleri 1970-01-01'den itibaren gün numarasına çevir"""
+        return (np.asarray(dates, dtype='datetime64[D]') - EPOCH).astype(np.int32)
+
+    @staticmethod
+    def to_dates(day):
+        """Gün numaralarını datetime64[D] dizisine çevir"""
+        return EPOCH + np.asarray(day, dtype=np.int64)
+
+    @staticmethod
+    def iso_weeks(day):
+        """Gün numaralarından ISO hafta numaraları (vektörel)"""
+        day = np.asarray(day, dtype=np.int64)
+        # 1970-01-01 perşembe: Pazartesi=0 olacak şekilde haftanın günü
+        weekday = (day + 3) % 7
+        thursday = EPOCH + (day - weekday + 3)
+        year_start = thursday.astype('datetime64[Y]').astype('datetime64[D]')
+        return ((thursday - year_start).astype(np.int64) // 7 + 1).astype(np.int32)
+
+    @staticmethod
+    def years(day):
+        """Gün numaralarından takvim yılı"""
+        return (ObservationStore.to_dates(day).astype('datetime64[Y]').astype(np.int32) + 1970)
+
+    @staticmethod
+    def columns_from_frame(df, dtype=np.float64):
+        """
+        DataFrame'i (tarihe göre sıralı) sütun dizilerine çevir
+        Eksik sütunlar NaN olur
+        """
+        df = df.sort_values('date')
+        columns = {'day': ObservationStore.day_numbers(df['date'].to_numpy())}
+        for name in ObservationStore.COLUMNS:
+            columns[name] = (df[name].to_numpy(dtype=dtype) if name in df
+                             else np.full(len(df), np.nan, dtype=dtype))
+        return columns
+
+    @classmethod
+    def _grow(cls, needed):
+        """Kapasiteyi ikiye katlayarak büyüt (kilit altında çağrılır)"""
+        if cls._size + needed <= cls._capacity:
+            return
+
+        capacity = max(1024, cls._capacity)
+        while capacity < cls._size + needed:
+            capacity *= 2
+
+        day = np.empty(capacity, dtype=np.int32)
+        day[:cls._size] = cls._day[:cls._size]
+        cls._day = day
+
+        for name in cls.COLUMNS:
+            values = np.empty(capacity, dtype=np.float32)
+            values[:cls._size] = cls._values[name][:cls._size]
+            cls._values[name] = values
+
+        cls._capacity = capacity
+
+    @classmethod
+    def put(cls, key, df):
+        """
+        Tarla serisini depoya yaz (varsa eskisinin yerine geçer)
+
+        Args:
+            key: Tarla / seri anahtarı
+            df: date ve COLUMNS sütunlarını içeren DataFrame
+        """
+        columns = cls.columns_from_frame(df, dtype=np.float32)
+        n = len(columns['day'])
+
+        with cls._lock:
+            if key in cls._index:
+                start, stop = cls._index[key]
+                cls._dead += stop - start
+
+            cls._grow(n)
+            start = cls._size
+            cls._day[start:start + n] = columns['day']
+            for name in cls.COLUMNS:
+                cls._values[name][start:start + n] = columns[name]
+
+            cls._size += n
+            cls._index[key] = (start, start + n)
+            cls._index.move_to_end(key)
+            cls._frame_bytes[key] = int(df.memory_usage(deep=True).sum())
+
+            max_series = current_app.config['OBSERVATION_STORE_MAX_SERIES']
+            if len(cls._index) > max_series:
+                cls._evict(int(max_series * EVICT_TO))
+            # Boşa düşen satırlar yarıyı geçtiyse sıkıştır
+            elif cls._dead > cls._size // 2:
+                cls._compact()
+
+    @classmethod
+    def _evict(cls, keep):
+        """En az kullanılan serileri çıkarıp sıkıştır (kilit altında çağrılır)"""
+        while len(cls._index) > keep:
+            key, (start, stop) = cls._index.popitem(last=False)
+            cls._frame_bytes.pop(key, None)
+            cls._dead += stop - start
+        cls._compact()
+
+    @classmethod
+    def view(cls, key):
+        """
+        Tarla serisinin salt okunur dizi dilimleri (kopya yok)
+
+        Returns:
+            dict veya None: day ve COLUMNS -> dizi
+        """
+        with cls._lock:
+            offsets = cls._index.get(key)
+            if offsets is None:
+                return None
+            cls._index.move_to_end(key)
+
+            start, stop = offsets
+            view = {'day': cls._day[start:stop]}
+            for name in cls.COLUMNS:
+                view[name] = cls._values[name][start:stop]
+
+        for array in view.values():
+            array.flags.writeable = False
+        return view
+
+    @classmethod
+    def frame(cls, key):
+        """Tarla serisini DataFrame olarak (uyumluluk için; kopyalar)"""
+        view = cls.view(key)
+        if view is None:
+            return None
+
+        df = pd.DataFrame({name: view[name] for name in cls.COLUMNS})
+        df.insert(0, 'date', pd.to_datetime(cls.to_dates(view['day'])))
+        return df
+
+    @classmethod
+    def discard(cls, key):
+        """Tarlayı depodan çıkar"""
+        with cls._lock:
+            offsets = cls._index.pop(key, None)
+            cls._frame_bytes.pop(key, None)
+            if offsets is not None:
+                cls._dead += offsets[1] - offsets[0]
+
+    @classmethod
+    def _compact(cls):
+        """
+        Canlı satırları yeni dizilere taşı (kilit altında çağrılır)
+        Önceden alınmış dilimler eski dizileri göstermeye devam eder
+        """
+        live = sum(stop - start for start, stop in cls._index.values())
+        capacity = max(1024, live * 2)
+
+        day = np.empty(capacity, dtype=np.int32)
+        values = {name: np.empty(capacity, dtype=np.float32) for name in cls.COLUMNS}
+
+        position = 0
+        for key, (start, stop) in cls._index.items():
+            n = stop - start
+            day[position:position + n] = cls._day[start:stop]
+            for name in cls.COLUMNS:
+                values[name][position:position + n] = cls._values[name][start:stop]
+            cls._index[key] = (position, position + n)
+            position += n
+
+        cls._day, cls._values = day, values
+        cls._size, cls._capacity, cls._dead = position, capacity, 0
+
+    @classmethod
+    def memory_report(cls):
+        """Depo bellek kullanımı ve aynı verinin pandas karşılığı (byte)"""
+        with cls._lock:
+            fields = len(cls._index)
+            live_rows = cls._size - cls._dead
+            row_bytes = cls._day.itemsize + sum(v.itemsize for v in cls._values.values())
+            allocated = cls._day.nbytes + sum(v.nbytes for v in cls._values.values())
+            pandas_bytes = sum(cls._frame_bytes.values())
+
+        live_bytes = live_rows * row_bytes
+
+        return {
+            'fields': fields,
+            'rows': live_rows,
+            'dead_rows': cls._dead,
+            'bytes_per_row': row_bytes,
+            'live_bytes': live_bytes,
+            'allocated_bytes': allocated,
+            'bytes_per_field': live_bytes / fields if fields else 0,
+            'pandas_bytes': pandas_bytes,
+            'pandas_bytes_per_field': pandas_bytes / fields if fields else 0,
+            'reduction': pandas_bytes / live_bytes if live_bytes else None
+        }
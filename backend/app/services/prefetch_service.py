@@ -0,0 +1,145 @@
+"""
+Görünüm Alanı Önden Yükleme (Prefetch)
+Harita görünümündeki kayıtlı tarlaların güncel gözlemlerini ve baseline
+serilerini arka planda, düşük öncelikle (yenileme sınıfı) hazırlar.
+Kullanıcı tarlaya tıkladığında risk hesabı GEE'yi beklemeden önbellekten
+yapılır.
+"""
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from app.services.gee_service import GEEService
+from app.services.baseline_service import BaselineService
+from app.services.scheduler import WorkScheduler
+from app.utils.geometry import canonicalize, geometry_key, is_point
+
+
+class PrefetchService:
+    """Son 30 günlük gözlem önbelleği ve arka plan yenileme"""
+
+    _lock = threading.Lock()
+    _executor = None
+
+    # geometri anahtarı -> (yüklenme zamanı, son 30 günlük DataFrame)
+    _recent = OrderedDict()
+    # Kuyruktaki / çalışan geometri anahtarları
+    _inflight = set()
+
+    @staticmethod
+    def bounds(coordinates):
+        """Kanonik geometrinin sınır kutusu (west, south, east, north)"""
+        coordinates, _ = canonicalize(coordinates)
+        if is_point(coordinates):
+            lon, lat = coordinates
+            return lon, lat, lon, lat
+        lons = [c[0] for c in coordinates]
+        lats = [c[1] for c in coordinates]
+        return min(lons), min(lats), max(lons), max(lats)
+
+    @staticmethod
+    def fields_in_bbox(fields, bbox):
+        """
+        Sınır kutusuyla kesişen tarlalar (görünüm merkezine yakın olan önce)
+
+        Args:
+            fields: [{'id': ..., 'coordinates': ...}, ...]
+            bbox: [west, south, east, north]
+        """
+        west, south, east, north = bbox
+        center = ((west + east) / 2, (south + north) / 2)
+
+        visible = []
+        for field in fields:
+            w, s, e, n = PrefetchService.bounds(field['coordinates'])
+            if w <= east and e >= west and s <= north and n >= south:
+                distance = ((w + e) / 2 - center[0]) ** 2 + ((s + n) / 2 - center[1]) ** 2
+                visible.append((distance, field))
+
+        visible.sort(key=lambda item: item[0])
+        return [field for _, field in visible]
+
+    @staticmethod
+    def _fresh(key):
+        entry = PrefetchService._recent.get(key)
+        ttl = current_app.config['PREFETCH_TTL']
+        return entry is not None and time.monotonic() - entry[0] < ttl
+
+    @staticmethod
+    def recent_timeseries(coordinates):
+        """
+        Son 30 günün gözlemleri (taze önbellek varsa GEE'ye gidilmez)
+
+        Returns:
+            DataFrame
+        """
+        key = geometry_key(coordinates)
+
+        with PrefetchService._lock:
+            if PrefetchService._fresh(key):
+                PrefetchService._recent.move_to_end(key)
+                return PrefetchService._recent[key][1]
+
+        end_date = datetime.now().strftime('%Y-%m-%d')
+        start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        df = GEEService.get_timeseries(coordinates, start_date, end_date)
+
+        with PrefetchService._lock:
+            PrefetchService._recent[key] = (time.monotonic(), df)
+            PrefetchService._recent.move_to_end(key)
+            while len(PrefetchService._recent) > current_app.config['PREFETCH_CACHE_SIZE']:
+                PrefetchService._recent.popitem(last=False)
+
+        return df
+
+    @staticmethod
+    def _refresh(app, field, key):
+        """Arka plan işi: güncel gözlemler + baseline serisi"""
+        try:
+            with app.app_context(), WorkScheduler.priority(WorkScheduler.REFRESH):
+                PrefetchService.recent_timeseries(field['coordinates'])
+                # Çok yıllık seri ObservationStore'a yazılır
+                BaselineService.calculate_baseline(field['coordinates'])
+        except Exception as e:
+            print(f"Prefetch hatası (tarla {field.get('id')}): {e}")
+        finally:
+            with PrefetchService._lock:
+                PrefetchService._inflight.discard(key)
+
+    @staticmethod
+    def schedule(fields):
+        """
+        Tarlalar için arka plan yenilemesi kuyruğa al
+        Taze olan veya zaten kuyrukta olan tarlalar atlanır
+
+        Returns:
+            dict: queued, fresh, inflight sayıları
+        """
+        app = current_app._get_current_object()
+        limit = app.config['PREFETCH_MAX_FIELDS']
+
+        with PrefetchService._lock:
+            if PrefetchService._executor is None:
+                PrefetchService._executor = ThreadPoolExecutor(
+                    max_workers=app.config['PREFETCH_WORKERS'],
+                    thread_name_prefix='prefetch'
+                )
+
+            counts = {'queued': 0, 'fresh': 0, 'inflight': 0}
+            for field in fields[:limit]:
+                key = geometry_key(field['coordinates'])
+
+                if key in PrefetchService._inflight:
+                    counts['inflight'] += 1
+                elif PrefetchService._fresh(key):
+                    counts['fresh'] += 1
+                else:
+                    PrefetchService._inflight.add(key)
+                    PrefetchService._executor.submit(
+                        PrefetchService._refresh, app, field, key
+                    )
+                    counts['queued'] += 1
+
+        return counts
@@ -0,0 +1,195 @@
+"""
+Haftalık Kantil Özetleri (Sketch)
+Bir indeksin (NDVI/NDMI) hafta başına dağılımını sabit bellekte tutar.
+Birkaç yıllık baseline'da bir hafta yalnızca 3-6 gözlem içerir; hafta
+başına `exact` değere kadar gözlemler sıralı bir tamponda birebir saklanır
+ve kantiller bunlardan tam hesaplanır. Tampon taşan haftalar [-1, 1]
+aralığının eşit genişlikli kutularına aktarılır: kutu sayaçları ile kutu
+içi en küçük/en büyük değer tutulur, sıralı değerler kutunun gözlenen
+aralığına eşit aralıklı yerleştirilir (sabit seride hata yok, genel hata
+bir kutu genişliğiyle sınırlı). Ayrıca sayı/ortalama/M2 momentleri
+saklanır. Gözlemler parça parça (ör. yıl yıl) eklenir; iki özet toplanarak
+birleştirilir (tarla veya yıl bazlı kısmi özetler sırası fark etmeden
+birleşir).
+"""
+import numpy as np
+
+# ISO hafta numarası 1..53 doğrudan satır indeksi olarak kullanılır
+WEEKS = 54
+
+# Normalize fark indekslerinin tanım aralığı
+LOW, HIGH = -1.0, 1.0
+
+
+class WeeklySketch:
+    """Hafta başına birleştirilebilir tam tampon + histogram + moment özeti"""
+
+    def __init__(self, bins, exact=64):
+        self.bins = bins
+        self.exact = exact
+
+        # Tam değer tamponu (hafta başına ilk `buffered` hücre dolu)
+        self.buffer = np.full((WEEKS, exact), np.nan)
+        self.buffered = np.zeros(WEEKS, dtype=np.int64)
+        # Tamponu taşıp histograma geçen haftalar
+        self.spilled = np.zeros(WEEKS, dtype=bool)
+
+        self.counts = np.zeros((WEEKS, bins), dtype=np.uint32)
+        self.bin_min = np.full((WEEKS, bins), np.inf)
+        self.bin_max = np.full((WEEKS, bins), -np.inf)
+
+        self.n = np.zeros(WEEKS, dtype=np.int64)
+        self.mean = np.zeros(WEEKS, dtype=np.float64)
+        self.m2 = np.zeros(WEEKS, dtype=np.float64)
+
+    @property
+    def width(self):
+        return (HIGH - LOW) / self.bins
+
+    def _merge_moments(self, n, mean, m2):
+        """Paralel (Chan) ortalama/varyans birleştirme, hafta bazlı"""
+        total = self.n + n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * n / total, 0.0)
+            self.m2 = np.where(total > 0, self.m2 + m2 + delta ** 2 * self.n * n / total, 0.0)
+        self.n = total
+
+    def _histogram_add(self, weeks, values):
+        """Değerleri kutu sayaçlarına ve kutu min/max'ına ekle"""
+        if len(values) == 0:
+            return
+        bin_index = np.clip(((values - LOW) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(
+            weeks * self.bins + bin_index, minlength=WEEKS * self.bins
+        ).reshape(WEEKS, self.bins).astype(np.uint32)
+        np.minimum.at(self.bin_min, (weeks, bin_index), values)
+        np.maximum.at(self.bin_max, (weeks, bin_index), values)
+
+    def _spill(self, weeks):
+        """Haftaların tamponunu histograma aktar"""
+        weeks = np.asarray(weeks, dtype=np.int64)
+        weeks = weeks[~self.spilled[weeks]]
+        if len(weeks) == 0:
+            return
+        rows = np.repeat(weeks, self.buffered[weeks])
+        values = np.concatenate([self.buffer[w, :self.buffered[w]] for w in weeks])
+        self._histogram_add(rows, values)
+        self.buffer[weeks] = np.nan
+        self.buffered[weeks] = 0
+        self.spilled[weeks] = True
+
+    def _add_values(self, weeks, values):
+        """Değerleri tampona (sığıyorsa) veya histograma ekle"""
+        incoming = np.bincount(weeks, minlength=WEEKS)
+        overflow = np.flatnonzero((incoming > 0) & (self.buffered + incoming > self.exact))
+        self._spill(overflow)
+
+        to_histogram = self.spilled[weeks]
+        self._histogram_add(weeks[to_histogram], values[to_histogram])
+
+        weeks, values = weeks[~to_histogram], values[~to_histogram]
+        for week in np.unique(weeks):
+            chunk = values[weeks == week]
+            start = self.buffered[week]
+            row = self.buffer[week]
+            row[start:start + len(chunk)] = chunk
+            row[:start + len(chunk)].sort()
+            self.buffered[week] += len(chunk)
+
+    def update(self, weeks, values):
+        """
+        Bir parça gözlemi ekle
+
+        Args:
+            weeks: ISO hafta numaraları (1..53)
+            values: Aynı uzunlukta indeks değerleri
+        """
+        weeks = np.asarray(weeks, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        valid = np.isfinite(values)
+        weeks, values = weeks[valid], values[valid]
+        if len(values) == 0:
+            return
+
+        self._add_values(weeks, values)
+
+        # Parçanın hafta bazlı momentleri
+        n = np.bincount(weeks, minlength=WEEKS)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(n > 0, np.bincount(weeks, weights=values, minlength=WEEKS) / n, 0.0)
+        m2 = np.bincount(weeks, weights=(values - mean[weeks]) ** 2, minlength=WEEKS)
+        self._merge_moments(n, mean, m2)
+
+    def merge(self, other):
+        """Başka bir özeti bu özete ekle"""
+        if other.bins != self.bins:
+            raise ValueError('Kutu sayısı farklı özetler birleştirilemez')
+
+        # Diğer tarafta histograma geçmiş haftalar burada da geçer
+        self._spill(np.flatnonzero(other.spilled))
+        self.counts += other.counts
+        np.minimum(self.bin_min, other.bin_min, out=self.bin_min)
+        np.maximum(self.bin_max, other.bin_max, out=self.bin_max)
+
+        # Tampon satır satır okunur; hafta sırası np.repeat ile aynı
+        filled = np.arange(other.buffer.shape[1])[None, :] < other.buffered[:, None]
+        self._add_values(np.repeat(np.arange(WEEKS), other.buffered), other.buffer[filled])
+
+        self._merge_moments(other.n, other.mean, other.m2)
+        return self
+
+    def _order_statistic(self, cumulative, k):
+        """
+        Histograma geçmiş haftalarda sıralı k. değerin (0 tabanlı) tahmini:
+        kutudaki değerler kutunun gözlenen [min, max] aralığına sırayla eşit
+        aralıklı yerleştirilir
+        """
+        rows = np.arange(WEEKS)
+        b = np.minimum((cumulative <= k[:, None]).sum(axis=1), self.bins - 1)
+        before = np.where(b > 0, cumulative[rows, np.maximum(b - 1, 0)], 0.0)
+        inside = self.counts[rows, b].astype(np.float64)
+        rank = k - before
+
+        low, high = self.bin_min[rows, b], self.bin_max[rows, b]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(inside > 1, rank / (inside - 1), 0.0)
+            return np.where(inside > 0, low + fraction * (high - low), np.nan)
+
+    def quantiles(self, qs):
+        """
+        Hafta başına kantiller (numpy.quantile 'linear' tanımı: komşu iki
+        sıralı değer arasında doğrusal ara değer). Tampondaki haftalarda
+        tamdır.
+
+        Returns:
+            np.array: (WEEKS, len(qs)); gözlemi olmayan haftalarda NaN
+        """
+        result = np.full((WEEKS, len(qs)), np.nan)
+
+        exact_weeks = np.flatnonzero(~self.spilled & (self.buffered > 0))
+        for week in exact_weeks:
+            result[week] = np.quantile(self.buffer[week, :self.buffered[week]], qs)
+
+        if not self.spilled.any():
+            return result
+
+        cumulative = np.cumsum(self.counts, axis=1, dtype=np.float64)
+        total = cumulative[:, -1]
+        last = np.maximum(total - 1, 0)
+
+        for j, q in enumerate(qs):
+            position = q * last
+            lower = np.floor(position)
+            upper = np.minimum(lower + 1, last)
+            low_value = self._order_statistic(cumulative, lower)
+            high_value = self._order_statistic(cumulative, upper)
+            value = low_value + (position - lower) * (high_value - low_value)
+            result[:, j] = np.where(self.spilled & (total > 0), value, result[:, j])
+
+        return result
+
+    def std(self):
+        """Hafta başına örneklem standart sapması (ddof=1; tek örnekte NaN)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
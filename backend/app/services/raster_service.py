@@ -0,0 +1,387 @@
+"""
+Piksel Bazlı Tarla Analizi (Raster Modu)
+Tarlanın maskeli NDVI/NDMI piksellerini bir kez indirir ve diskte
+tarih×y×x boyutlu memory-mapped küpler olarak saklar. Piksel bazlı
+baseline ve Z-skorları yerelde hesaplanır; aynı tarla için tekrar
+tekrar bölge (zone) analizi yapmak GEE maliyeti doğurmaz.
+
+Tarla klasöründe iki küp tutulur: kapalı baseline dönemi (tarih aralığıyla
+adlandırılır) ve güncel dönem ('recent'). Güncel küp her gün baştan
+indirilmez; yalnızca kapanmamış son günler çekilip küp kaydırılır.
+"""
+import os
+import json
+import math
+import shutil
+import warnings
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from app.services.gee_service import GEEService
+from app.utils.geometry import canonicalize, is_point, geometry_key
+
+METERS_PER_DEGREE = 111320.0
+
+# Güncel dönem küpünün klasör adı (tarih aralığından bağımsız)
+RECENT_CUBE = 'recent'
+
+# Z-skoru bölgeleri: (isim, alt sınır, üst sınır)
+ZONES = [
+    ('severe', -np.inf, -2.0),
+    ('stressed', -2.0, -1.0),
+    ('normal', -1.0, 1.0),
+    ('above', 1.0, np.inf)
+]
+
+
+class RasterCube:
+    """Diskte memory-mapped tarih×y×x NDVI/NDMI küpü"""
+
+    LAYERS = ('ndvi', 'ndmi')
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+        self.dates = np.array(meta['dates'], dtype='datetime64[D]')
+        self.shape = (len(self.dates), meta['height'], meta['width'])
+
+    def layer(self, name):
+        """Katmanı salt okunur memmap olarak aç (veri belleğe kopyalanmaz)"""
+        if self.shape[0] == 0:
+            return np.empty(self.shape, dtype=np.float32)
+        return np.memmap(
+            os.path.join(self.directory, f'{name}.dat'),
+            dtype=np.float32, mode='r', shape=self.shape
+        )
+
+    @staticmethod
+    def open(directory):
+        """Var olan küpü aç (yoksa None)"""
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return RasterCube(directory, json.load(f))
+
+    @staticmethod
+    def write(directory, grid, dates, layers):
+        """
+        Küpü diske yaz (önce geçici klasöre, sonra atomik taşıma)
+
+        Args:
+            layers: {'ndvi': (T,H,W), 'ndmi': (T,H,W)}
+        """
+        tmp_dir = f'{directory}.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        # Aynı güne düşen karolar (tile) tek gözlemde birleştirilir
+        unique_dates, inverse = np.unique(dates, return_inverse=True)
+
+        for name, values in layers.items():
+            if len(unique_dates) == 0:
+                continue
+            out = np.memmap(
+                os.path.join(tmp_dir, f'{name}.dat'), dtype=np.float32, mode='w+',
+                shape=(len(unique_dates),) + values.shape[1:]
+            )
+            for i in range(len(unique_dates)):
+                with warnings.catch_warnings():
+                    # Tamamen maskeli pikseller NaN kalır
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    out[i] = np.nanmean(values[inverse == i], axis=0)
+            out.flush()
+            del out
+
+        meta = dict(grid)
+        meta['dates'] = [str(d) for d in unique_dates]
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+
+        return RasterCube.open(directory)
+
+
+class RasterService:
+    """Piksel küplerinin yönetimi ve piksel bazlı Z-skoru analizi"""
+
+    @staticmethod
+    def grid_for(coordinates):
+        """
+        Tarla için EPSG:4326 piksel ızgarası (yaklaşık RASTER_SCALE metre)
+
+        Raises:
+            ValueError: Izgara RASTER_MAX_PIXELS'ten büyükse
+        """
+        scale = current_app.config['RASTER_SCALE']
+        coordinates, _ = canonicalize(coordinates)
+
+        if is_point(coordinates):
+            # Nokta: _get_geometry ile aynı 250m tampon
+            lon, lat = coordinates
+            half_lat = 250 / METERS_PER_DEGREE
+            half_lon = 250 / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+            west, east = lon - half_lon, lon + half_lon
+            south, north = lat - half_lat, lat + half_lat
+        else:
+            lons = [c[0] for c in coordinates]
+            lats = [c[1] for c in coordinates]
+            west, east, south, north = min(lons), max(lons), min(lats), max(lats)
+
+        mid_lat = math.radians((south + north) / 2)
+        dy = scale / METERS_PER_DEGREE
+        dx = scale / (METERS_PER_DEGREE * math.cos(mid_lat))
+
+        width = max(1, math.ceil((east - west) / dx))
+        height = max(1, math.ceil((north - south) / dy))
+
+        if width * height > current_app.config['RASTER_MAX_PIXELS']:
+            raise ValueError(
+                f"Tarla raster modu için çok büyük ({width}x{height} piksel)"
+            )
+
+        return {
+            'west': west, 'north': north, 'dx': dx, 'dy': dy,
+            'width': width, 'height': height
+        }
+
+    @staticmethod
+    def _field_dir(coordinates):
+        return os.path.join(current_app.config['RASTER_CACHE_DIR'], geometry_key(coordinates))
+
+    @staticmethod
+    def _cube_dir(coordinates, start_date, end_date):
+        return os.path.join(RasterService._field_dir(coordinates), f'{start_date}_{end_date}')
+
+    @staticmethod
+    def baseline_range():
+        """BASELINE_YEARS'ı kapsayan kapalı aralık (başlangıç, bitiş hariç)"""
+        years = current_app.config['BASELINE_YEARS']
+        return f'{years[0]}-01-01', f'{int(years[-1]) + 1}-01-01'
+
+    @staticmethod
+    def _download(coordinates, start_date, end_date, grid):
+        """
+        Aralığın piksellerini GEE'den indir (yıl yıl, istek boyutu sınırı için)
+
+        Returns:
+            tuple: (dates, {'ndvi': (T,H,W), 'ndmi': (T,H,W)})
+        """
+        all_dates, ndvi_parts, ndmi_parts = [], [], []
+        start_year = int(start_date[:4])
+        end_year = int(end_date[:4])
+
+        for year in range(start_year, end_year + 1):
+            chunk_start = max(start_date, f'{year}-01-01')
+            chunk_end = min(end_date, f'{year + 1}-01-01')
+            if chunk_start >= chunk_end:
+                continue
+
+            dates, ndvi, ndmi = GEEService.get_pixel_stack(
+                coordinates, chunk_start, chunk_end, grid
+            )
+            all_dates.append(dates)
+            ndvi_parts.append(ndvi)
+            ndmi_parts.append(ndmi)
+
+        if not all_dates:
+            raise ValueError('Geçersiz tarih aralığı')
+
+        dates = np.concatenate(all_dates)
+        layers = {
+            'ndvi': np.concatenate(ndvi_parts),
+            'ndmi': np.concatenate(ndmi_parts)
+        }
+        return dates, layers
+
+    @staticmethod
+    def ensure_cube(coordinates, start_date, end_date):
+        """
+        Kapalı dönem küpü: diskte yoksa GEE'den indir
+
+        Returns:
+            RasterCube
+        """
+        directory = RasterService._cube_dir(coordinates, start_date, end_date)
+        cube = RasterCube.open(directory)
+        if cube is not None:
+            return cube
+
+        grid = RasterService.grid_for(coordinates)
+        dates, layers = RasterService._download(coordinates, start_date, end_date, grid)
+
+        return RasterCube.write(directory, grid, dates, layers)
+
+    @staticmethod
+    def ensure_recent_cube(coordinates, start_date, end_date):
+        """
+        Güncel dönem küpü (tek klasör, artımlı güncellenir)
+
+        Küp aynı gün için tekrar indirilmez. Sonraki günlerde yalnızca
+        kapanmamış günler (son RASTER_LAG_DAYS) ve sonrası çekilir; eski
+        gözlemler küpten okunur, başlangıcın öncesi atılır.
+
+        Returns:
+            RasterCube
+        """
+        directory = os.path.join(RasterService._field_dir(coordinates), RECENT_CUBE)
+        cube = RasterCube.open(directory)
+        if cube is not None and cube.meta.get('end_date', '') >= end_date:
+            return cube
+
+        grid = RasterService.grid_for(coordinates)
+        lag = current_app.config['RASTER_LAG_DAYS']
+        closed_until = (datetime.strptime(end_date, '%Y-%m-%d') -
+                        timedelta(days=lag)).strftime('%Y-%m-%d')
+
+        fetch_start = start_date
+        if cube is not None and cube.meta.get('start_date', end_date) <= start_date:
+            fetch_start = max(start_date, min(cube.meta['closed_until'], closed_until))
+
+        dates, layers = RasterService._download(coordinates, fetch_start, end_date, grid)
+
+        if fetch_start > start_date:
+            # Küpte kalan kapalı günler yeni gözlemlerin önüne eklenir
+            keep = ((cube.dates >= np.datetime64(start_date, 'D')) &
+                    (cube.dates < np.datetime64(fetch_start, 'D')))
+            dates = np.concatenate([cube.dates[keep], dates])
+            layers = {
+                name: np.concatenate([np.asarray(cube.layer(name)[keep]), values])
+                for name, values in layers.items()
+            }
+
+        meta = {**grid, 'start_date': start_date, 'end_date': end_date,
+                'closed_until': closed_until}
+        cube = RasterCube.write(directory, meta, dates, layers)
+        RasterService._prune(coordinates)
+        return cube
+
+    @staticmethod
+    def _prune(coordinates):
+        """Tarla klasöründe güncel baseline ve güncel dönem dışındaki küpleri sil"""
+        field_dir = RasterService._field_dir(coordinates)
+        keep = {RECENT_CUBE, '_'.join(RasterService.baseline_range())}
+
+        for name in os.listdir(field_dir):
+            if name not in keep and not name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(field_dir, name), ignore_errors=True)
+
+    @staticmethod
+    def _iso_weeks(dates):
+        """datetime64[D] dizisi için ISO hafta numaraları"""
+        return np.array([d.isocalendar()[1] for d in dates.astype(object)])
+
+    @staticmethod
+    def pixel_baseline(cube, layer, week, window=None):
+        """
+        Belirli hafta için piksel bazlı μ ve σ
+
+        Args:
+            window: ±hafta penceresi (örnek sayısını artırmak için)
+
+        Returns:
+            tuple: (mu (H,W), sigma (H,W), örnek sayısı)
+        """
+        if window is None:
+            window = current_app.config['RASTER_BASELINE_WEEK_WINDOW']
+
+        weeks = RasterService._iso_weeks(cube.dates)
+
+        # Yıl sınırında dairesel hafta farkı
+        diff = np.abs(weeks - week)
+        diff = np.minimum(diff, 52 - diff)
+        selected = np.flatnonzero(diff <= window)
+
+        values = cube.layer(layer)
+        shape = cube.shape[1:]
+        if len(selected) == 0:
+            return np.full(shape, np.nan), np.full(shape, np.nan), 0
+
+        samples = np.asarray(values[selected], dtype=np.float64)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mu = np.nanmean(samples, axis=0)
+            sigma = np.nanstd(samples, axis=0, ddof=1)
+
+        # BaselineService ile aynı: tek örnekte 0.05, minimum 0.03
+        sigma = np.where(np.isnan(sigma), 0.05, sigma)
+        sigma = np.maximum(sigma, 0.03)
+
+        return mu, sigma, len(selected)
+
+    @staticmethod
+    def zone_summary(z_grid):
+        """Z-skoru ızgarasını bölgelere ayır ve piksel paylarını hesapla"""
+        valid = ~np.isnan(z_grid)
+        total = int(valid.sum())
+
+        zones = {}
+        for name, low, high in ZONES:
+            count = int(((z_grid >= low) & (z_grid < high) & valid).sum())
+            zones[name] = {
+                'pixels': count,
+                'share': count / total if total else 0
+            }
+
+        return {
+            'valid_pixels': total,
+            'mean_z': float(np.nanmean(z_grid)) if total else None,
+            'zones': zones
+        }
+
+    @staticmethod
+    def analyze(coordinates, recent_start, recent_end, date=None, layer='ndvi'):
+        """
+        Piksel bazlı Z-skoru analizi
+
+        Args:
+            recent_start, recent_end: Güncel dönem küpünün aralığı
+            date: Analiz edilecek tarih (varsayılan: en son gözlem)
+            layer: 'ndvi' veya 'ndmi'
+
+        Returns:
+            dict: tarih, ızgara bilgisi, z ızgarası ve bölge özeti (veri yoksa None)
+        """
+        if layer not in RasterCube.LAYERS:
+            raise ValueError(f"Geçersiz katman: {layer}")
+
+        baseline_cube = RasterService.ensure_cube(coordinates, *RasterService.baseline_range())
+        recent_cube = RasterService.ensure_recent_cube(coordinates, recent_start, recent_end)
+
+        if recent_cube.shape[0] == 0:
+            return None
+
+        values = recent_cube.layer(layer)
+
+        if date is None:
+            # Geçerli pikseli olan en son tarih
+            has_data = [not np.all(np.isnan(values[i])) for i in range(len(values))]
+            candidates = np.flatnonzero(has_data)
+            if len(candidates) == 0:
+                return None
+            index = int(candidates[-1])
+        else:
+            target = np.datetime64(date, 'D')
+            index = int(np.abs(recent_cube.dates - target).argmin())
+
+        observed = recent_cube.dates[index]
+        week = RasterService._iso_weeks(np.array([observed]))[0]
+
+        mu, sigma, samples = RasterService.pixel_baseline(baseline_cube, layer, week)
+        current = np.asarray(values[index], dtype=np.float64)
+        z_grid = (current - mu) / sigma
+
+        return {
+            'date': str(observed),
+            'week': int(week),
+            'layer': layer,
+            'grid': {
+                k: recent_cube.meta[k] for k in ('west', 'north', 'dx', 'dy', 'width', 'height')
+            },
+            'baseline_samples': samples,
+            'z_grid': np.round(z_grid, 2),
+            'value_grid': np.round(current, 3),
+            'summary': RasterService.zone_summary(z_grid)
+        }
@@ -0,0 +1,216 @@
+"""
+Bölge Özetleri
+Kayıtlı tarlaların son risk sonuçlarını idari bölgeye (tarlanın `region`
+özniteliği) veya keyfi bir poligona göre özetler: seviye payları,
+ortalama NDVI anomalisi (Z-skoru) ve bu hafta yüksek riske geçen tarlalar.
+Bölge toplamları artımlı tutulur; yalnızca sonucu değişen tarlalar
+güncellenir, özet istekleri tarla sayısından bağımsız sürede döner.
+"""
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from flask import current_app
+from app.services.result_store import ResultStore
+from app.services.tile_service import LEVEL_CODES
+from app.utils.geometry import canonicalize, is_point
+
+UNASSIGNED = 'Belirtilmemiş'
+NAT = np.datetime64('NaT', 'D')
+
+
+class RegionService:
+    """Bölge bazlı artımlı risk toplamları"""
+
+    _lock = threading.Lock()
+
+    # Toplamların kurulduğu tarla listesi sürümü
+    _fields_version = None
+    # Toplamlara işlenmiş son sonuç deposu sürümü
+    _version = 0
+
+    # Tarla sırasına hizalı diziler
+    _ids = []
+    _row = {}
+    _lon = np.empty(0, dtype=np.float64)
+    _lat = np.empty(0, dtype=np.float64)
+    _region = np.empty(0, dtype=np.int32)
+    _level = np.empty(0, dtype=np.int8)
+    _z = np.empty(0, dtype=np.float64)
+    _high_since = np.empty(0, dtype='datetime64[D]')
+
+    # Bölge toplamları: seviye sayıları (sütun = seviye kodu + 1, ilk sütun
+    # sonucu olmayanlar), Z-skoru toplamı ve sayısı
+    _regions = []
+    _counts = np.zeros((0, 4), dtype=np.int64)
+    _z_sum = np.zeros(0, dtype=np.float64)
+    _z_n = np.zeros(0, dtype=np.int64)
+
+    @staticmethod
+    def _centroid(coordinates):
+        coordinates, _ = canonicalize(coordinates)
+        if is_point(coordinates):
+            return coordinates[0], coordinates[1]
+        centroid = Polygon(coordinates).centroid
+        return centroid.x, centroid.y
+
+    @staticmethod
+    def _high_since_of(field_id):
+        """Tarlanın kesintisiz 'Yüksek' serisinin başladığı gözlem tarihi"""
+        since = None
+        for record in reversed(ResultStore.history(field_id)):
+            if record['final_level'] != 'Yüksek':
+                break
+            since = record['observation_date'] or record['computed_at'][:10]
+        return np.datetime64(since, 'D') if since else NAT
+
+    @classmethod
+    def _apply(cls, row, record):
+        """Tarlanın eski katkısını çıkar, yeni sonucunu ekle (kilit altında)"""
+        region = cls._region[row]
+
+        cls._counts[region, cls._level[row] + 1] -= 1
+        if not np.isnan(cls._z[row]):
+            cls._z_sum[region] -= cls._z[row]
+            cls._z_n[region] -= 1
+
+        level = LEVEL_CODES.get(record['final_level'], -1) if record else -1
+        z = record['z_score'] if record and record['z_score'] is not None else np.nan
+
+        cls._level[row] = level
+        cls._z[row] = z
+        cls._high_since[row] = cls._high_since_of(cls._ids[row]) if level == 2 else NAT
+
+        cls._counts[region, level + 1] += 1
+        if not np.isnan(z):
+            cls._z_sum[region] += z
+            cls._z_n[region] += 1
+
+    @classmethod
+    def _rebuild(cls, fields):
+        """Tarla listesi değişti: dizileri ve toplamları baştan kur"""
+        version = ResultStore.version()
+
+        cls._ids = [str(k) for k in fields]
+        cls._row = {field_id: i for i, field_id in enumerate(cls._ids)}
+
+        centroids = [cls._centroid(f['coordinates']) for f in fields.values()]
+        cls._lon = np.array([c[0] for c in centroids], dtype=np.float64)
+        cls._lat = np.array([c[1] for c in centroids], dtype=np.float64)
+
+        names = [f.get('region') or UNASSIGNED for f in fields.values()]
+        cls._regions = sorted(set(names))
+        codes = {name: i for i, name in enumerate(cls._regions)}
+        cls._region = np.array([codes[name] for name in names], dtype=np.int32)
+
+        n = len(cls._ids)
+        cls._level = np.full(n, -1, dtype=np.int8)
+        cls._z = np.full(n, np.nan, dtype=np.float64)
+        cls._high_since = np.full(n, NAT, dtype='datetime64[D]')
+
+        cls._counts = np.zeros((len(cls._regions), 4), dtype=np.int64)
+        cls._counts[:, 0] = np.bincount(cls._region, minlength=len(cls._regions))
+        cls._z_sum = np.zeros(len(cls._regions), dtype=np.float64)
+        cls._z_n = np.zeros(len(cls._regions), dtype=np.int64)
+
+        latest = ResultStore.latest_all()
+        for row, field_id in enumerate(cls._ids):
+            if field_id in latest:
+                cls._apply(row, latest[field_id])
+
+        cls._version = version
+
+    @classmethod
+    def _sync(cls, fields, fields_version):
+        """Toplamları güncelle (kilit altında çağrılır)"""
+        if fields_version != cls._fields_version:
+            cls._rebuild(fields)
+            cls._fields_version = fields_version
+            return
+
+        version, changed = ResultStore.changes_since(cls._version)
+        for field_id in changed:
+            row = cls._row.get(field_id)
+            if row is not None:
+                cls._apply(row, ResultStore.latest(field_id))
+        cls._version = version
+
+    @classmethod
+    def _new_high(cls, mask):
+        """Son REGION_NEW_HIGH_DAYS günde yüksek riske geçen tarlalar"""
+        days = current_app.config['REGION_NEW_HIGH_DAYS']
+        cutoff = np.datetime64((datetime.now() - timedelta(days=days)).date(), 'D')
+        rows = np.flatnonzero(mask & (cls._high_since >= cutoff))
+        return [cls._ids[i] for i in rows]
+
+    @staticmethod
+    def _summary(counts, z_sum, z_n, new_high):
+        """Seviye sayıları ve Z-skoru toplamından özet"""
+        with_result = int(counts[1:].sum())
+
+        return {
+            'fields': int(counts.sum()),
+            'with_result': with_result,
+            'levels': {name: int(counts[code + 1]) for name, code in LEVEL_CODES.items()},
+            'shares': {
+                name: round(float(counts[code + 1] / with_result), 4) if with_result else None
+                for name, code in LEVEL_CODES.items()
+            },
+            'mean_z_score': round(float(z_sum / z_n), 3) if z_n else None,
+            'new_high': len(new_high),
+            'new_high_fields': new_high
+        }
+
+    @classmethod
+    def regions(cls, fields, fields_version, name=None):
+        """
+        Bölge özetleri
+
+        Args:
+            fields: field_id -> tarla
+            fields_version: Tarla listesi sürümü (ekleme/silmede değişir)
+            name: Yalnızca bu bölge (None ise hepsi)
+
+        Returns:
+            list: [{'region': ..., 'fields': ..., 'shares': ..., ...}]
+        """
+        with cls._lock:
+            cls._sync(fields, fields_version)
+
+            summaries = []
+            for code, region in enumerate(cls._regions):
+                if name is not None and region != name:
+                    continue
+                new_high = cls._new_high(cls._region == code)
+                summaries.append({
+                    'region': region,
+                    **cls._summary(cls._counts[code], cls._z_sum[code],
+                                   cls._z_n[code], new_high)
+                })
+
+        return summaries
+
+    @classmethod
+    def polygon(cls, fields, fields_version, coordinates):
+        """
+        Merkezi poligon içinde kalan tarlaların özeti
+
+        Raises:
+            ValueError: Geometri poligon değilse
+        """
+        coordinates, _ = canonicalize(coordinates)
+        if is_point(coordinates):
+            raise ValueError('Özet için poligon gerekli')
+        area = Polygon(coordinates)
+
+        with cls._lock:
+            cls._sync(fields, fields_version)
+
+            inside = shapely.contains_xy(area, cls._lon, cls._lat)
+            counts = np.bincount(cls._level[inside] + 1, minlength=4)
+            z = cls._z[inside]
+            valid = ~np.isnan(z)
+
+            return cls._summary(counts, z[valid].sum(), int(valid.sum()),
+                                cls._new_high(inside))
@@ -0,0 +1,118 @@
+"""
+Risk Sonuç Deposu
+Tarla bazlı hesaplanan risk sonuçlarının geçmişini tutar
+(geçici in-memory, sonra PostgreSQL'e taşınacak)
+"""
+import threading
+from collections import deque
+from datetime import datetime
+from flask import current_app
+
+
+class ResultStore:
+    """Tarla başına risk sonucu geçmişi"""
+
+    _lock = threading.Lock()
+
+    # field_id -> deque([kayıt, ...]) (eskiden yeniye, son RESULT_HISTORY_SIZE kayıt)
+    _history = {}
+
+    # Depo sürümü (her kayıtta artar) ve tarla başına son değiştiği sürüm;
+    # türetilmiş önbellekler yalnızca değişen tarlaları günceller. Harita
+    # tarla sayısıyla sınırlıdır, kayıt sayısıyla büyümez
+    _version = 0
+    _changed_at = {}
+
+    @staticmethod
+    def _to_record(field_id, current, risk):
+        """Risk yanıtını düz (tablo uyumlu) bir kayda çevir"""
+        rule_based = risk['rule_based']
+        ml_prediction = risk.get('ml_prediction')
+
+        observed = current.get('date')
+        if hasattr(observed, 'strftime'):
+            observed = observed.strftime('%Y-%m-%d')
+
+        return {
+            'field_id': str(field_id),
+            'observation_date': observed,
+            'computed_at': risk.get('timestamp') or datetime.now().isoformat(),
+            'ndvi_mean': current.get('ndvi_mean'),
+            'ndmi_mean': current.get('ndmi_mean'),
+            'score': rule_based['score'],
+            'rule_level': rule_based['level'],
+            'z_score': rule_based.get('z_score'),
+            'trend_slope': rule_based['trend']['slope'],
+            'ml_level': ml_prediction['level'] if ml_prediction else None,
+            'final_level': risk['final_level']
+        }
+
+    @staticmethod
+    def record(field_id, current, risk):
+        """Yeni risk sonucunu kaydet"""
+        record = ResultStore._to_record(field_id, current, risk)
+        limit = current_app.config['RESULT_HISTORY_SIZE']
+
+        with ResultStore._lock:
+            records = ResultStore._history.get(record['field_id'])
+            if records is None:
+                records = ResultStore._history[record['field_id']] = deque(maxlen=limit)
+            records.append(record)
+            ResultStore._version += 1
+            ResultStore._changed_at[record['field_id']] = ResultStore._version
+
+        return record
+
+    @staticmethod
+    def forget(field_id):
+        """
+        Silinen tarlanın sonuçlarını bırak (kimlik yeni tarlaya verilebilir);
+        sürüm artar, türetilmiş önbellekler tarlayı değişmiş sayar
+        """
+        field_id = str(field_id)
+        with ResultStore._lock:
+            if ResultStore._history.pop(field_id, None) is None:
+                return
+            ResultStore._version += 1
+            ResultStore._changed_at[field_id] = ResultStore._version
+
+    @staticmethod
+    def history(field_id):
+        """Tarlanın risk geçmişi (son RESULT_HISTORY_SIZE kayıt)"""
+        with ResultStore._lock:
+            return list(ResultStore._history.get(str(field_id), []))
+
+    @staticmethod
+    def latest(field_id):
+        """Tarlanın son risk sonucu (yoksa None)"""
+        with ResultStore._lock:
+            records = ResultStore._history.get(str(field_id))
+            return records[-1] if records else None
+
+    @staticmethod
+    def latest_all():
+        """Her tarlanın son risk sonucu: field_id -> kayıt"""
+        with ResultStore._lock:
+            return {
+                field_id: records[-1]
+                for field_id, records in ResultStore._history.items() if records
+            }
+
+    @staticmethod
+    def version():
+        """Depo sürümü (kayıt eklendikçe artar)"""
+        return ResultStore._version
+
+    @staticmethod
+    def changes_since(version):
+        """
+        Verilen sürümden sonra sonucu değişen tarlalar
+
+        Returns:
+            tuple: (güncel sürüm, {field_id, ...})
+        """
+        with ResultStore._lock:
+            return ResultStore._version, {
+                field_id for field_id, changed in ResultStore._changed_at.items()
+                if changed > version
+            }
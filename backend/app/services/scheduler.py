@@ -0,0 +1,172 @@
+"""
+GEE İş Zamanlayıcısı
+Tüm GEE ağ çağrıları (getInfo, computePixels) bu zamanlayıcıdan geçer.
+Üç öncelik sınıfı vardır: etkileşimli (dashboard istekleri), zamanlanmış
+yenileme ve toplu dışa aktarma. Etkileşimli işler her zaman önce başlar;
+diğer sınıflar ağırlıklarına göre adil paylaşılır. Her sınıfın eşzamanlılık
+sınırı olduğundan toplu işler tüm GEE slotlarını dolduramaz.
+"""
+import time
+import threading
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+import numpy as np
+
+
+class WorkScheduler:
+    """Öncelik sınıflı, adil paylaşımlı GEE çağrı zamanlayıcısı"""
+
+    # Öncelik sınıfları (öncelik sırasıyla)
+    INTERACTIVE = 'interactive'
+    REFRESH = 'refresh'
+    BULK = 'bulk'
+    CLASSES = (INTERACTIVE, REFRESH, BULK)
+
+    _cond = threading.Condition()
+    _max_concurrent = 8
+    _limits = {INTERACTIVE: 8, REFRESH: 4, BULK: 2}
+    _weights = {INTERACTIVE: 1, REFRESH: 3, BULK: 1}
+
+    _queues = {name: deque() for name in CLASSES}
+    _running = {name: 0 for name in CLASSES}
+    _completed = {name: 0 for name in CLASSES}
+    _failed = {name: 0 for name in CLASSES}
+    _wait_times = {name: deque(maxlen=1000) for name in CLASSES}
+    _run_times = {name: deque(maxlen=1000) for name in CLASSES}
+
+    # Adil paylaşım için sanal zaman (sınıf başına ve genel)
+    _vtime = {name: 0.0 for name in CLASSES}
+    _vclock = 0.0
+
+    _tickets = itertools.count()
+
+    # Çağrının öncelik sınıfı (istek / thread bağlamında)
+    _current = ContextVar('work_priority', default=INTERACTIVE)
+
+    @classmethod
+    def init_app(cls, app):
+        """Eşzamanlılık sınırlarını ve ağırlıkları ayarlardan oku"""
+        cls._max_concurrent = app.config['SCHEDULER_MAX_CONCURRENT']
+        cls._limits = dict(app.config['SCHEDULER_CLASS_LIMITS'])
+        cls._weights = dict(app.config['SCHEDULER_CLASS_WEIGHTS'])
+
+    @classmethod
+    @contextmanager
+    def priority(cls, name):
+        """
+        Blok içindeki GEE çağrılarını verilen sınıfta çalıştır
+
+        Örnek:
+            with WorkScheduler.priority(WorkScheduler.BULK):
+                GEEService.get_timeseries(...)
+        """
+        if name not in cls.CLASSES:
+            raise ValueError(f"Geçersiz öncelik sınıfı: {name}")
+
+        token = cls._current.set(name)
+        try:
+            yield
+        finally:
+            cls._current.reset(token)
+
+    @classmethod
+    def _next_ticket(cls):
+        """Boş slot varsa sıradaki işin bileti (yoksa None)"""
+        if sum(cls._running.values()) >= cls._max_concurrent:
+            return None
+
+        # Etkileşimli işler kesin öncelikli
+        if cls._queues[cls.INTERACTIVE] and \
+                cls._running[cls.INTERACTIVE] < cls._limits[cls.INTERACTIVE]:
+            return cls._queues[cls.INTERACTIVE][0]
+
+        # Diğerleri: en az sanal zamanı olan sınıf (ağırlıklı adil paylaşım)
+        candidates = [
+            name for name in (cls.REFRESH, cls.BULK)
+            if cls._queues[name] and cls._running[name] < cls._limits[name]
+        ]
+        if not candidates:
+            return None
+
+        name = min(candidates, key=lambda n: max(cls._vtime[n], cls._vclock))
+        return cls._queues[name][0]
+
+    @classmethod
+    def run(cls, fn, *args, **kwargs):
+        """
+        Fonksiyonu slot boşalınca, bağlamdaki öncelik sınıfında çalıştır
+
+        Returns:
+            fn'in dönüş değeri (hatalar aynen yükseltilir)
+        """
+        name = cls._current.get()
+        ticket = (name, next(cls._tickets))
+        enqueued = time.monotonic()
+
+        with cls._cond:
+            cls._queues[name].append(ticket)
+            while cls._next_ticket() != ticket:
+                cls._cond.wait()
+
+            cls._queues[name].popleft()
+            cls._running[name] += 1
+
+            start = max(cls._vtime[name], cls._vclock)
+            cls._vclock = start
+            cls._vtime[name] = start + 1.0 / cls._weights[name]
+
+            started = time.monotonic()
+            cls._wait_times[name].append(started - enqueued)
+
+            # Sıradaki iş de başlayabilir olabilir
+            cls._cond.notify_all()
+
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with cls._cond:
+                cls._running[name] -= 1
+                cls._completed[name] += 1
+                cls._failed[name] += failed
+                cls._run_times[name].append(time.monotonic() - started)
+                cls._cond.notify_all()
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return {'p50': None, 'p95': None, 'max': None}
+        arr = np.fromiter(values, dtype=np.float64)
+        p50, p95 = np.percentile(arr, [50, 95])
+        return {
+            'p50': round(float(p50), 4),
+            'p95': round(float(p95), 4),
+            'max': round(float(arr.max()), 4)
+        }
+
+    @classmethod
+    def metrics(cls):
+        """Sınıf başına kuyruk derinliği, çalışan iş ve bekleme süreleri (saniye)"""
+        with cls._cond:
+            return {
+                'max_concurrent': cls._max_concurrent,
+                'running': sum(cls._running.values()),
+                'classes': {
+                    name: {
+                        'limit': cls._limits[name],
+                        'weight': cls._weights[name],
+                        'queued': len(cls._queues[name]),
+                        'running': cls._running[name],
+                        'completed': cls._completed[name],
+                        'failed': cls._failed[name],
+                        'wait_seconds': cls._percentiles(cls._wait_times[name]),
+                        'run_seconds': cls._percentiles(cls._run_times[name])
+                    }
+                    for name in cls.CLASSES
+                }
+            }
@@ -0,0 +1,235 @@
+"""
+Yumuşatılmış Seri (boşluk doldurma + Whittaker)
+Bulut maskesi gözlemler arasında düzensiz boşluklar bırakır. Kaliteli
+gözlemler (temiz piksel oranı > MIN_CLEAR_PIXEL_RATIO) düzenli bir gün
+ızgarasına yerleştirilir ve ağırlıklı Whittaker süzgeciyle yumuşatılır;
+gözlemsiz ızgara noktaları aynı çözümde doldurulur. Seri, seri anahtarı ve
+son gözlem başına bir kez hesaplanıp önbelleklenir; trend, risk ve grafik
+aynı seriyi okur.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from flask import current_app
+from app.utils.geometry import geometry_key
+
+# İkinci fark operatörünün (D) satır katsayıları
+SECOND_DIFFERENCE = (1.0, -2.0, 1.0)
+
+
+def _solve_pentadiagonal(diag, upper1, upper2, rhs):
+    """
+    Simetrik pozitif tanımlı beş köşegenli sistemi bantlı Cholesky ile çöz
+
+    Web sürecinde scipy import edilmez; ızgara yılda ~73 nokta olduğundan
+    O(n) döngü yeterince hızlıdır.
+
+    Args:
+        diag: (n,) köşegen
+        upper1: (n-1,) 1. üst köşegen, A[i, i+1]
+        upper2: (n-2,) 2. üst köşegen, A[i, i+2]
+        rhs: (n,) veya (n, k) sağ taraf
+    """
+    n = len(diag)
+    # L[i, i], L[i, i-1], L[i, i-2]
+    l0 = np.zeros(n)
+    l1 = np.zeros(n)
+    l2 = np.zeros(n)
+
+    for i in range(n):
+        if i >= 2:
+            l2[i] = upper2[i - 2] / l0[i - 2]
+        if i >= 1:
+            l1[i] = (upper1[i - 1] - l2[i] * l1[i - 1]) / l0[i - 1]
+        l0[i] = np.sqrt(diag[i] - l1[i] ** 2 - l2[i] ** 2)
+
+    # L y = b
+    y = np.array(rhs, dtype=np.float64)
+    for i in range(n):
+        if i >= 1:
+            y[i] -= l1[i] * y[i - 1]
+        if i >= 2:
+            y[i] -= l2[i] * y[i - 2]
+        y[i] /= l0[i]
+
+    # Lᵀ x = y
+    for i in range(n - 1, -1, -1):
+        if i + 1 < n:
+            y[i] -= l1[i + 1] * y[i + 1]
+        if i + 2 < n:
+            y[i] -= l2[i + 2] * y[i + 2]
+        y[i] /= l0[i]
+
+    return y
+
+SMOOTHED_COLUMNS = ['date', 'ndvi_mean', 'ndmi_mean', 'ndvi_raw', 'ndmi_raw',
+                    'observed', 'gap_days']
+
+
+class SmoothingService:
+    """Kalite filtresi ve önbellekli yumuşatılmış NDVI/NDMI serisi"""
+
+    _lock = threading.Lock()
+
+    # seri anahtarı -> (gözlem imzası, DataFrame)
+    _cache = OrderedDict()
+
+    @staticmethod
+    def quality_mask(clear_pixel_ratio):
+        """Kaliteli gözlem maskesi (dizi veya Series)"""
+        return clear_pixel_ratio > current_app.config['MIN_CLEAR_PIXEL_RATIO']
+
+    @staticmethod
+    def quality(df):
+        """Yalnızca kaliteli gözlemler"""
+        return df[SmoothingService.quality_mask(df['clear_pixel_ratio'])]
+
+    @staticmethod
+    def whittaker(values, weights, lam):
+        """
+        Ağırlıklı Whittaker süzgeci: (W + λ·DᵀD) z = W·y
+
+        Sistem beş köşegenli simetrik pozitif tanımlıdır (en az iki
+        ağırlıklı nokta varken), bantlı çözümle O(n)'dir. Ağırlığı 0 olan
+        noktalar komşulardan doldurulur.
+
+        Args:
+            values: (n,) veya (n, k) değerler (ağırlığı 0 olanlar yok sayılır)
+            weights: (n,) gözlem ağırlıkları
+            lam: Pürüzsüzlük (büyüdükçe seri düzleşir)
+        """
+        y = np.asarray(values, dtype=np.float64)
+        w = np.asarray(weights, dtype=np.float64)
+        n = len(w)
+
+        if n < 3:
+            return y.copy()
+
+        # DᵀD bantları: köşegen, 1. ve 2. üst köşegen
+        diag = np.zeros(n)
+        upper1 = np.zeros(n - 1)
+        upper2 = np.zeros(n - 2)
+        c = SECOND_DIFFERENCE
+        for k in range(3):
+            diag[k:n - 2 + k] += c[k] * c[k]
+        for k in range(2):
+            upper1[k:n - 2 + k] += c[k] * c[k + 1]
+        upper2 += c[0] * c[2]
+
+        rhs = (w[:, None] if y.ndim == 2 else w) * np.where(np.isfinite(y), y, 0.0)
+        return _solve_pentadiagonal(w + lam * diag, lam * upper1, lam * upper2, rhs)
+
+    @staticmethod
+    def _signature(df):
+        """Seriyi değiştiren gözlemler: sayı, ilk ve son tarih"""
+        if df.empty:
+            return (0, None, None)
+        return (len(df), df['date'].min(), df['date'].max())
+
+    @staticmethod
+    def _compute(df):
+        """Kaliteli gözlemlerden düzenli ızgarada yumuşatılmış seri"""
+        config = current_app.config
+        step = config['SMOOTHING_STEP_DAYS']
+
+        if df.empty:
+            return pd.DataFrame(columns=SMOOTHED_COLUMNS)
+
+        day = df['date'].to_numpy().astype('datetime64[D]')
+        first = day.min()
+        offset = (day - first).astype(np.int64)
+
+        # Gözlem en yakın ızgara noktasına; aynı noktadakiler temiz piksel
+        # oranıyla ağırlıklı ortalanır
+        node = np.rint(offset / step).astype(np.int64)
+        n = int(node.max()) + 1
+        clear = df['clear_pixel_ratio'].to_numpy(dtype=np.float64)
+        weights = np.bincount(node, weights=clear, minlength=n)
+
+        values = np.column_stack([
+            np.bincount(node, weights=clear * df[col].to_numpy(dtype=np.float64), minlength=n)
+            for col in ('ndvi_mean', 'ndmi_mean')
+        ])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = values / weights[:, None]
+        raw = values.copy()
+
+        if np.count_nonzero(weights) >= 2:
+            smoothed = SmoothingService.whittaker(values, weights, config['SMOOTHING_LAMBDA'])
+        else:
+            smoothed = values
+
+        # En yakın gözleme uzaklık; çok uzak noktalar doldurulmaz
+        node_day = np.arange(n) * step
+        observed_day = np.unique(offset)
+        right = np.searchsorted(observed_day, node_day).clip(max=len(observed_day) - 1)
+        left = (right - 1).clip(min=0)
+        gap = np.minimum(np.abs(observed_day[right] - node_day),
+                         np.abs(node_day - observed_day[left]))
+        smoothed[gap > config['SMOOTHING_MAX_GAP_DAYS']] = np.nan
+
+        return pd.DataFrame({
+            'date': pd.to_datetime(first + node_day.astype('timedelta64[D]')),
+            'ndvi_mean': smoothed[:, 0],
+            'ndmi_mean': smoothed[:, 1],
+            'ndvi_raw': raw[:, 0],
+            'ndmi_raw': raw[:, 1],
+            'observed': weights > 0,
+            'gap_days': gap
+        })
+
+    @classmethod
+    def smooth(cls, df, key=None):
+        """
+        Yumuşatılmış ve boşlukları doldurulmuş seri
+
+        Args:
+            df: Ham zaman serisi (date, ndvi_mean, ndmi_mean, clear_pixel_ratio)
+            key: Önbellek anahtarı (ör. geometri + aralık); None ise önbelleksiz
+
+        Returns:
+            DataFrame: SMOOTHING_STEP_DAYS aralıklı date, ndvi_mean, ndmi_mean,
+                       ndvi_raw/ndmi_raw (noktadaki gözlem ortalaması, yoksa
+                       NaN), observed (noktada gözlem var mı), gap_days (en
+                       yakın gözleme uzaklık). Önbellekten döner, değiştirilmemeli.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=SMOOTHED_COLUMNS)
+
+        quality = cls.quality(df).dropna(subset=['ndvi_mean', 'ndmi_mean'])
+        signature = cls._signature(quality)
+
+        if key is not None:
+            with cls._lock:
+                cached = cls._cache.get(key)
+                if cached is not None and cached[0] == signature:
+                    cls._cache.move_to_end(key)
+                    return cached[1]
+
+        smoothed = cls._compute(quality)
+
+        if key is not None:
+            with cls._lock:
+                cls._cache[key] = (signature, smoothed)
+                cls._cache.move_to_end(key)
+                while len(cls._cache) > current_app.config['SMOOTHING_CACHE_SIZE']:
+                    cls._cache.popitem(last=False)
+
+        return smoothed
+
+    @classmethod
+    def smooth_recent(cls, coordinates, timeseries):
+        """Tarlanın son 30 günlük serisi (risk trendi için)"""
+        return cls.smooth(timeseries, key=f'recent|{geometry_key(coordinates)}')
+
+    @staticmethod
+    def at(smoothed, dates, column):
+        """Yumuşatılmış serinin verilen tarihlerdeki değeri (doğrusal ara değer)"""
+        if smoothed.empty or len(dates) == 0:
+            return np.full(len(dates), np.nan)
+
+        grid = smoothed['date'].to_numpy().astype('datetime64[s]').astype(np.float64)
+        x = np.asarray(dates, dtype='datetime64[s]').astype(np.float64)
+        return np.interp(x, grid, smoothed[column].to_numpy(dtype=np.float64),
+                         left=np.nan, right=np.nan)
@@ -0,0 +1,255 @@
+"""
+Risk Karoları (Tiles)
+Kayıtlı tüm tarlaların son risk sonucunu Web Mercator karoları halinde
+sunar. Düşük zoom'da tarlalar karo içi hücrelerde kümelenir (sayı ve
+seviye dağılımı), yüksek zoom'da geometriler karo koordinatlarına
+(0..EXTENT) nicelenip zoom'a göre sadeleştirilir. Çıktı sütun bazlıdır ve
+karo başına önbelleklenir; tarla veya sonuç değişince önbellek yenilenir.
+"""
+import math
+import uuid
+import threading
+from collections import OrderedDict
+import numpy as np
+from flask import current_app
+from shapely.geometry import Polygon
+from app.services.result_store import ResultStore
+from app.utils.geometry import canonicalize, is_point
+
+# Karo içi tamsayı koordinat aralığı (vektör karo standardı)
+EXTENT = 4096
+
+LEVEL_CODES = {'Düşük': 0, 'Orta': 1, 'Yüksek': 2}
+
+# Sürüm sayaçları süreç başına 0'dan başlar; yeniden başlatma veya başka
+# worker aynı sayaç çiftine farklı içerikle ulaşabilir. İmzaya katılan
+# süreç kimliği eski ETag'lerin bu süreçte eşleşmesini önler
+BOOT_NONCE = uuid.uuid4().hex
+
+
+class TileService:
+    """Tarla risk sonuçlarından kümelenmiş / sadeleştirilmiş karolar"""
+
+    _lock = threading.Lock()
+
+    # Geometri indeksi (tarla listesi sürümü değişince yeniden kurulur)
+    _geometry = None
+    # Risk öznitelikleri (sonuç deposu sürümü değişince yeniden kurulur)
+    _attributes = None
+    # (z, x, y) -> (imza, payload)
+    _tiles = OrderedDict()
+
+    @staticmethod
+    def mercator(lon, lat):
+        """Boylam/enlem -> normalize Web Mercator (0..1, y aşağı doğru)"""
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+        x = (lon + 180.0) / 360.0
+        sin = np.sin(np.radians(lat))
+        y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+        return x, y
+
+    @staticmethod
+    def _build_geometry(fields):
+        """Tarla halkalarını normalize Mercator'da ve sınır kutularını hazırla"""
+        ids, rings = [], []
+        bounds = np.empty((len(fields), 4), dtype=np.float64)
+
+        for i, (field_id, field) in enumerate(fields.items()):
+            coordinates, _ = canonicalize(field['coordinates'])
+            if is_point(coordinates):
+                x, y = TileService.mercator(coordinates[0], coordinates[1])
+                ring = np.array([[x, y]])
+            else:
+                points = np.asarray(coordinates, dtype=np.float64)
+                ring = np.column_stack(TileService.mercator(points[:, 0], points[:, 1]))
+
+            ids.append(str(field_id))
+            rings.append(ring)
+            bounds[i] = (ring[:, 0].min(), ring[:, 1].min(), ring[:, 0].max(), ring[:, 1].max())
+
+        return {
+            'ids': ids,
+            'rings': rings,
+            'bounds': bounds,
+            'center': np.column_stack([
+                (bounds[:, 0] + bounds[:, 2]) / 2, (bounds[:, 1] + bounds[:, 3]) / 2
+            ])
+        }
+
+    @staticmethod
+    def _build_attributes(ids):
+        """Tarla sırasına hizalı seviye kodu, skor ve NDVI Z-skoru dizileri"""
+        latest = ResultStore.latest_all()
+
+        level = np.full(len(ids), -1, dtype=np.int8)
+        score = np.full(len(ids), np.nan, dtype=np.float32)
+        z = np.full(len(ids), np.nan, dtype=np.float32)
+
+        for i, field_id in enumerate(ids):
+            record = latest.get(field_id)
+            if record is None:
+                continue
+            level[i] = LEVEL_CODES.get(record['final_level'], -1)
+            score[i] = record['score']
+            if record['z_score'] is not None:
+                z[i] = record['z_score']
+
+        return {'level': level, 'score': score, 'z': z}
+
+    @classmethod
+    def _index(cls, fields, fields_version):
+        """Güncel indeks ve imzası (kilit altında çağrılır)"""
+        if cls._geometry is None or cls._geometry['fields_version'] != fields_version:
+            cls._geometry = cls._build_geometry(fields)
+            cls._geometry['fields_version'] = fields_version
+            cls._attributes = None
+
+        version = ResultStore.version()
+        if cls._attributes is None or cls._attributes['version'] != version:
+            cls._attributes = cls._build_attributes(cls._geometry['ids'])
+            cls._attributes['version'] = version
+
+        return cls._geometry, cls._attributes, (BOOT_NONCE, fields_version, version)
+
+    @classmethod
+    def signature(cls, fields, fields_version):
+        """Tarla listesi + sonuç deposu sürümü (ETag için)"""
+        with cls._lock:
+            return cls._index(fields, fields_version)[2]
+
+    @staticmethod
+    def _round(values, digits):
+        return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+    @staticmethod
+    def _clusters(geometry, attributes, selected, z, x, y):
+        """Karo içi hücrelerde kümeleme (merkezi karoda olan tarlalar)"""
+        cells = current_app.config['TILE_CLUSTER_CELLS']
+        scale = 2 ** z
+
+        tx = (geometry['center'][selected, 0] * scale - x)
+        ty = (geometry['center'][selected, 1] * scale - y)
+        cell = (np.minimum((ty * cells).astype(np.int64), cells - 1) * cells +
+                np.minimum((tx * cells).astype(np.int64), cells - 1))
+
+        occupied, inverse = np.unique(cell, return_inverse=True)
+        count = np.bincount(inverse)
+        level = attributes['level'][selected]
+        score = attributes['score'][selected].astype(np.float64)
+        zscore = attributes['z'][selected].astype(np.float64)
+
+        def nanmean(values):
+            valid = ~np.isnan(values)
+            total = np.bincount(inverse, weights=np.where(valid, values, 0.0))
+            n = np.bincount(inverse, weights=valid.astype(np.float64))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(n > 0, total / n, np.nan)
+
+        return {
+            'x': np.round(np.bincount(inverse, weights=tx) / count * EXTENT).astype(np.int32).tolist(),
+            'y': np.round(np.bincount(inverse, weights=ty) / count * EXTENT).astype(np.int32).tolist(),
+            'count': count.tolist(),
+            'low': np.bincount(inverse, weights=level == 0).astype(np.int32).tolist(),
+            'medium': np.bincount(inverse, weights=level == 1).astype(np.int32).tolist(),
+            'high': np.bincount(inverse, weights=level == 2).astype(np.int32).tolist(),
+            'unknown': np.bincount(inverse, weights=level < 0).astype(np.int32).tolist(),
+            'score': TileService._round(nanmean(score), 1),
+            'z_score': TileService._round(nanmean(zscore), 2)
+        }
+
+    @staticmethod
+    def _features(geometry, attributes, selected, z, x, y):
+        """Karo koordinatlarına nicelenmiş, sadeleştirilmiş geometriler"""
+        scale = 2 ** z * EXTENT
+        # Yarım piksel (256 px karo) altındaki ayrıntılar atılır
+        tolerance = EXTENT / 512
+        # Birkaç pikselden küçük tarlalar nokta olarak çizilir
+        min_size = EXTENT / 256 * 3
+
+        geoms = []
+        for i in selected:
+            ring = geometry['rings'][i]
+            local = np.column_stack([ring[:, 0] * scale - x * EXTENT,
+                                     ring[:, 1] * scale - y * EXTENT])
+            span = local.max(axis=0) - local.min(axis=0)
+
+            if len(ring) < 3 or span.max() < min_size:
+                center = (geometry['center'][i] * scale - np.array([x, y]) * EXTENT)
+                geoms.append(np.round(center).astype(np.int32).tolist())
+                continue
+
+            simplified = Polygon(local).simplify(tolerance, preserve_topology=True)
+            coords = np.round(np.asarray(simplified.exterior.coords[:-1])).astype(np.int32)
+
+            # Nicelemeyle çakışan ardışık köşeler
+            keep = np.ones(len(coords), dtype=bool)
+            keep[1:] = np.any(coords[1:] != coords[:-1], axis=1)
+            geoms.append(coords[keep].ravel().tolist())
+
+        return {
+            'id': [geometry['ids'][i] for i in selected],
+            'level': attributes['level'][selected].tolist(),
+            'score': TileService._round(attributes['score'][selected], 1),
+            'z_score': TileService._round(attributes['z'][selected], 2),
+            'geometry': geoms
+        }
+
+    @classmethod
+    def risk_tile(cls, fields, fields_version, z, x, y):
+        """
+        Risk karosu
+
+        Args:
+            fields: field_id -> {'coordinates': ...}
+            fields_version: Tarla listesi sürümü (ekleme/silmede değişir)
+
+        Returns:
+            tuple: (payload, imza) - imza ETag için kullanılır
+        """
+        config = current_app.config
+
+        with cls._lock:
+            geometry, attributes, signature = cls._index(fields, fields_version)
+
+            cached = cls._tiles.get((z, x, y))
+            if cached is not None and cached[0] == signature:
+                cls._tiles.move_to_end((z, x, y))
+                return cached[1], signature
+
+        scale = 2 ** z
+        x0, y0, x1, y1 = x / scale, y / scale, (x + 1) / scale, (y + 1) / scale
+
+        if len(geometry['ids']) == 0:
+            selected = np.empty(0, dtype=np.int64)
+        elif z < config['TILE_CLUSTER_MAX_ZOOM']:
+            # Küme: her tarla merkezinin düştüğü tek karoda sayılır
+            center = geometry['center']
+            selected = np.flatnonzero(
+                (center[:, 0] >= x0) & (center[:, 0] < x1) &
+                (center[:, 1] >= y0) & (center[:, 1] < y1)
+            )
+        else:
+            # Geometri: karo kenarında kesilmesin diye küçük tampon
+            pad = (x1 - x0) / 64
+            bounds = geometry['bounds']
+            selected = np.flatnonzero(
+                (bounds[:, 0] <= x1 + pad) & (bounds[:, 2] >= x0 - pad) &
+                (bounds[:, 1] <= y1 + pad) & (bounds[:, 3] >= y0 - pad)
+            )
+
+        payload = {'z': z, 'x': x, 'y': y, 'extent': EXTENT}
+        if z < config['TILE_CLUSTER_MAX_ZOOM']:
+            payload['type'] = 'clusters'
+            payload['clusters'] = cls._clusters(geometry, attributes, selected, z, x, y)
+        else:
+            payload['type'] = 'features'
+            payload['features'] = cls._features(geometry, attributes, selected, z, x, y)
+
+        with cls._lock:
+            cls._tiles[(z, x, y)] = (signature, payload)
+            cls._tiles.move_to_end((z, x, y))
+            while len(cls._tiles) > config['TILE_CACHE_SIZE']:
+                cls._tiles.popitem(last=False)
+
+        return payload, signature
@@ -0,0 +1,125 @@
+"""
+Kayan Pencere Trend Motoru
+Bir serinin tüm pencereleri için en küçük kareler eğimini ve R²'yi
+kümülatif toplamlarla O(n)'de hesaplar. x ekseni gerçek gün farklarıdır
+(gözlem sırası değil); bulutlu günlerin yarattığı düzensiz aralıklar
+eğimi bozmaz.
+"""
+import numpy as np
+from flask import current_app
+
+
+class TrendEngine:
+    """Vektörel kayan pencere lineer regresyon"""
+
+    @staticmethod
+    def day_offsets(dates):
+        """Tarih serisini ilk tarihten itibaren gün farkına çevir"""
+        values = np.asarray(dates, dtype='datetime64[s]').astype(np.float64)
+        if len(values) == 0:
+            return values
+        return (values - values[0]) / 86400.0
+
+    @staticmethod
+    def rolling(days, values, window=None, window_days=None):
+        """
+        Her gözlemde biten pencere için eğim (birim/gün) ve R²
+
+        Pencere ya son `window` gözlemdir ya da son `window_days` gün
+        içindeki gözlemlerdir. NaN içeren veya 2'den az gözlemli pencereler
+        NaN döner.
+
+        Args:
+            days: Gün farkları (artan sıralı)
+            values: Değerler (ör. NDVI)
+            window: Gözlem sayısı
+            window_days: Gün cinsinden pencere
+
+        Returns:
+            tuple: (slope, r2) dizileri, uzunluk len(values)
+        """
+        x = np.asarray(days, dtype=np.float64)
+        y = np.asarray(values, dtype=np.float64)
+        n = len(y)
+
+        if window is None and window_days is None:
+            raise ValueError('window veya window_days gerekli')
+
+        # Pencere başlangıç indeksleri
+        ends = np.arange(1, n + 1)
+        if window_days is not None:
+            starts = np.searchsorted(x, x - window_days, side='left')
+        else:
+            starts = ends - window
+
+        valid = starts >= 0
+        starts = np.clip(starts, 0, None)
+
+        finite = np.isfinite(y)
+        y0 = np.where(finite, y, 0.0)
+
+        # Kümülatif toplamlar (başa 0 eklenir: S[b] - S[a] = toplam[a:b])
+        def csum(arr):
+            return np.concatenate(([0.0], np.cumsum(arr)))
+
+        count = ends - starts
+        nan_count = csum(~finite)[ends] - csum(~finite)[starts]
+        sx = csum(x)[ends] - csum(x)[starts]
+        sy = csum(y0)[ends] - csum(y0)[starts]
+        sxx = csum(x * x)[ends] - csum(x * x)[starts]
+        sxy = csum(x * y0)[ends] - csum(x * y0)[starts]
+        syy = csum(y0 * y0)[ends] - csum(y0 * y0)[starts]
+
+        var_x = count * sxx - sx * sx
+        var_y = count * syy - sy * sy
+        cov = count * sxy - sx * sy
+
+        # Eşik göreli: büyük kümülatif toplamlardaki yuvarlama hatası eğim üretmesin
+        usable = (valid & (count >= 2) & (nan_count == 0) &
+                  (var_x > 1e-6 * count * count))
+
+        slope = np.full(n, np.nan)
+        r2 = np.full(n, np.nan)
+
+        slope[usable] = cov[usable] / var_x[usable]
+
+        # Sabit seride korelasyon tanımsız: eski davranışla aynı, güven 0
+        denom = var_x * var_y
+        has_var = usable & (denom > 1e-18)
+        r2[usable] = 0.0
+        r2[has_var] = np.clip(cov[has_var] ** 2 / denom[has_var], 0.0, 1.0)
+
+        return slope, r2
+
+    @staticmethod
+    def step_days():
+        """Eğimin raporlandığı adım (gün); Sentinel-2 tekrar ziyaret süresi"""
+        return current_app.config['TREND_STEP_DAYS']
+
+    @staticmethod
+    def direction(slope):
+        """Adım başına eğimden yön (dizi veya skaler)"""
+        slope = np.asarray(slope, dtype=np.float64)
+        result = np.select(
+            [np.isnan(slope), slope < -0.03, slope > 0.03],
+            ['insufficient_data', 'decreasing', 'increasing'],
+            default='stable'
+        )
+        return result if result.ndim else str(result)
+
+    @staticmethod
+    def series(df, window=3, window_days=None, value_col='ndvi_mean'):
+        """
+        DataFrame'in her satırı için trend (toplu ve replay skorlama için)
+
+        Returns:
+            tuple: (adım başına eğim, gün başına eğim, R², yön) dizileri
+        """
+        days = TrendEngine.day_offsets(df['date'].to_numpy())
+        slope_per_day, r2 = TrendEngine.rolling(
+            days, df[value_col].to_numpy(dtype=np.float64),
+            window=None if window_days else window, window_days=window_days
+        )
+        slope = slope_per_day * TrendEngine.step_days()
+
+        return slope, slope_per_day, r2, TrendEngine.direction(slope)
@@ -0,0 +1,165 @@
+"""
+Geometri Kanonikleştirme
+Haritada çizilen tarla poligonlarını GEE'ye göndermeden önce doğrular,
+onarır (kendini kesen kenarlar, tekrar eden noktalar) ve yerel metrik
+düzlemde tolerans içinde sadeleştirir. Aynı tarlanın farklı çizimleri
+(başlangıç noktası, yön, kapanış noktası) aynı kanonik geometriye ve
+aynı önbellek anahtarına düşer.
+"""
+import json
+import math
+import hashlib
+from functools import lru_cache
+from flask import current_app
+from shapely import make_valid, transform
+from shapely.geometry import Polygon
+from shapely.geometry.polygon import orient
+
+METERS_PER_DEGREE = 111320.0
+
+# 6 ondalık ≈ 0.1 m: sadeleştirme toleransının çok altında
+COORD_PRECISION = 6
+
+
+def is_point(coordinates):
+    """[lon, lat] tek nokta mı"""
+    return len(coordinates) == 2 and isinstance(coordinates[0], (int, float))
+
+
+def _largest_polygon(geometry):
+    """make_valid sonucundan (MultiPolygon / GeometryCollection) en büyük poligon"""
+    polygons = []
+    for part in getattr(geometry, 'geoms', [geometry]):
+        if part.geom_type == 'Polygon':
+            polygons.append(part)
+        elif part.geom_type == 'MultiPolygon':
+            polygons.extend(part.geoms)
+
+    if not polygons:
+        return None
+    return max(polygons, key=lambda p: p.area)
+
+
+def _rotate_ring(ring):
+    """Halkayı en küçük (lon, lat) köşeden başlat (kapanış noktası hariç)"""
+    start = min(range(len(ring)), key=lambda i: ring[i])
+    return ring[start:] + ring[:start]
+
+
+@lru_cache(maxsize=1024)
+def _canonicalize(raw, tolerance):
+    coordinates = json.loads(raw)
+
+    if is_point(coordinates):
+        canonical = [round(float(v), COORD_PRECISION) for v in coordinates]
+        return canonical, {
+            'input_vertices': 1,
+            'output_vertices': 1,
+            'reduction': 0.0,
+            'repaired': False,
+            'simplified': False,
+            'area_m2': None,
+            'area_change': 0.0
+        }
+
+    points = [(float(p[0]), float(p[1])) for p in coordinates]
+
+    # Kapanış noktası sayılmaz
+    input_vertices = len(points) - (1 if len(points) > 1 and points[0] == points[-1] else 0)
+
+    # Art arda tekrar eden noktalar (çift tıklama) atılır
+    points = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+
+    if input_vertices < 3:
+        raise ValueError('Poligon en az 3 köşe içermeli')
+
+    # Sınır kutusu merkezinde eşdikdörtgen projeksiyon (tarla ölçeğinde metre
+    # hassasiyetinde; merkez köşe sırasından bağımsız)
+    lons = [p[0] for p in points]
+    lats = [p[1] for p in points]
+    lon0 = (min(lons) + max(lons)) / 2
+    lat0 = (min(lats) + max(lats)) / 2
+    kx = METERS_PER_DEGREE * math.cos(math.radians(lat0))
+    ky = METERS_PER_DEGREE
+
+    def to_local(xy):
+        xy = xy.copy()
+        xy[:, 0] = (xy[:, 0] - lon0) * kx
+        xy[:, 1] = (xy[:, 1] - lat0) * ky
+        return xy
+
+    def to_degrees(xy):
+        xy = xy.copy()
+        xy[:, 0] = xy[:, 0] / kx + lon0
+        xy[:, 1] = xy[:, 1] / ky + lat0
+        return xy
+
+    polygon = transform(Polygon(points), to_local)
+
+    repaired = not polygon.is_valid
+    if repaired:
+        polygon = _largest_polygon(make_valid(polygon))
+        if polygon is None or polygon.is_empty:
+            raise ValueError('Poligon onarılamadı (alanı yok)')
+
+    # Tarla halkası tek parça: delikler atılır, dış halka saat yönü tersine.
+    # Sadeleştirme başlangıç noktasına ve yöne bağlı olduğundan önce
+    # halka kanonik sıraya getirilir
+    polygon = orient(Polygon(polygon.exterior), sign=1.0)
+    polygon = Polygon(_rotate_ring(list(polygon.exterior.coords[:-1])))
+    area = polygon.area
+
+    simplified = polygon.simplify(tolerance, preserve_topology=True)
+    if simplified.is_empty or not simplified.is_valid:
+        simplified = polygon
+    simplified = orient(simplified, sign=1.0)
+
+    ring = [
+        [round(x, COORD_PRECISION), round(y, COORD_PRECISION)]
+        for x, y in transform(simplified, to_degrees).exterior.coords[:-1]
+    ]
+    ring = _rotate_ring(ring)
+    canonical = ring + [ring[0]]
+
+    output_vertices = len(ring)
+    return canonical, {
+        'input_vertices': input_vertices,
+        'output_vertices': output_vertices,
+        'reduction': round(1 - output_vertices / input_vertices, 4),
+        'repaired': repaired,
+        'simplified': output_vertices < input_vertices,
+        'area_m2': round(area, 1),
+        'area_change': round(abs(simplified.area - area) / area, 6) if area else 0.0
+    }
+
+
+def canonicalize(coordinates, tolerance=None):
+    """
+    Koordinatları kanonik biçime getir
+
+    Args:
+        coordinates: [lon, lat] veya [[lon, lat], ...] (poligon)
+        tolerance: Sadeleştirme toleransı (metre, varsayılan
+                   GEOMETRY_SIMPLIFY_TOLERANCE)
+
+    Returns:
+        tuple: (kanonik koordinatlar, rapor dict'i)
+
+    Raises:
+        ValueError: Geçersiz / onarılamayan poligon
+    """
+    if tolerance is None:
+        tolerance = current_app.config['GEOMETRY_SIMPLIFY_TOLERANCE']
+
+    raw = json.dumps(coordinates, separators=(',', ':'))
+    canonical, report = _canonicalize(raw, float(tolerance))
+
+    # lru_cache içindeki nesneler çağıran tarafından değiştirilmesin
+    return json.loads(json.dumps(canonical)), dict(report)
+
+
+def geometry_key(coordinates):
+    """Kanonik geometrinin kararlı özeti (önbellek anahtarları için)"""
+    canonical, _ = canonicalize(coordinates)
+    raw = json.dumps(canonical, separators=(',', ':'))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
@@ -0,0 +1,183 @@
+"""
+HTTP Önbellek Yardımcıları
+GET endpoint'leri için kanonik sorgu, güçlü ETag, Cache-Control ve
+304 Not Modified desteği. Kapalı tarih aralıkları (geçmiş) değişmediği
+için tarayıcı / ters vekil (reverse proxy) tarafından süresiz tutulabilir.
+"""
+import json
+import hashlib
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from flask import current_app, request, redirect
+from app.utils.geometry import canonicalize, is_point, geometry_key
+
+# ETag'e girer: sonuçları etkileyen kod değişince artırılır
+API_CACHE_VERSION = 1
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def parse_coordinates(raw):
+    """
+    Sorgu parametresinden koordinat üret
+    "32.5,37.9" -> [32.5, 37.9]
+    "32.5,37.9;32.6,37.9;..." -> [[32.5, 37.9], [32.6, 37.9], ...]
+
+    Raises:
+        ValueError: Geçersiz biçim
+    """
+    if not raw:
+        raise ValueError('coords gerekli')
+
+    points = [
+        [round(float(v), 6) for v in pair.split(',')]
+        for pair in raw.split(';') if pair
+    ]
+
+    if any(len(p) != 2 for p in points):
+        raise ValueError('coords "lon,lat" veya "lon,lat;lon,lat;..." olmalı')
+
+    if len(points) == 1:
+        return points[0]
+
+    # Polygon kapalı olmalı
+    if points[0] != points[-1]:
+        points.append(points[0])
+
+    return points
+
+
+def format_coordinates(coordinates):
+    """Koordinatları kanonik sorgu biçimine çevir"""
+    def fmt(value):
+        return f'{round(float(value), 6):.6f}'.rstrip('0').rstrip('.')
+
+    if is_point(coordinates):
+        return ','.join(fmt(v) for v in coordinates)
+    return ';'.join(','.join(fmt(v) for v in point) for point in coordinates)
+
+
+def canonical_query(params):
+    """Sıralı anahtarlarla, boş değerleri atılmış sorgu dizgisi"""
+    items = sorted((k, str(v)) for k, v in params.items() if v not in (None, ''))
+    return urlencode(items, safe=',;')
+
+
+def read_query(keys, defaults=None):
+    """
+    GET sorgusunu oku ve POST gövdesi eşdeğerine çevir
+
+    Args:
+        keys: Kabul edilen parametreler ('coords' her zaman gerekir)
+        defaults: Verilmeyen parametreler için varsayılanlar (kanonik URL'ye
+                  yazılır; ör. "bugün" sonucu günden güne farklı anahtar olur)
+
+    Returns:
+        tuple: (kanonik parametreler, istek gövdesi dict'i)
+
+    Raises:
+        ValueError: Geçersiz parametre
+    """
+    args = request.args
+    coordinates = parse_coordinates(args.get('coords'))
+    # Onarılamayan poligon 400 dönsün (ETag hesaplanırken değil)
+    canonicalize(coordinates)
+    params = {'coords': format_coordinates(coordinates)}
+    data = {'coordinates': coordinates}
+
+    for key in keys:
+        value = args.get(key) or (defaults or {}).get(key)
+        if value is None:
+            continue
+        if key in ('start_date', 'end_date', 'since'):
+            value = datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+        elif key == 'max_points':
+            value = int(value)
+        params[key] = value
+        data[key] = value
+
+    return params, data
+
+
+def redirect_if_not_canonical(params):
+    """
+    Sorgu kanonik değilse kanonik URL'ye yönlendir (aynı istek tek önbellek
+    anahtarına düşsün). Kanonikse None döner.
+
+    Kanonik URL'ye "bugün" gibi varsayılanlar yazıldığından yönlendirme
+    kalıcı değildir (307); tarayıcı eski günün URL'sini önbelleklememeli.
+    """
+    query = canonical_query(params)
+    if request.query_string.decode('utf-8') == query:
+        return None
+    return redirect(f'{request.path}?{query}', code=307)
+
+
+def config_fingerprint():
+    """Sonuçları etkileyen ayarlar"""
+    config = current_app.config
+    return {
+        'version': API_CACHE_VERSION,
+        'cloud_threshold': config['CLOUD_THRESHOLD'],
+        'baseline_years': config['BASELINE_YEARS'],
+        'nadas_threshold': config['NADAS_NDVI_THRESHOLD'],
+        'nadas_weeks': config['NADAS_CONSECUTIVE_WEEKS'],
+        'trend_step_days': config['TREND_STEP_DAYS'],
+        'lag_days': config['DELTA_SYNC_LAG_DAYS']
+    }
+
+
+def make_etag(kind, params):
+    """Endpoint türü + kanonik geometri + sorgu + ayarlardan güçlü ETag"""
+    query = {k: v for k, v in params.items() if k != 'coords'}
+    raw = json.dumps({
+        'kind': kind,
+        'geometry': geometry_key(parse_coordinates(params['coords'])),
+        'query': canonical_query(query),
+        'config': config_fingerprint()
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def is_closed_range(end_date):
+    """
+    Tarih aralığı kapandı mı (yeni görüntü gelmeyecek kadar geçmişte mi)
+    Son DELTA_SYNC_LAG_DAYS gün içinde geç işlenen görüntüler gelebilir
+    """
+    lag = current_app.config['DELTA_SYNC_LAG_DAYS']
+    closed_until = (datetime.now() - timedelta(days=lag)).strftime('%Y-%m-%d')
+    return end_date <= closed_until
+
+
+def cached_response(kind, params, immutable, build):
+    """
+    ETag / Cache-Control ile yanıt üret
+
+    Args:
+        kind: Endpoint türü ('timeseries', 'analyze', 'baseline')
+        params: Kanonik sorgu parametreleri
+        immutable: Sonuç hiç değişmeyecekse True
+        build: Yanıtı üreten fonksiyon (yalnızca gerekirse çağrılır)
+    """
+    if not immutable:
+        response = current_app.make_response(build())
+        if response.status_code == 200:
+            max_age = current_app.config['OPEN_RANGE_MAX_AGE']
+            response.headers['Cache-Control'] = f'public, max-age={max_age}'
+        return response
+
+    etag = make_etag(kind, params)
+
+    # İstemcide / vekilde güncel kopya var: hesaplamadan 304
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    response = current_app.make_response(build())
+    if response.status_code == 200:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+
+    return response
@@ -0,0 +1,132 @@
+"""
+Hızlı JSON Serileştirme
+DataFrame'leri satır satır dict üretmeden sütun bazlı (columnar) JSON'a
+çevirir; orjson varsa onu kullanır, istemci destekliyorsa sıkıştırır
+"""
+import gzip
+import json
+import numpy as np
+import pandas as pd
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - opsiyonel hızlandırıcı
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - opsiyonel sıkıştırma
+    brotli = None
+
+# Bundan küçük yanıtlar sıkıştırılmaz
+COMPRESS_MIN_BYTES = 1024
+
+
+def dataframe_to_columns(df, date_col='date'):
+    """
+    DataFrame'i sütun bazlı sözlüğe çevir
+
+    Sayısal sütunlar NumPy dizisi olarak kalır (kopyasız serileştirilir),
+    tarih sütunu 'YYYY-MM-DD' dizgilerine çevrilir.
+
+    Returns:
+        dict: {"date": [...], "ndvi_mean": [...], ...}
+    """
+    columns = {}
+
+    for col in df.columns:
+        values = df[col].to_numpy()
+
+        if col == date_col or pd.api.types.is_datetime64_any_dtype(df[col]):
+            columns[col] = np.datetime_as_string(
+                values.astype('datetime64[D]'), unit='D'
+            ).tolist()
+        elif values.dtype.kind in 'fiub':
+            columns[col] = values
+        else:
+            columns[col] = df[col].tolist()
+
+    return columns
+
+
+def _default(obj):
+    """orjson/json'un tanımadığı tipler"""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'f':
+            return np.where(np.isnan(obj), None, obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        return value
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).strftime('%Y-%m-%d')
+    raise TypeError(f"Serileştirilemeyen tip: {type(obj).__name__}")
+
+
+def dumps(payload):
+    """Payload'u JSON byte'larına çevir (NaN -> null)"""
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+    def clean(obj):
+        # Standart json NaN'ı geçersiz 'NaN' olarak yazar
+        if isinstance(obj, float) and obj != obj:
+            return None
+        if isinstance(obj, dict):
+            return {k: clean(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [clean(v) for v in obj]
+        if isinstance(obj, (np.ndarray, np.generic, pd.Timestamp)):
+            return clean(_default(obj))
+        return obj
+
+    return json.dumps(clean(payload), ensure_ascii=False).encode('utf-8')
+
+
+def compress(body, accept_encoding):
+    """
+    Gövdeyi Accept-Encoding'e göre brotli veya gzip ile sıkıştır
+
+    Returns:
+        tuple: (gövde, ek başlıklar)
+    """
+    headers = {'Vary': 'Accept-Encoding'}
+
+    if len(body) >= COMPRESS_MIN_BYTES:
+        accepted = accept_encoding.lower()
+
+        if brotli is not None and 'br' in accepted:
+            body = brotli.compress(body, quality=5)
+            headers['Content-Encoding'] = 'br'
+        elif 'gzip' in accepted:
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+
+    return body, headers
+
+
+def json_response(payload, status=200):
+    """
+    Hızlı JSON yanıtı oluştur
+    Accept-Encoding'e göre brotli veya gzip ile sıkıştırır
+    """
+    body, headers = compress(
+        dumps(payload), request.headers.get('Accept-Encoding', '')
+    )
+
+    return Response(
+        body, status=status, mimetype='application/json', headers=headers
+    )
+
+
+def wants_columnar(data):
+    """İstek sütun bazlı yanıt istiyor mu?"""
+    fmt = (data or {}).get('format') or request.args.get('format')
+    return fmt == 'columnar'
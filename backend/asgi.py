@@ -0,0 +1,11 @@
+"""
+Async sunum giriş noktası
+GEE beklenirken worker thread'i tutulmaz; tek süreç yüzlerce eşzamanlı
+analizi taşır.
+
+Örnek:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,108 @@
+"""
+EE İfade Şablonu Benchmark Scripti
+İstemci tarafında grafik kurma + serileştirme süresini, şablonlu yolla
+(geometri / tarih yerleştirme) karşılaştırır. Sunucuya hesaplama isteği
+gönderilmez; yalnızca ee.Initialize için GEE kimlik bilgisi gerekir.
+
+Kullanım (backend klasöründen):
+    python benchmark_ee_templates.py
+    python benchmark_ee_templates.py --fields 200 --repeats 5
+"""
+import time
+import argparse
+import numpy as np
+import ee
+from app import create_app
+from app.services.gee_auth import GEEInitializer
+from app.services.gee_service import GEEService
+from app.services.ee_templates import ExpressionTemplates
+from app.utils.geometry import canonicalize, is_point
+
+DATE_RANGES = [
+    ('2024-01-01', '2024-12-31'),
+    ('2025-01-01', '2025-12-31'),
+    ('2025-09-01', '2025-10-01')
+]
+
+
+def sample_fields(count, seed=0):
+    """Orta Anadolu'da rastgele dikdörtgen tarlalar"""
+    rng = np.random.default_rng(seed)
+    fields = []
+    for _ in range(count):
+        lon, lat = 32 + rng.uniform(0, 2), 38 + rng.uniform(0, 2)
+        w, h = rng.uniform(0.002, 0.01, 2)
+        fields.append([[lon, lat], [lon + w, lat], [lon + w, lat + h], [lon, lat + h], [lon, lat]])
+    return fields
+
+
+def direct(coordinates, start_date, end_date, cloud_threshold):
+    """Önceki yol: her çağrıda grafiği kur ve serileştir"""
+    canonical, _ = canonicalize(coordinates)
+    expression = GEEService._timeseries_expression(
+        canonical, is_point(canonical), start_date, end_date, cloud_threshold
+    )
+    return ee.serializer.encode(expression, for_cloud_api=True)
+
+
+def templated(coordinates, start_date, end_date, cloud_threshold):
+    """Şablonlu yol: geometri önbellekte, yalnızca tarihler yerleşir"""
+    return ExpressionTemplates.expression(
+        GEEService._timeseries_expression, (cloud_threshold,),
+        coordinates, start_date, end_date
+    )
+
+
+def measure(fn, fields, cloud_threshold, repeats):
+    """Çağrı başına süre (ms) listesi"""
+    timings = []
+    for _ in range(repeats):
+        for coordinates in fields:
+            for start_date, end_date in DATE_RANGES:
+                start = time.perf_counter()
+                fn(coordinates, start_date, end_date, cloud_threshold)
+                timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EE ifade şablonu benchmark')
+    parser.add_argument('--fields', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+
+    with app.app_context():
+        GEEInitializer.ensure_initialized()
+        cloud_threshold = app.config['CLOUD_THRESHOLD']
+        fields = sample_fields(args.fields)
+
+        print("="*60)
+        print("EE İFADE ŞABLONU BENCHMARK")
+        print("="*60)
+
+        sample = templated(fields[0], *DATE_RANGES[0], cloud_threshold)
+        print(f"\n   İfade düğüm sayısı: {len(sample['values'])}")
+
+        results = {
+            'Grafik kur + serileştir': measure(direct, fields, cloud_threshold, args.repeats),
+            # İlk tur: her tarla için geometri yerleştirme (soğuk)
+            'Şablon (soğuk geometri)': measure(templated, fields, cloud_threshold, 1),
+            'Şablon (önbellekte)': measure(templated, fields, cloud_threshold, args.repeats)
+        }
+
+        print(f"\n   {'':26}{'p50 (ms)':>10}{'p95 (ms)':>10}{'toplam (s)':>12}")
+        for name, timings in results.items():
+            print(f"   {name:26}"
+                  f"{np.percentile(timings, 50):>10.3f}"
+                  f"{np.percentile(timings, 95):>10.3f}"
+                  f"{timings.sum() / 1000:>12.2f}")
+
+        before = np.median(results['Grafik kur + serileştir'])
+        after = np.median(results['Şablon (önbellekte)'])
+        print(f"\n   Çağrı başına hızlanma: {before / max(after, 1e-9):.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Soğuk Başlangıç Benchmark Scripti
+Pickle (scikit-learn) ve NumPy artefaktı ile model yükleme süresini
+ve bellek kullanımını ayrı süreçlerde karşılaştırır
+
+Kullanım (backend klasöründen, train_model.py çalıştırıldıktan sonra):
+    python ml/benchmark_startup.py
+"""
+import os
+import sys
+import json
+import subprocess
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(ML_DIR)
+
+# Her senaryo temiz bir Python sürecinde çalışır
+PICKLE_SCENARIO = f"""
+import pickle
+with open({os.path.join(ML_DIR, 'model.pkl')!r}, 'rb') as f:
+    model = pickle.load(f)
+with open({os.path.join(ML_DIR, 'scaler.pkl')!r}, 'rb') as f:
+    scaler = pickle.load(f)
+"""
+
+ARTIFACT_SCENARIO = f"""
+from app.services.inference import load_artifact
+model, scaler = load_artifact({os.path.join(ML_DIR, 'model.npz')!r})
+"""
+
+# Web sürecinde zaten yüklü olan paketler ölçüme dahil edilmez
+MEASURE_TEMPLATE = """
+import time, resource, json, sys
+import numpy, app
+start = time.perf_counter()
+{scenario}
+elapsed = time.perf_counter() - start
+X = [[0.5, 0.0, -1.2, -0.9, 1.2, 10.0, -0.02, 0.5, 0.8, 0.9]]
+proba = model.predict_proba(scaler.transform(X))[0].tolist()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'load_seconds': elapsed,
+    'max_rss_mb': rss_kb / 1024,
+    'sklearn_loaded': 'sklearn' in sys.modules,
+    'proba': proba
+}}))
+"""
+
+
+def run_scenario(scenario, repeats=3):
+    """Senaryoyu ayrı süreçlerde çalıştır, en iyi sonucu döndür"""
+    results = []
+    for _ in range(repeats):
+        output = subprocess.check_output(
+            [sys.executable, '-c', MEASURE_TEMPLATE.format(scenario=scenario)],
+            cwd=BACKEND_DIR
+        )
+        results.append(json.loads(output.decode().strip().splitlines()[-1]))
+    return min(results, key=lambda r: r['load_seconds'])
+
+
+def main():
+    print("="*60)
+    print("SOĞUK BAŞLANGIÇ BENCHMARK")
+    print("="*60)
+
+    for name in ('model.pkl', 'scaler.pkl', 'model.npz'):
+        if not os.path.exists(os.path.join(ML_DIR, name)):
+            print(f"❌ {name} bulunamadı, önce train_model.py çalıştırın")
+            return
+
+    pickle_result = run_scenario(PICKLE_SCENARIO)
+    artifact_result = run_scenario(ARTIFACT_SCENARIO)
+
+    print(f"\n{'':22}{'Pickle (sklearn)':>18}{'NumPy artefaktı':>18}")
+    print(f"   {'Yükleme süresi (s)':19}"
+          f"{pickle_result['load_seconds']:>18.3f}"
+          f"{artifact_result['load_seconds']:>18.3f}")
+    print(f"   {'Maks. RSS (MB)':19}"
+          f"{pickle_result['max_rss_mb']:>18.1f}"
+          f"{artifact_result['max_rss_mb']:>18.1f}")
+    print(f"   {'sklearn yüklendi':19}"
+          f"{str(pickle_result['sklearn_loaded']):>18}"
+          f"{str(artifact_result['sklearn_loaded']):>18}")
+
+    # Tahminler aynı olmalı
+    max_diff = max(
+        abs(a - b) for a, b in zip(pickle_result['proba'], artifact_result['proba'])
+    )
+    print(f"\n   Olasılık farkı (maks.): {max_diff:.2e}")
+
+    speedup = pickle_result['load_seconds'] / max(artifact_result['load_seconds'], 1e-9)
+    saved = pickle_result['max_rss_mb'] - artifact_result['max_rss_mb']
+    print(f"   Başlangıç hızlanması: {speedup:.1f}x, worker başına ~{saved:.0f} MB tasarruf")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,89 @@
 """
-Random Forest Model Eğitim Scripti
-Baseline verilerinden otomatik etiketler oluşturur ve model eğitir
+Risk Modeli Eğitim Scripti
+Baseline verilerinden otomatik etiketler oluşturur, birden fazla model
+ailesini aynı özellik şemasıyla eğitir ve servis artefaktı üzerinden
+karşılaştırır (F1, tek satır gecikmesi, toplu işlem hızı, artefakt boyutu,
+yükleme süresi). Seçilen model MLService'in yüklediği model.npz olur.
+
+Kullanım (backend klasöründen):
+    python ml/train_model.py
+    python ml/train_model.py --models shallow_forest,logistic --serve auto
+    python ml/train_model.py --serve hist_gradient_boosting
+
+Çıktılar (ml/ altında, depoya eklenmez): model.npz (servis artefaktı),
+model.pkl + scaler.pkl (scikit-learn nesneleri), models/<aile>.npz ve
+model_report.json. Model dosyası yoksa sunucu yalnızca kural tabanlı skor döner.
 """
 import os
 import sys
+import json
+import time
 import pickle
+import argparse
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.metrics import classification_report, confusion_matrix, f1_score
 
 # Parent dizini ekle
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.services.inference import export_artifact, load_artifact
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LABELS = ['Düşük', 'Orta', 'Yüksek']
+
+# MLService.prepare_features ile aynı sıra
+FEATURE_COLS = ['ndvi', 'ndmi', 'z_ndvi', 'z_ndmi', 'abs_z',
+                'deviation_pct', 'trend_slope', 'week_sin',
+                'week_cos', 'clear_ratio']
+
+# Model aileleri: ad -> (açıklama, yeni model üreten fonksiyon)
+MODEL_FAMILIES = {
+    'random_forest': (
+        'Random Forest (150 ağaç, derinlik 12)',
+        lambda: RandomForestClassifier(
+            n_estimators=150,
+            max_depth=12,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42,
+            n_jobs=-1,
+            class_weight='balanced'
+        )
+    ),
+    'shallow_forest': (
+        'Sığ Random Forest (40 ağaç, derinlik 6)',
+        lambda: RandomForestClassifier(
+            n_estimators=40,
+            max_depth=6,
+            min_samples_leaf=2,
+            random_state=42,
+            n_jobs=-1,
+            class_weight='balanced'
+        )
+    ),
+    'hist_gradient_boosting': (
+        'Histogram Gradient Boosting (100 tur, 15 yaprak)',
+        lambda: HistGradientBoostingClassifier(
+            max_iter=100,
+            max_leaf_nodes=15,
+            learning_rate=0.1,
+            random_state=42,
+            class_weight='balanced'
+        )
+    ),
+    'logistic': (
+        'Lojistik regresyon',
+        lambda: LogisticRegression(max_iter=1000, class_weight='balanced')
+    )
+}
+
 # Örnek veri oluşturma (gerçek projede GEE'den gelecek)
 def generate_sample_data(n_samples=1000):
     """
@@ -94,10 +162,98 @@ def generate_sample_data(n_samples=1000):
     return pd.DataFrame(data)
 
 
-def train_model():
-    """Model eğit ve kaydet"""
+def benchmark_model(model, scaler, X_test_scaled, X_test, y_test, artifact_path, repeats=5):
+    """
+    Servis artefaktı üzerinden ölçüm (MLService'in yükleyeceği yol)
+    
+    Returns:
+        dict: f1, sklearn ile uyum, gecikme, işlem hızı, boyut, yükleme süresi
+    """
+    # Yükleme süresi (en iyi tur; disk önbelleği ilk turda ısınır)
+    load_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        served, served_scaler = load_artifact(artifact_path)
+        load_times.append(time.perf_counter() - start)
+    
+    y_pred = served.predict(served_scaler.transform(X_test))
+    
+    # Tek satır: MLService.predict_risk gibi ölçekle + olasılık
+    rows = X_test[:min(len(X_test), 500)]
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        served.predict_proba(served_scaler.transform(row.reshape(1, -1)))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    
+    # Toplu: replay / toplu skorlama gibi tek çağrıda ~10 bin satır
+    batch = np.tile(X_test, (int(np.ceil(10_000 / len(X_test))), 1))
+    batch_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        served.predict_proba(served_scaler.transform(batch))
+        batch_times.append(time.perf_counter() - start)
+    
+    return {
+        'f1_macro': float(f1_score(y_test, y_pred, average='macro')),
+        'sklearn_agreement': float((y_pred == model.predict(X_test_scaled)).mean()),
+        'latency_ms_p50': float(np.percentile(latencies, 50)),
+        'latency_ms_p95': float(np.percentile(latencies, 95)),
+        'throughput_rows_per_s': float(len(batch) / min(batch_times)),
+        'artifact_kb': os.path.getsize(artifact_path) / 1024,
+        'load_ms': min(load_times) * 1000
+    }
+
+
+def select_model(report, f1_tolerance):
+    """
+    En iyi denge: F1'i en iyiye f1_tolerance kadar yakın modeller
+    arasından tek satır gecikmesi en düşük olan
+    """
+    best_f1 = max(r['f1_macro'] for r in report.values())
+    candidates = [
+        name for name, r in report.items() if r['f1_macro'] >= best_f1 - f1_tolerance
+    ]
+    return min(candidates, key=lambda name: report[name]['latency_ms_p50'])
+
+
+def print_report(report, served):
+    """Model karşılaştırma tablosu"""
+    print(f"\n   {'':24}{'F1':>7}{'CV F1':>7}{'p50 ms':>8}{'p95 ms':>8}"
+          f"{'satır/s':>10}{'KB':>8}{'yük. ms':>8}")
+    for name, r in report.items():
+        mark = '*' if name == served else ' '
+        print(f"  {mark}{name:24}"
+              f"{r['f1_macro']:>7.3f}"
+              f"{r['cv_f1']:>7.3f}"
+              f"{r['latency_ms_p50']:>8.3f}"
+              f"{r['latency_ms_p95']:>8.3f}"
+              f"{r['throughput_rows_per_s']:>10.0f}"
+              f"{r['artifact_kb']:>8.0f}"
+              f"{r['load_ms']:>8.1f}")
+    print("   (* servis edilen model)")
+
+
+def train_model(families=None, serve='auto', f1_tolerance=0.01, output_dir=ML_DIR):
+    """
+    Model ailelerini eğit, karşılaştır ve seçileni kaydet
+    
+    Args:
+        families: Eğitilecek aile adları (None ise MODEL_FAMILIES'in tümü)
+        serve: Servis edilecek aile adı veya 'auto' (bkz. select_model)
+        f1_tolerance: 'auto' seçimde kabul edilen F1 kaybı
+        output_dir: model.npz, model.pkl, scaler.pkl ve raporun yazılacağı dizin
+    """
+    families = families or list(MODEL_FAMILIES)
+    unknown = [name for name in families if name not in MODEL_FAMILIES]
+    if unknown:
+        raise ValueError(f"Bilinmeyen model ailesi: {', '.join(unknown)}")
+    if serve != 'auto' and serve not in families:
+        raise ValueError(f"Servis edilecek model eğitilmiyor: {serve}")
+    
     print("="*60)
-    print("RANDOM FOREST MODEL EĞİTİMİ")
+    print("RİSK MODELİ EĞİTİMİ")
     print("="*60)
     
     # 1. Veri oluştur/yükle
@@ -111,11 +267,7 @@ def train_model():
     print(f"     - Yüksek (2): {(df['label']==2).sum()}")
     
     # 2. Feature ve label ayır
-    feature_cols = ['ndvi', 'ndmi', 'z_ndvi', 'z_ndmi', 'abs_z', 
-                    'deviation_pct', 'trend_slope', 'week_sin', 
-                    'week_cos', 'clear_ratio']
-    
-    X = df[feature_cols].values
+    X = df[FEATURE_COLS].values
     y = df['label'].values
     
     # 3. Train/test split
@@ -126,58 +278,81 @@ def train_model():
     print(f"\n   Eğitim seti: {len(X_train)}")
     print(f"   Test seti: {len(X_test)}")
     
-    # 4. Ölçeklendirme
+    # 4. Ölçeklendirme (tüm aileler aynı ölçekli girdiyle)
     print("\n⚖️ Özellikler ölçeklendiriliyor...")
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    # 5. Model eğitimi
-    print("\n🌲 Random Forest eğitiliyor...")
-    model = RandomForestClassifier(
-        n_estimators=150,
-        max_depth=12,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        random_state=42,
-        n_jobs=-1,
-        class_weight='balanced'
-    )
+    # 5. Her aileyi eğit, artefaktını çıkar ve ölç
+    models_dir = os.path.join(output_dir, 'models')
+    os.makedirs(models_dir, exist_ok=True)
     
-    model.fit(X_train_scaled, y_train)
+    models, report = {}, {}
+    for name in families:
+        description, factory = MODEL_FAMILIES[name]
+        print(f"\n🌲 {description} eğitiliyor...")
+        
+        model = factory()
+        model.fit(X_train_scaled, y_train)
+        models[name] = model
+        
+        cv_scores = cross_val_score(factory(), X_train_scaled, y_train, cv=5, scoring='f1_macro')
+        print(f"   Ortalama CV F1: {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})")
+        
+        artifact_path = os.path.join(models_dir, f'{name}.npz')
+        export_artifact(model, scaler, artifact_path, family=name)
+        
+        report[name] = {
+            'description': description,
+            'cv_f1': float(cv_scores.mean()),
+            **benchmark_model(model, scaler, X_test_scaled, X_test, y_test, artifact_path)
+        }
+    
+    # 6. Karşılaştırma ve seçim
+    served = select_model(report, f1_tolerance) if serve == 'auto' else serve
+    model = models[served]
+    
+    print("\n⏱️ Model karşılaştırması (servis artefaktı üzerinden):")
+    print_report(report, served)
     
-    # 6. Cross-validation
-    print("\n📈 Cross-validation yapılıyor...")
-    cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5, scoring='f1_macro')
-    print(f"   CV F1-scores: {cv_scores}")
-    print(f"   Ortalama CV F1: {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})")
+    report_path = os.path.join(output_dir, 'model_report.json')
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'served': served,
+            'selection': 'auto' if serve == 'auto' else 'manual',
+            'f1_tolerance': f1_tolerance,
+            'test_samples': len(X_test),
+            'models': report
+        }, f, ensure_ascii=False, indent=2)
     
-    # 7. Test seti değerlendirmesi
-    print("\n🎯 Test seti değerlendirmesi:")
+    # 7. Seçilen modelin test seti değerlendirmesi
+    print(f"\n🎯 Test seti değerlendirmesi ({served}):")
     y_pred = model.predict(X_test_scaled)
     
-    print("\n" + classification_report(y_test, y_pred, 
-          target_names=['Düşük', 'Orta', 'Yüksek']))
+    print("\n" + classification_report(y_test, y_pred, target_names=LABELS))
     
     print("\nConfusion Matrix:")
     print(confusion_matrix(y_test, y_pred))
     
-    # 8. Feature importance
-    print("\n📊 Özellik önemleri:")
-    importances = pd.DataFrame({
-        'feature': feature_cols,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
-    
-    for _, row in importances.iterrows():
-        bar = '█' * int(row['importance'] * 50)
-        print(f"   {row['feature']:15} {bar} {row['importance']:.3f}")
+    # 8. Feature importance (ağaç topluluklarında)
+    if hasattr(model, 'feature_importances_'):
+        print("\n📊 Özellik önemleri:")
+        importances = pd.DataFrame({
+            'feature': FEATURE_COLS,
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        for _, row in importances.iterrows():
+            bar = '█' * int(row['importance'] * 50)
+            print(f"   {row['feature']:15} {bar} {row['importance']:.3f}")
     
     # 9. Model kaydet
     print("\n💾 Model kaydediliyor...")
     
-    model_path = os.path.join(os.path.dirname(__file__), 'model.pkl')
-    scaler_path = os.path.join(os.path.dirname(__file__), 'scaler.pkl')
+    model_path = os.path.join(output_dir, 'model.pkl')
+    scaler_path = os.path.join(output_dir, 'scaler.pkl')
     
     with open(model_path, 'wb') as f:
         pickle.dump(model, f)
@@ -185,8 +360,14 @@ def train_model():
     with open(scaler_path, 'wb') as f:
         pickle.dump(scaler, f)
     
+    # Servis artefaktı (web süreci scikit-learn import etmeden yükler)
+    artifact_path = os.path.join(output_dir, 'model.npz')
+    export_artifact(model, scaler, artifact_path, family=served)
+    
     print(f"   ✅ Model kaydedildi: {model_path}")
     print(f"   ✅ Scaler kaydedildi: {scaler_path}")
+    print(f"   ✅ Servis artefaktı kaydedildi: {artifact_path}")
+    print(f"   ✅ Karşılaştırma raporu: {report_path}")
     
     # 10. Test tahmini
     print("\n🔮 Örnek tahminler:")
@@ -197,8 +378,7 @@ def train_model():
         prob = model.predict_proba(X_test_scaled[idx:idx+1])[0]
         actual = y_test[idx]
         
-        labels = ['Düşük', 'Orta', 'Yüksek']
-        print(f"   Gerçek: {labels[actual]:7} | Tahmin: {labels[pred]:7} | "
+        print(f"   Gerçek: {LABELS[actual]:7} | Tahmin: {LABELS[pred]:7} | "
               f"Olasılıklar: D:{prob[0]:.2f} O:{prob[1]:.2f} Y:{prob[2]:.2f}")
     
     print("\n" + "="*60)
@@ -208,5 +388,24 @@ def train_model():
     return model, scaler
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Risk modeli eğitimi ve karşılaştırması')
+    parser.add_argument('--models', default=','.join(MODEL_FAMILIES),
+                        help=f"Virgülle ayrılmış aileler ({', '.join(MODEL_FAMILIES)})")
+    parser.add_argument('--serve', default='auto',
+                        help="Servis edilecek aile veya 'auto'")
+    parser.add_argument('--f1-tolerance', type=float, default=0.01,
+                        help="'auto' seçimde en iyi F1'den kabul edilen kayıp")
+    parser.add_argument('--output-dir', default=ML_DIR)
+    args = parser.parse_args()
+    
+    train_model(
+        families=[name.strip() for name in args.models.split(',') if name.strip()],
+        serve=args.serve,
+        f1_tolerance=args.f1_tolerance,
+        output_dir=args.output_dir
+    )
+
+
 if __name__ == '__main__':
-    train_model()
\ No newline at end of file
+    main()
@@ -0,0 +1,62 @@
+"""BandStore.ensure önbellek aralıkları"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from app import create_app
+from app.services.band_store import BandStore
+from app.services.gee_service import GEEService
+
+COORDINATES = [32.5, 37.9]
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = create_app()
+    app.config['BAND_CACHE_DIR'] = str(tmp_path)
+    app.config['BAND_CACHE_BANDS'] = ['B4', 'B8']
+
+    calls = []
+
+    def fake_bands(coordinates, start_date, end_date, bands):
+        calls.append((start_date, end_date))
+        dates = pd.date_range(start_date, end_date, freq='5D', inclusive='left')
+        df = pd.DataFrame({'date': dates, 'clear_pixel_ratio': 0.9})
+        for band in bands:
+            df[band] = np.linspace(0.1, 0.3, len(dates))
+        return df
+
+    monkeypatch.setattr(GEEService, 'get_band_timeseries', staticmethod(fake_bands))
+    app.fetch_calls = calls
+    return app
+
+
+def test_gap_before_later_request_is_fetched(app):
+    """2021 önbellekteyken 2023 istenirse 2022 de çekilmiş olmalı"""
+    with app.app_context():
+        BandStore.ensure(COORDINATES, '2021-01-01', '2021-12-31')
+        BandStore.ensure(COORDINATES, '2023-01-01', '2023-12-31')
+        assert app.fetch_calls[-1] == ('2021-12-31', '2023-12-31')
+
+        app.fetch_calls.clear()
+        df = BandStore.ensure(COORDINATES, '2022-01-01', '2022-12-31')
+
+        assert not df.empty
+        assert df['date'].dt.year.eq(2022).all()
+        assert app.fetch_calls == []
+
+
+def test_cached_range_is_not_refetched(app):
+    with app.app_context():
+        BandStore.ensure(COORDINATES, '2021-01-01', '2021-12-31')
+
+        app.fetch_calls.clear()
+        df = BandStore.ensure(COORDINATES, '2021-03-01', '2021-06-01')
+
+        assert not df.empty
+        assert app.fetch_calls == []
@@ -0,0 +1,72 @@
+"""İfade şablonlarının çevrimdışı gidiş-dönüş testi"""
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+import ee
+from ee import apitestcase
+from app import create_app
+from app.services.ee_templates import (
+    ExpressionTemplates, GEOMETRY_SLOT, START_SLOT, END_SLOT
+)
+from app.services.gee_service import GEEService
+
+POLYGON = [[32.50, 39.90], [32.51, 39.90], [32.51, 39.91], [32.50, 39.91], [32.50, 39.90]]
+
+
+@pytest.fixture
+def offline_ee(monkeypatch):
+    """earthengine-api'nin kendi test kataloğuyla ağsız başlatma"""
+    monkeypatch.setattr(ee.data, '_install_cloud_api_resource', lambda: None)
+    monkeypatch.setattr(ee.data, 'getAlgorithms', apitestcase.GetAlgorithms)
+    monkeypatch.setattr(ee.deprecation, '_FetchDataCatalogStac', lambda: {})
+    ee.Reset()
+    ee.Initialize(None, '', project='test-project')
+    monkeypatch.setattr(ExpressionTemplates, '_templates', {})
+    monkeypatch.setattr(ExpressionTemplates, '_filled', type(ExpressionTemplates._filled)())
+    yield
+    ee.Reset()
+
+
+@pytest.fixture
+def app():
+    return create_app()
+
+
+def test_template_round_trips_through_decoder(offline_ee, app):
+    with app.app_context():
+        expression = ExpressionTemplates.expression(
+            GEEService._timeseries_expression, (20,), POLYGON, '2024-01-01', '2024-06-30'
+        )
+
+    text = json.dumps(expression)
+    for slot in (GEOMETRY_SLOT, START_SLOT, END_SLOT):
+        assert slot not in text
+    assert '2024-01-01' in text and '2024-06-30' in text
+
+    # Yer tutucular yerleşmiş metin geçerli bir Cloud API ifadesidir
+    decoded = ee.deserializer.decodeCloudApi(expression)
+    assert ee.serializer.encode(decoded, for_cloud_api=True) == expression
+
+
+def test_compute_falls_back_to_public_api(offline_ee, app, monkeypatch):
+    sent = []
+
+    def compute_value(obj):
+        sent.append(ee.serializer.encode(obj, for_cloud_api=True))
+        return {'type': 'FeatureCollection', 'features': []}
+
+    monkeypatch.setattr(ee.data, 'computeValue', compute_value)
+
+    with app.app_context():
+        expression = ExpressionTemplates.expression(
+            GEEService._timeseries_expression, (20,), POLYGON, '2024-01-01', '2024-06-30'
+        )
+
+    # Bulut API kaynağı kurulmadığından iç yol başarısız olur
+    assert ExpressionTemplates.compute(expression) == {'type': 'FeatureCollection', 'features': []}
+    assert sent == [expression]
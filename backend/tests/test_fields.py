@@ -0,0 +1,53 @@
+"""Tarla silme: kimliği yeniden verilen tarla eski sonuçları taşımamalı"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from app import create_app
+from app.services.result_store import ResultStore
+from app.routes.fields import fields_db
+from app.routes.risk import baseline_cache, detector_cache
+
+RISK = {
+    'rule_based': {'score': 70, 'level': 'Yüksek', 'z_score': -2.1, 'trend': {'slope': -0.01}},
+    'final_level': 'Yüksek'
+}
+
+
+def square(lon):
+    return [[lon, 37.9], [lon + 0.01, 37.9], [lon + 0.01, 37.91], [lon, 37.91]]
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    fields_db.clear()
+    yield app.test_client(), app
+    fields_db.clear()
+
+
+def test_deleted_field_results_do_not_leak_to_reused_id(client):
+    client, app = client
+    field_id = client.post('/api/fields', json={'coordinates': square(32.5), 'region': 'A'}).json['field']['id']
+    with app.app_context():
+        ResultStore.record(field_id, {'date': '2026-10-01'}, RISK)
+    baseline_cache[field_id] = {}
+    detector_cache[field_id] = {}
+
+    assert client.get('/api/regions/A').json['levels']['Yüksek'] == 1
+    version = ResultStore.version()
+
+    client.delete(f'/api/fields/{field_id}')
+    reused = client.post('/api/fields', json={'coordinates': square(33.5), 'region': 'A'}).json['field']['id']
+
+    assert reused == field_id
+    assert ResultStore.latest(field_id) is None
+    assert ResultStore.version() > version
+    assert field_id not in baseline_cache and field_id not in detector_cache
+    assert client.get('/api/regions/A').json['levels']['Yüksek'] == 0
+
+    tile = client.get('/api/tiles/risk/0/0/0').json
+    assert tile['clusters']['high'] == [0]
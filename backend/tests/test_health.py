@@ -0,0 +1,37 @@
+"""Sağlık / hazırlık endpoint'leri"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from app import create_app
+from app.services.gee_auth import GEEInitializer
+
+
+@pytest.fixture
+def client(monkeypatch):
+    app = create_app()
+    monkeypatch.setattr(GEEInitializer, '_error', None)
+    return app.test_client()
+
+
+@pytest.mark.parametrize('state, status, code', [
+    (GEEInitializer.PENDING, 'initializing', 503),
+    (GEEInitializer.INITIALIZING, 'initializing', 503),
+    (GEEInitializer.FAILED, 'failed', 503),
+    (GEEInitializer.READY, 'ready', 200),
+])
+def test_ready_follows_gee_state(client, monkeypatch, state, status, code):
+    monkeypatch.setattr(GEEInitializer, '_state', state)
+
+    response = client.get('/api/ready')
+
+    assert response.status_code == code
+    assert response.json['status'] == status
+
+
+def test_health_is_independent_of_gee(client, monkeypatch):
+    monkeypatch.setattr(GEEInitializer, '_state', GEEInitializer.FAILED)
+    assert client.get('/api/health').status_code == 200
@@ -0,0 +1,52 @@
+"""NumPy artefaktlarının scikit-learn modelleriyle birebir uyumu"""
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from app.services.inference import export_artifact, load_artifact
+
+MODELS = {
+    'forest': lambda: RandomForestClassifier(
+        n_estimators=20, max_depth=8, min_samples_leaf=2, random_state=0
+    ),
+    'boosting': lambda: HistGradientBoostingClassifier(
+        max_iter=30, max_leaf_nodes=15, random_state=0
+    ),
+    'linear': lambda: LogisticRegression(max_iter=1000),
+}
+
+
+def training_data(n_classes, n_samples=600, n_features=10, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_samples, n_features))
+    score = X[:, 0] + 0.5 * X[:, 1] - 0.3 * X[:, 2] + rng.normal(0, 0.3, n_samples)
+    edges = np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1])
+    return X * 3 + 1, np.digitize(score, edges)
+
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+@pytest.mark.parametrize('kind', sorted(MODELS))
+def test_artifact_matches_sklearn(tmp_path, kind, n_classes):
+    X, y = training_data(n_classes)
+    scaler = StandardScaler().fit(X)
+    model = MODELS[kind]().fit(scaler.transform(X), y)
+
+    path = str(tmp_path / 'model.npz')
+    export_artifact(model, scaler, path)
+    artifact, artifact_scaler = load_artifact(path)
+
+    X_test, _ = training_data(n_classes, n_samples=300, seed=1)
+    np.testing.assert_allclose(artifact_scaler.transform(X_test), scaler.transform(X_test),
+                               rtol=0, atol=1e-12)
+
+    scaled = scaler.transform(X_test)
+    np.testing.assert_array_equal(artifact.classes_, model.classes_)
+    np.testing.assert_allclose(artifact.predict_proba(scaled), model.predict_proba(scaled),
+                               rtol=0, atol=1e-8)
+    np.testing.assert_array_equal(artifact.predict(scaled), model.predict(scaled))
@@ -0,0 +1,81 @@
+"""SQLite iş kuyruğu: kira süresi dolması ve eski worker'ın yazamaması"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from app import create_app
+from app.services import job_queue
+from app.services.job_queue import JobQueue, SQLiteJobQueue
+
+FIELD = {'id': 7, 'coordinates': [[32.50, 39.90], [32.51, 39.90], [32.51, 39.91],
+                                  [32.50, 39.91], [32.50, 39.90]]}
+
+
+class Clock:
+    """time.time yerine elle ilerletilen saat"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    app = create_app()
+    with app.app_context():
+        yield SQLiteJobQueue(str(tmp_path / 'jobs.db'), max_attempts=3, retry_base=30)
+
+
+def test_expired_lease_moves_to_next_worker(queue, clock):
+    job_id, created = queue.enqueue('baseline', FIELD)
+    assert created
+    assert queue.enqueue('baseline', FIELD) == (job_id, False)
+
+    first = queue.lease('worker-a', lease_seconds=60)
+    assert first['id'] == job_id
+    assert queue.lease('worker-b', lease_seconds=60) is None
+
+    clock.now += 61
+    second = queue.lease('worker-b', lease_seconds=60)
+    assert second['id'] == job_id
+    assert second['attempts'] == 2
+
+    # Kirası elinden alınan worker ne uzatabilir ne de sonuç yazabilir
+    assert not queue.extend(job_id, 'worker-a', 60)
+    assert queue.complete(first, 'worker-a', {'from': 'a'}) is False
+    assert queue.result(first['key']) is None
+
+    assert queue.complete(second, 'worker-b', {'from': 'b'}) is True
+    assert queue.result(second['key'])['result'] == {'from': 'b'}
+    assert queue.stats()['jobs']['baseline'] == {JobQueue.DONE: 1}
+
+
+def test_failed_job_retries_with_backoff(queue, clock):
+    queue.enqueue('risk', FIELD)
+
+    job = queue.lease('worker-a', lease_seconds=60)
+    assert queue.fail(job, 'worker-a', 'hata') == JobQueue.QUEUED
+    assert queue.lease('worker-a', lease_seconds=60) is None
+
+    clock.now += 30
+    job = queue.lease('worker-a', lease_seconds=60)
+    assert job['attempts'] == 2
+    assert queue.fail(job, 'worker-a', 'hata') == JobQueue.QUEUED
+
+    clock.now += 60
+    job = queue.lease('worker-a', lease_seconds=60)
+    assert queue.fail(job, 'worker-a', 'hata') == JobQueue.FAILED
+    clock.now += 1000
+    assert queue.lease('worker-a', lease_seconds=60) is None
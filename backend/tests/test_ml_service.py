@@ -0,0 +1,84 @@
+"""Risk yeniden oynatma: ML etiket eşlemesi ve sapma yüzdesi"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from app import create_app
+from app.services.ml_service import MLService
+
+
+@pytest.fixture
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def two_class_model(monkeypatch):
+    """Orta sınıfı hiç görmemiş model (classes_ = [0, 2])"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 10))
+    y = np.where(X[:, 0] > 0, 2, 0)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    monkeypatch.setattr(MLService, '_model_cache', (model, scaler))
+    return model, scaler
+
+
+def sample_inputs():
+    dates = pd.date_range('2024-03-01', periods=12, freq='5D')
+    timeseries = pd.DataFrame({
+        'date': dates,
+        'ndvi_mean': np.linspace(0.6, 0.1, len(dates)),
+        'ndmi_mean': np.linspace(0.2, -0.3, len(dates)),
+        'clear_pixel_ratio': 0.9,
+    })
+    baseline = {'baseline': [
+        {'week': week, 'ndvi_mu': 0.0 if week % 2 else 0.5, 'ndvi_sigma': 0.1,
+         'ndmi_mu': 0.1, 'ndmi_sigma': 0.05}
+        for week in range(1, 54)
+    ]}
+    return timeseries, baseline
+
+
+def test_replay_levels_follow_model_classes(app, two_class_model):
+    model, scaler = two_class_model
+    timeseries, baseline = sample_inputs()
+
+    with app.app_context():
+        result = MLService.replay_risk(timeseries, baseline)
+
+    assert 'ml_level' in result
+    assert set(result['ml_level']) <= {'Düşük', 'Yüksek'}
+    np.testing.assert_array_equal(result['p_medium'], 0.0)
+    np.testing.assert_allclose(result['p_low'] + result['p_high'], 1.0)
+
+
+def test_zero_center_week_has_no_infinite_deviation(app, two_class_model, monkeypatch):
+    model, scaler = two_class_model
+    timeseries, baseline = sample_inputs()
+    seen = []
+
+    class RecordingScaler:
+        def transform(self, X):
+            seen.append(np.array(X))
+            return scaler.transform(X)
+
+    monkeypatch.setattr(MLService, '_model_cache', (model, RecordingScaler()))
+
+    with app.app_context():
+        MLService.replay_risk(timeseries, baseline)
+
+    features = seen[0]
+    weeks = timeseries['date'].dt.isocalendar().week.to_numpy()
+    deviation = features[:, 5]
+    assert np.isfinite(deviation).all()
+    np.testing.assert_array_equal(deviation[weeks % 2 == 1], 0.0)
+    expected = (0.5 - timeseries['ndvi_mean'].to_numpy()) / 0.5 * 100
+    np.testing.assert_allclose(deviation[weeks % 2 == 0], expected[weeks % 2 == 0])
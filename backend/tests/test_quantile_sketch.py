@@ -0,0 +1,98 @@
+"""WeeklySketch kantilleri ve birleştirme"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('GEE_WARMUP', '0')
+
+from app.services.quantile_sketch import WeeklySketch, WEEKS
+
+QS = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+
+def expected_quantiles(weeks, values):
+    expected = np.full((WEEKS, len(QS)), np.nan)
+    for week in np.unique(weeks):
+        expected[week] = np.quantile(values[weeks == week], QS)
+    return expected
+
+
+@pytest.mark.parametrize('per_week', [1, 2, 3, 6])
+def test_small_weeks_match_numpy_exactly(per_week):
+    rng = np.random.default_rng(per_week)
+    weeks = np.repeat(np.arange(1, 54), per_week)
+    values = rng.normal(0.5, 0.1, len(weeks))
+
+    sketch = WeeklySketch(200)
+    sketch.update(weeks, values)
+
+    np.testing.assert_allclose(sketch.quantiles(QS), expected_quantiles(weeks, values),
+                               atol=1e-12, equal_nan=True)
+
+
+def test_constant_series_has_no_bin_offset():
+    weeks = np.repeat(np.arange(1, 54), 4)
+    for exact in (64, 2):
+        sketch = WeeklySketch(200, exact=exact)
+        sketch.update(weeks, np.full(len(weeks), 0.1))
+        np.testing.assert_allclose(sketch.quantiles(QS)[1:], 0.1, atol=1e-12)
+
+
+def test_histogram_error_is_within_one_bin():
+    rng = np.random.default_rng(0)
+    weeks = rng.integers(1, 54, 50_000)
+    values = np.clip(rng.normal(0.4, 0.15, len(weeks)), -1, 1)
+
+    sketch = WeeklySketch(200, exact=16)
+    sketch.update(weeks, values)
+
+    assert sketch.spilled[1:].all()
+    error = np.abs(sketch.quantiles(QS) - expected_quantiles(weeks, values))[1:]
+    assert error.max() <= sketch.width
+
+
+@pytest.mark.parametrize('exact', [64, 4])
+def test_merge_equals_single_pass(exact):
+    rng = np.random.default_rng(exact)
+    weeks = rng.integers(1, 54, 400)
+    values = rng.normal(0.3, 0.2, len(weeks))
+
+    whole = WeeklySketch(200, exact)
+    whole.update(weeks, values)
+
+    parts = [WeeklySketch(200, exact) for _ in range(3)]
+    for part, idx in zip(parts, np.array_split(np.arange(len(weeks)), 3)):
+        part.update(weeks[idx], values[idx])
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+
+    np.testing.assert_array_equal(merged.n, whole.n)
+    np.testing.assert_allclose(merged.mean, whole.mean, atol=1e-12)
+    np.testing.assert_allclose(merged.std(), whole.std(), atol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(merged.quantiles(QS), whole.quantiles(QS),
+                               atol=whole.width, equal_nan=True)
+    if exact == 64:
+        np.testing.assert_allclose(merged.quantiles(QS), expected_quantiles(weeks, values),
+                                   atol=1e-12, equal_nan=True)
+
+
+def test_baseline_median_is_exact_for_constant_index():
+    from app import create_app
+    from app.services.baseline_service import BaselineService
+
+    app = create_app()
+    dates = pd.date_range('2021-01-01', '2023-12-31', freq='5D')
+    df = pd.DataFrame({'date': dates, 'ndvi_mean': 0.1, 'ndmi_mean': 0.1,
+                       'clear_pixel_ratio': 0.9})
+
+    with app.app_context():
+        sketches = {'ndvi': WeeklySketch(200), 'ndmi': WeeklySketch(200)}
+        BaselineService.stream_chunk(sketches, df, exclude_nadas=False)
+        rows = BaselineService.baseline_from_sketches(sketches)
+
+    assert rows
+    for row in rows:
+        assert row['ndvi_median'] == pytest.approx(0.1, abs=1e-12)
+        assert row['ndmi_iqr'] == pytest.approx(0.0, abs=1e-12)
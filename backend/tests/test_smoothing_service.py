@@ -0,0 +1,38 @@
+"""SmoothingService Whittaker çözümü"""
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from app.services.smoothing_service import SmoothingService
+
+
+@pytest.mark.parametrize('n', [3, 4, 5, 73, 400])
+def test_whittaker_matches_dense_solve(n):
+    rng = np.random.default_rng(n)
+    weights = (rng.random(n) > 0.4).astype(np.float64)
+    weights[:2] = 1.0
+    values = rng.random((n, 2))
+    values[weights == 0] = np.nan
+
+    smoothed = SmoothingService.whittaker(values, weights, 10.0)
+
+    d = np.diff(np.eye(n), 2, axis=0)
+    expected = np.linalg.solve(np.diag(weights) + 10.0 * d.T @ d,
+                               weights[:, None] * np.nan_to_num(values))
+    np.testing.assert_allclose(smoothed, expected, atol=1e-10)
+
+
+def test_app_does_not_import_scipy():
+    """Web süreci scipy / scikit-learn yüklememeli"""
+    code = ("import sys; from app import create_app; create_app(); "
+            "print('scipy' in sys.modules or 'sklearn' in sys.modules)")
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=BACKEND, capture_output=True, text=True,
+        env={**os.environ, 'GEE_WARMUP': '0'}, check=True
+    )
+    assert result.stdout.strip().splitlines()[-1] == 'False'
@@ -0,0 +1,67 @@
+"""Kayan pencere trendi ve LTTB örneklemesi"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.trend_engine import TrendEngine
+from app.services.lod_service import LODService
+
+
+def series(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    days = np.cumsum(rng.integers(2, 12, n)).astype(np.float64)
+    values = 0.5 + 0.002 * days + rng.normal(0, 0.02, n)
+    return days, values
+
+
+def reference(days, values, start, end):
+    x, y = days[start:end], values[start:end]
+    slope, intercept = np.polyfit(x, y, 1)
+    r2 = np.corrcoef(x, y)[0, 1] ** 2
+    return slope, r2
+
+
+@pytest.mark.parametrize('window', [2, 3, 7])
+def test_rolling_count_window_matches_polyfit(window):
+    days, values = series()
+    slope, r2 = TrendEngine.rolling(days, values, window=window)
+
+    assert np.isnan(slope[:window - 1]).all()
+    for end in range(window, len(days) + 1):
+        expected_slope, expected_r2 = reference(days, values, end - window, end)
+        assert slope[end - 1] == pytest.approx(expected_slope, abs=1e-9)
+        if window > 2:
+            assert r2[end - 1] == pytest.approx(expected_r2, abs=1e-9)
+
+
+def test_rolling_day_window_and_gaps():
+    days, values = series()
+    values[10] = np.nan
+    slope, _ = TrendEngine.rolling(days, values, window_days=30)
+
+    starts = np.searchsorted(days, days - 30, side='left')
+    for i, start in enumerate(starts):
+        if start <= 10 <= i or i - start < 1:
+            assert np.isnan(slope[i])
+        else:
+            assert slope[i] == pytest.approx(reference(days, values, start, i + 1)[0], abs=1e-9)
+
+
+def test_lttb_keeps_ends_and_extremes():
+    dates = pd.date_range('2020-01-01', periods=500, freq='D')
+    values = np.sin(np.linspace(0, 6 * np.pi, 500))
+    values[237] = 3.0
+    df = pd.DataFrame({'date': dates, 'ndvi_mean': values})
+
+    sampled = LODService.lttb(df, 50)
+
+    assert len(sampled) == 50
+    assert sampled['date'].is_monotonic_increasing
+    assert sampled['date'].iloc[0] == dates[0]
+    assert sampled['date'].iloc[-1] == dates[-1]
+    assert 3.0 in sampled['ndvi_mean'].to_numpy()
+    assert len(LODService.lttb(df, 1000)) == 500
@@ -0,0 +1,102 @@
+"""
+Tarla işleri worker'ı
+Kuyruktan iş kiralar, çalıştırır ve sonucu yazar. Yatay ölçekleme için
+aynı kuyruğa bağlı birden fazla süreç (veya makine) başlatılır.
+
+Örnek:
+    python worker.py --threads 4
+    python worker.py --worker-id node-2 --once
+"""
+import os
+import signal
+import socket
+import argparse
+import threading
+from app import create_app
+from app.services.job_queue import JobQueue
+from app.services.field_jobs import FieldJobs
+from app.services.scheduler import WorkScheduler
+
+stop = threading.Event()
+
+
+def run_job(queue, job, worker_id, lease_seconds):
+    """İşi çalıştırırken kirayı arka planda uzat"""
+    done = threading.Event()
+
+    def heartbeat():
+        while not done.wait(lease_seconds / 3):
+            if not queue.extend(job['id'], worker_id, lease_seconds):
+                return
+
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+
+    try:
+        # Worker işleri dashboard isteklerinin önüne geçmez
+        with WorkScheduler.priority(WorkScheduler.REFRESH):
+            result = FieldJobs.run(job, queue)
+    except Exception as e:
+        status = queue.fail(job, worker_id, e)
+        print(f"❌ İş {job['id']} ({job['kind']}, tarla {job['field_id']}): {e} -> {status}")
+        return
+    finally:
+        done.set()
+        beat.join()
+
+    if queue.complete(job, worker_id, result):
+        print(f"✅ İş {job['id']} ({job['kind']}, tarla {job['field_id']})")
+    else:
+        print(f"⚠️ İş {job['id']} kirası başka worker'a geçti, sonuç yazılmadı")
+
+
+def work_loop(app, queue, worker_id, once):
+    """Tek thread: kuyruk boşalana (once) veya durdurulana kadar iş işle"""
+    lease_seconds = app.config['JOB_LEASE_SECONDS']
+    poll_seconds = app.config['JOB_POLL_SECONDS']
+
+    with app.app_context():
+        while not stop.is_set():
+            job = queue.lease(worker_id, lease_seconds)
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll_seconds)
+                continue
+            run_job(queue, job, worker_id, lease_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tarla işleri worker\'ı')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='Süreç içindeki eşzamanlı iş sayısı')
+    parser.add_argument('--worker-id', default=f'{socket.gethostname()}-{os.getpid()}')
+    parser.add_argument('--once', action='store_true',
+                        help='Kuyruk boşalınca çık')
+    args = parser.parse_args()
+
+    app = create_app()
+    queue = JobQueue.from_config(app.config)
+
+    # SIGTERM/SIGINT: eldeki işler bitince çık
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    print(f"🚜 Worker {args.worker_id} başladı ({args.threads} thread)")
+
+    threads = [
+        threading.Thread(
+            target=work_loop, args=(app, queue, f'{args.worker_id}/{i}', args.once)
+        )
+        for i in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"👋 Worker {args.worker_id} durdu")
+
+
+if __name__ == '__main__':
+    main()
@@ -69,20 +69,75 @@ const API = {
      * Analiz İşlemleri
      */
     analysis: {
-        async analyze(coordinates, startDate, endDate) {
+        /**
+         * options.format: 'columnar' ise zaman serisi {date: [...], ndvi_mean: [...]}
+         *                 şeklinde sütun bazlı döner
+         * options.resolution: 'daily' | 'weekly' | 'monthly' (sunucuda toplanır)
+         * options.maxPoints: grafik için maksimum nokta sayısı (LTTB ile indirgenir)
+         */
+        async analyze(coordinates, startDate, endDate, options = {}) {
             return API.request('/analyze', {
                 method: 'POST',
-                body: { coordinates, start_date: startDate, end_date: endDate }
+                body: {
+                    coordinates,
+                    start_date: startDate,
+                    end_date: endDate,
+                    ...API.analysis.seriesOptions(options)
+                }
             });
         },
         
-        async getTimeseries(coordinates, startDate, endDate) {
+        async getTimeseries(coordinates, startDate, endDate, options = {}) {
             return API.request('/timeseries', {
                 method: 'POST',
-                body: { coordinates, start_date: startDate, end_date: endDate }
+                body: {
+                    coordinates,
+                    start_date: startDate,
+                    end_date: endDate,
+                    ...API.analysis.seriesOptions(options)
+                }
             });
         },
         
+        seriesOptions({ format = 'records', resolution = null, maxPoints = null, since = null } = {}) {
+            const body = { format };
+            if (resolution) body.resolution = resolution;
+            if (maxPoints) body.max_points = maxPoints;
+            if (since) body.since = since;
+            return body;
+        },
+        
+        /**
+         * Önbellekli analiz: tarlanın daha önce indirilen gözlemleri
+         * IndexedDB'de tutulur, sunucudan yalnızca yeni gözlemler istenir.
+         * Dönen sonuçta timeseries birleştirilmiş (sütun bazlı) seridir.
+         * 
+         * options.maxPoints: ilk (tam) istekte sunucuda indirgenir; delta
+         *                    istekleri yalnızca birkaç yeni nokta döndürür
+         * options.resolution: toplanmış seriye ham delta eklenemeyeceği için
+         *                     verilirse önbellek kullanılmaz
+         */
+        async analyzeCached(coordinates, startDate, endDate, { resolution = null, maxPoints = null } = {}) {
+            const key = JSON.stringify(coordinates);
+            const cached = resolution ? null : await TimeseriesCache.get(key);
+            
+            const result = await API.analysis.analyze(coordinates, startDate, endDate, {
+                format: 'columnar',
+                ...(cached ? { since: cached.cursor } : { resolution, maxPoints })
+            });
+            
+            const merged = TimeseriesCache.merge(
+                cached ? cached.columns : null, result.timeseries, result.since, startDate
+            );
+            
+            if (!resolution) {
+                await TimeseriesCache.put(key, { columns: merged, cursor: result.cursor });
+            }
+            
+            result.timeseries = merged;
+            return result;
+        },
+        
         async getCurrent(coordinates) {
             return API.request('/current', {
                 method: 'POST',
@@ -107,9 +162,119 @@ const API = {
                 method: 'POST',
                 body: { coordinates, field_id: fieldId }
             });
+        },
+        
+        /**
+         * Geçmiş her gözlem tarihi için risk (sütun bazlı)
+         */
+        async replay(coordinates, startDate, endDate, fieldId = null) {
+            return API.request('/risk/replay', {
+                method: 'POST',
+                body: {
+                    coordinates,
+                    field_id: fieldId,
+                    start_date: startDate,
+                    end_date: endDate,
+                    format: 'columnar'
+                }
+            });
         }
+    },
+    
+    /**
+     * Görünümdeki kayıtlı tarlaları arka planda hazırlat
+     * bbox: [west, south, east, north]
+     */
+    async prefetch(bbox) {
+        return API.request('/prefetch', {
+            method: 'POST',
+            body: { bbox }
+        });
+    },
+    
+    /**
+     * Risk haritası karosu (Web Mercator z/x/y)
+     */
+    async getRiskTile(z, x, y) {
+        return API.request(`/tiles/risk/${z}/${x}/${y}`);
+    }
+};
+
+/**
+ * Zaman Serisi Önbelleği (IndexedDB)
+ * Tarla anahtarı -> { columns: {date: [...], ...}, cursor: 'YYYY-MM-DD' }
+ */
+const TimeseriesCache = {
+    DB_NAME: 'tarim-takip',
+    STORE: 'timeseries',
+    db: null,
+    
+    async open() {
+        if (this.db) return this.db;
+        if (!window.indexedDB) return null;
+        
+        this.db = await new Promise((resolve) => {
+            const req = indexedDB.open(this.DB_NAME, 1);
+            req.onupgradeneeded = () => req.result.createObjectStore(this.STORE);
+            req.onsuccess = () => resolve(req.result);
+            // Önbellek yoksa (gizli mod vb.) tam veri ile devam edilir
+            req.onerror = () => resolve(null);
+        });
+        return this.db;
+    },
+    
+    async get(key) {
+        const db = await this.open();
+        if (!db) return null;
+        
+        return new Promise((resolve) => {
+            const req = db.transaction(this.STORE).objectStore(this.STORE).get(key);
+            req.onsuccess = () => resolve(req.result || null);
+            req.onerror = () => resolve(null);
+        });
+    },
+    
+    async put(key, value) {
+        const db = await this.open();
+        if (!db) return;
+        
+        return new Promise((resolve) => {
+            const tx = db.transaction(this.STORE, 'readwrite');
+            tx.objectStore(this.STORE).put(value, key);
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => resolve();
+        });
+    },
+    
+    /**
+     * Önbellekteki sütunlara delta'yı ekle
+     * since'ten sonraki önbellek satırları delta ile değiştirilir,
+     * startDate'ten eski satırlar atılır
+     */
+    merge(cached, delta, since, startDate) {
+        if (!cached || !since) {
+            return delta;
+        }
+        
+        const names = Object.keys(delta).length ? Object.keys(delta) : Object.keys(cached);
+        const dates = cached.date || [];
+        
+        // Tarihler 'YYYY-MM-DD' olduğu için metin karşılaştırması yeterli
+        let from = 0;
+        while (from < dates.length && dates[from] < startDate) from++;
+        let to = from;
+        while (to < dates.length && dates[to] <= since) to++;
+        
+        const merged = {};
+        names.forEach(name => {
+            // Önbellekte olmayan (sonradan eklenen) sütunlar boş doldurulur
+            const kept = (cached[name] || new Array(dates.length).fill(null)).slice(from, to);
+            merged[name] = kept.concat(delta[name] || []);
+        });
+        return merged;
     }
 };
 
 // Global erişim için
-window.API = API;
\ No newline at end of file
+window.API = API;
+window.TimeseriesCache = TimeseriesCache;
\ No newline at end of file
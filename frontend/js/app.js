@@ -77,11 +77,15 @@ const App = {
             const startDate = new Date(Date.now() - 365 * 24 * 60 * 60 * 1000)
                 .toISOString().split('T')[0];
             
-            const analysisResult = await API.analysis.analyze(
-                coordinates, startDate, endDate
+            // Daha önce indirilen gözlemler tarayıcıda saklanır,
+            // sunucudan yalnızca yenileri istenir
+            const analysisResult = await API.analysis.analyzeCached(
+                coordinates, startDate, endDate, {
+                    maxPoints: ChartsModule.getMaxPoints()
+                }
             );
             
-            if (analysisResult.success && analysisResult.timeseries.length > 0) {
+            if (analysisResult.success && analysisResult.timeseries.date?.length > 0) {
                 ChartsModule.updateTimeseriesChart(analysisResult.timeseries);
             }
             
@@ -6,26 +6,32 @@
 const ChartsModule = {
     timeseriesChart: null,
     
+    dateFormatter: new Intl.DateTimeFormat('tr-TR', { day: '2-digit', month: 'short' }),
+    
     /**
      * Zaman serisi grafiğini oluştur veya güncelle
+     * data: satır dizisi [{date, ndvi_mean, ...}] veya
+     *       sütun bazlı {date: [...], ndvi_mean: [...], ndmi_mean: [...]}
      */
     updateTimeseriesChart(data) {
         const ctx = document.getElementById('timeseries-chart').getContext('2d');
         
-        // Tarihleri ve değerleri ayır
-        const labels = data.map(d => {
-            const date = new Date(d.date);
-            return date.toLocaleDateString('tr-TR', { day: '2-digit', month: 'short' });
-        });
+        // Sütun bazlı veride diziler doğrudan kullanılır
+        const columns = Array.isArray(data) ? this.toColumns(data) : data;
         
-        const ndviValues = data.map(d => d.ndvi_mean);
-        const ndmiValues = data.map(d => d.ndmi_mean);
+        const labels = columns.date.map(d => this.dateFormatter.format(new Date(d)));
+        const ndviValues = columns.ndvi_mean;
+        const ndmiValues = columns.ndmi_mean;
+        const ndviSmooth = columns.ndvi_mean_smooth || [];
+        const ndmiSmooth = columns.ndmi_mean_smooth || [];
         
         // Eğer grafik varsa güncelle, yoksa oluştur
         if (this.timeseriesChart) {
             this.timeseriesChart.data.labels = labels;
             this.timeseriesChart.data.datasets[0].data = ndviValues;
             this.timeseriesChart.data.datasets[1].data = ndmiValues;
+            this.timeseriesChart.data.datasets[2].data = ndviSmooth;
+            this.timeseriesChart.data.datasets[3].data = ndmiSmooth;
             this.timeseriesChart.update();
             return;
         }
@@ -55,6 +61,25 @@ const ChartsModule = {
                         tension: 0.3,
                         pointRadius: 3,
                         pointHoverRadius: 6
+                    },
+                    // Sunucuda boşlukları doldurulmuş, yumuşatılmış seri
+                    {
+                        label: 'NDVI (yumuşatılmış)',
+                        data: ndviSmooth,
+                        borderColor: '#1b5e20',
+                        borderDash: [6, 4],
+                        fill: false,
+                        tension: 0.3,
+                        pointRadius: 0
+                    },
+                    {
+                        label: 'NDMI (yumuşatılmış)',
+                        data: ndmiSmooth,
+                        borderColor: '#0d47a1',
+                        borderDash: [6, 4],
+                        fill: false,
+                        tension: 0.3,
+                        pointRadius: 0
                     }
                 ]
             },
@@ -110,6 +135,29 @@ const ChartsModule = {
         });
     },
     
+    /**
+     * Grafik genişliğine göre anlamlı maksimum nokta sayısı
+     * (piksel başına birden fazla nokta çizmenin faydası yok)
+     */
+    getMaxPoints() {
+        const canvas = document.getElementById('timeseries-chart');
+        const width = canvas ? canvas.clientWidth : 0;
+        return width ? Math.max(50, Math.floor(width / 2)) : 300;
+    },
+    
+    /**
+     * Satır dizisini sütun bazlı yapıya çevir (eski format için)
+     */
+    toColumns(rows) {
+        return {
+            date: rows.map(d => d.date),
+            ndvi_mean: rows.map(d => d.ndvi_mean),
+            ndmi_mean: rows.map(d => d.ndmi_mean),
+            ndvi_mean_smooth: rows.map(d => d.ndvi_mean_smooth ?? null),
+            ndmi_mean_smooth: rows.map(d => d.ndmi_mean_smooth ?? null)
+        };
+    },
+    
     /**
      * Baseline karşılaştırma grafiği
      */
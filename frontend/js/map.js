@@ -10,6 +10,20 @@ const MapModule = {
     currentMarker: null,
     currentPolygon: null,
     selectedCoordinates: null,
+    prefetchTimer: null,
+    riskLayer: null,
+    
+    // Prefetch: bu zoom'un altında görünüm çok geniş, istek gönderilmez
+    PREFETCH_MIN_ZOOM: 11,
+    PREFETCH_DEBOUNCE_MS: 600,
+    
+    // Risk karosu renkleri (seviye kodu -> renk; -1: sonuç yok)
+    RISK_COLORS: {
+        '-1': '#9e9e9e',
+        '0': '#2e7d32',
+        '1': '#f9a825',
+        '2': '#c62828'
+    },
     
     /**
      * Haritayı başlat
@@ -44,7 +58,13 @@ const MapModule = {
             "🛰️ Uydu": satelliteLayer,
             "🗺️ Harita": osmLayer
         };
-        L.control.layers(baseMaps).addTo(this.map);
+        
+        // Kayıtlı tarlaların risk katmanı (karolar halinde)
+        this.riskLayer = this.createRiskLayer();
+        const overlays = {
+            "⚠️ Risk": this.riskLayer
+        };
+        L.control.layers(baseMaps, overlays).addTo(this.map);
         
         // Çizim katmanı
         this.drawnItems = new L.FeatureGroup();
@@ -83,6 +103,9 @@ const MapModule = {
         // Harita tıklama
         this.map.on('click', (e) => this.onMapClick(e));
         
+        // Görünüm değişince görünen tarlaları arka planda hazırlat
+        this.map.on('moveend', () => this.schedulePrefetch());
+        
         console.log('✅ Harita başlatıldı');
     },
     
@@ -190,6 +213,104 @@ const MapModule = {
         this.enableAnalyzeButton();
     },
 
+    /**
+     * Harita hareketi bittikten sonra (debounce) prefetch isteği gönder
+     */
+    schedulePrefetch() {
+        clearTimeout(this.prefetchTimer);
+        
+        this.prefetchTimer = setTimeout(() => {
+            if (this.map.getZoom() < this.PREFETCH_MIN_ZOOM) return;
+            
+            const bounds = this.map.getBounds();
+            const bbox = [
+                bounds.getWest(), bounds.getSouth(),
+                bounds.getEast(), bounds.getNorth()
+            ];
+            
+            // Arka plan işi: hata kullanıcıya gösterilmez
+            API.prefetch(bbox).catch(() => {});
+        }, this.PREFETCH_DEBOUNCE_MS);
+    },
+    
+    /**
+     * Risk karolarını canvas üzerine çizen katman
+     * Düşük zoom'da kümeler (baskın seviye rengi), yüksek zoom'da tarlalar
+     */
+    createRiskLayer() {
+        const module = this;
+        
+        const RiskLayer = L.GridLayer.extend({
+            createTile(coords, done) {
+                const tile = document.createElement('canvas');
+                const size = this.getTileSize();
+                tile.width = size.x;
+                tile.height = size.y;
+                
+                API.getRiskTile(coords.z, coords.x, coords.y)
+                    .then(data => {
+                        module.drawRiskTile(tile.getContext('2d'), data, size.x / data.extent);
+                        done(null, tile);
+                    })
+                    .catch(error => done(error, tile));
+                
+                return tile;
+            }
+        });
+        
+        return new RiskLayer({ opacity: 0.8, zIndex: 400 });
+    },
+    
+    /**
+     * Sütun bazlı risk karosunu çiz
+     */
+    drawRiskTile(ctx, data, scale) {
+        if (data.type === 'clusters') {
+            const c = data.clusters;
+            
+            for (let i = 0; i < c.count.length; i++) {
+                // Baskın seviye (sonuçsuz tarlalar yalnızca başka seviye yoksa)
+                const levels = [c.low[i], c.medium[i], c.high[i]];
+                const top = Math.max(...levels);
+                const level = top > 0 ? levels.indexOf(top) : -1;
+                const radius = Math.min(24, 6 + 3 * Math.log2(c.count[i]));
+                
+                ctx.beginPath();
+                ctx.arc(c.x[i] * scale, c.y[i] * scale, radius, 0, 2 * Math.PI);
+                ctx.fillStyle = this.RISK_COLORS[level];
+                ctx.fill();
+                
+                ctx.fillStyle = '#fff';
+                ctx.font = 'bold 11px sans-serif';
+                ctx.textAlign = 'center';
+                ctx.textBaseline = 'middle';
+                ctx.fillText(c.count[i], c.x[i] * scale, c.y[i] * scale);
+            }
+            return;
+        }
+        
+        const f = data.features;
+        
+        for (let i = 0; i < f.id.length; i++) {
+            const geometry = f.geometry[i];
+            ctx.fillStyle = this.RISK_COLORS[f.level[i]];
+            ctx.beginPath();
+            
+            if (geometry.length === 2) {
+                // Küçük tarla: nokta
+                ctx.arc(geometry[0] * scale, geometry[1] * scale, 4, 0, 2 * Math.PI);
+            } else {
+                ctx.moveTo(geometry[0] * scale, geometry[1] * scale);
+                for (let k = 2; k < geometry.length; k += 2) {
+                    ctx.lineTo(geometry[k] * scale, geometry[k + 1] * scale);
+                }
+                ctx.closePath();
+            }
+            
+            ctx.fill();
+        }
+    },
+    
     /**
      * Harita tıklaması
      */